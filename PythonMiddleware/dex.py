@@ -83,31 +83,37 @@ class Dex():
         account = Account(account, full=True, graphene_instance=self.graphene)
 
         r = {}
-        for debt in account.get("call_orders"):
-            base = Asset(debt["call_price"]["base"]["asset_id"], full=True)
-            quote = Asset(debt["call_price"]["quote"]["asset_id"], full=True)
-            if not quote.is_bitasset:
-                continue
-            bitasset = quote["bitasset_data"]
-            settlement_price = Price(bitasset["current_feed"]["settlement_price"])
-            if not settlement_price:
-                continue
-            call_price = Price(debt["call_price"])
-            collateral_amount = Amount({
-                "amount": debt["collateral"],
-                "asset": base
-            })
-            debt_amount = Amount({
-                "amount": debt["debt"],
-                "asset": quote
-            })
-            r[quote["symbol"]] = {
-                "collateral": collateral_amount,
-                "debt": debt_amount,
-                "call_price": call_price,
-                "settlement_price": settlement_price,
-                "ratio": float(collateral_amount) / float(debt_amount) * float(settlement_price)
-            }
+        with self.graphene.rpc.coalesce():
+            # Fetch all involved assets with a single call
+            self.graphene.rpc.prefetch_objects(list(set(
+                debt["call_price"][side]["asset_id"]
+                for debt in account.get("call_orders")
+                for side in ["base", "quote"])))
+            for debt in account.get("call_orders"):
+                base = Asset(debt["call_price"]["base"]["asset_id"], full=True)
+                quote = Asset(debt["call_price"]["quote"]["asset_id"], full=True)
+                if not quote.is_bitasset:
+                    continue
+                bitasset = quote["bitasset_data"]
+                settlement_price = Price(bitasset["current_feed"]["settlement_price"])
+                if not settlement_price:
+                    continue
+                call_price = Price(debt["call_price"])
+                collateral_amount = Amount({
+                    "amount": debt["collateral"],
+                    "asset": base
+                })
+                debt_amount = Amount({
+                    "amount": debt["debt"],
+                    "asset": quote
+                })
+                r[quote["symbol"]] = {
+                    "collateral": collateral_amount,
+                    "debt": debt_amount,
+                    "call_price": call_price,
+                    "settlement_price": settlement_price,
+                    "ratio": float(collateral_amount) / float(debt_amount) * float(settlement_price)
+                }
         return r
 
     def close_debt_position(self, symbol, account=None):
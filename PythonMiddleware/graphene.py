@@ -33,7 +33,10 @@ log = logging.getLogger(__name__)
 class Graphene(object):
     """ Connect to the graphene network.
 
-        :param str node: Node to connect to *(optional)*
+        :param str node: Node to connect to *(optional)*. A list of
+            nodes, or a dict of nodes by API (``database``,
+            ``network_broadcast``, ``history``) to route calls to
+            separate nodes, is accepted as well.
         :param str rpcuser: RPC user *(optional)*
         :param str rpcpassword: RPC password *(optional)*
         :param bool nobroadcast: Do **not** broadcast a transaction! *(optional)*
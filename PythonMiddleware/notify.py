@@ -22,6 +22,9 @@ class Notify(Events):
         :param fnt on_market: Callback that will be called for changes of the listed markets
         :param graphene.graphene.graphene graphene_instance: graphene instance
 
+        Further keyword arguments (e.g. ``workers`` or ``overflow``) are
+        passed to :class:`PythonMiddlewareapi.websocket.GrapheneWebsocket`.
+
         **Example**
 
         .. code-block:: python
@@ -62,6 +65,7 @@ class Notify(Events):
         on_account=None,
         on_market=None,
         graphene_instance=None,
+        **kwargs
     ):
         # Events
         super(Notify, self).__init__()
@@ -107,6 +111,7 @@ class Notify(Events):
             on_block=on_block,
             on_account=self.process_account,
             on_market=self.process_market,
+            **kwargs
         )
 
     def process_market(self, data):
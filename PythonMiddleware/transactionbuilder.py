@@ -117,7 +117,7 @@ class TransactionBuilder(dict):
                 "fee_paying_account": proposer["id"],
                 "expiration_time": transactions.formatTimeFromNow(
                     self.graphene.proposal_expiration),
-                "proposed_ops": [o.json() for o in ops],
+                "proposed_ops": ops,
                 "review_period_seconds": self.graphene.proposal_review,
                 "extensions": []
             })
@@ -128,7 +128,7 @@ class TransactionBuilder(dict):
             crontab_creator = Account(self.graphene.crontaber, graphene_instance=self.graphene)
             ops = operations.Crontab_create(**{
                 "crontab_creator": crontab_creator["id"],
-                "crontab_ops": [o.json() for o in ops],
+                "crontab_ops": ops,
                 "start_time": self.graphene.crontab_start_time,
                 "execute_interval": self.graphene.crontab_execute_interval,
                 "scheduled_execute_times": self.graphene.crontab_scheduled_execute_times,
@@ -152,7 +152,8 @@ class TransactionBuilder(dict):
             operations=ops
         )
         # pprint(tx)
-        super(TransactionBuilder, self).__init__(tx.json())
+        self.tx = tx
+        super(TransactionBuilder, self).__init__(tx.to_native())
 
     def sign(self):
         """ Sign a provided transaction witht he provided key(s)
@@ -180,17 +181,16 @@ class TransactionBuilder(dict):
         elif "blockchain" in self:
             operations.default_prefix = self["blockchain"]["prefix"]
         # print("prefix>>>:", operations.default_prefix)
-        try:
-            signedtx = Signed_Transaction(**self.json())
-        except:
-            raise ValueError("Invalid TransactionBuilder Format")
+        # The transaction that constructTx() has just built, so that it
+        # does not have to be parsed again from its json
+        signedtx = self.tx
         # print("self.wifs>>>>:", self.wifs)
         # print("signedtx>>>:", signedtx)
 
         if not any(self.wifs):
             raise MissingKeyError
         signedtx.sign(self.wifs, chain=self.graphene.rpc.chain_params)
-        self["signatures"].extend(signedtx.json().get("signatures"))
+        self["signatures"].extend(signedtx.data["signatures"].to_native())
         # print("signatures>>>>:", self["signatures"])
 
     def verify_authority(self):
@@ -241,6 +241,7 @@ class TransactionBuilder(dict):
         """ Clear the transaction builder and start from scratch
         """
         self.ops = []
+        self.tx = None
         self.wifs = []
         self.pop("signatures", None)
         self.available_signers = []
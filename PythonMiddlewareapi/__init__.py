@@ -1,5 +1,16 @@
 __all__ = [
     "graphenenoderpc",
+    "asyncnoderpc",
+    "nodepool",
+    "loader",
+    "cache",
+    "chaincache",
+    "replay",
+    "jsoncodec",
+    "compression",
+    "dispatcher",
+    "subscriptions",
+    "limiter",
     "exceptions",
     "websocket",
 ]
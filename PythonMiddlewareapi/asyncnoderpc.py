@@ -0,0 +1,301 @@
+import ssl
+import asyncio
+import logging
+from itertools import cycle
+import websockets
+from .exceptions import RPCError, NumRetriesReached
+from .jsoncodec import default_codec
+from PythonMiddlewarebase.chains import known_chains
+from . import exceptions
+log = logging.getLogger(__name__)
+
+
+class AsyncGrapheneWebsocketRPC(object):
+    """ asyncio counterpart of
+        :class:`PythonMiddlewareapi.graphenenoderpc.GrapheneWebsocketRPC`.
+
+        Calls are not executed in lockstep. Every call is sent right away
+        and gets a future that is keyed by the JSON-RPC ``id``. A single
+        reader task receives all replies and resolves the matching
+        future, so many calls can be in flight on one websocket at
+        the same time.
+
+        :param str urls: Either a single Websocket URL, or a list of URLs
+        :param str user: Username for Authentication
+        :param str password: Password for Authentication
+        :param int num_retries: Try x times to num_retries to a node on disconnect, -1 for indefinitely
+        :param json_codec: :class:`PythonMiddlewareapi.jsoncodec.JSONCodec`
+            to encode requests and decode replies with
+
+        Usage:
+
+        .. code-block:: python
+
+            async def main():
+                async with AsyncGrapheneNodeRPC("ws://10.0.0.16:8090") as rpc:
+                    blocks = await asyncio.gather(
+                        *[rpc.get_block(n) for n in range(1, 101)])
+
+            asyncio.get_event_loop().run_until_complete(main())
+
+    """
+    def __init__(self, urls, user="", password="", **kwargs):
+        self.api_id = {}
+        self._request_id = 0
+        if isinstance(urls, list):
+            self.urls = cycle(urls)
+        else:
+            self.urls = cycle([urls])
+        self.user = user
+        self.password = password
+        self.num_retries = kwargs.get("num_retries", -1)
+        self.json_codec = kwargs.get("json_codec", default_codec)
+
+        self.url = None
+        self.ws = None
+        self._pending = {}
+        self._reader = None
+        self._connecting = None
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def get_request_id(self):
+        self._request_id += 1
+        return self._request_id
+
+    async def connect(self):
+        """ Connect, login and register the APIs. Concurrent callers
+            share a single connection attempt.
+        """
+        if self._connecting is None:
+            self._connecting = asyncio.ensure_future(self._connect())
+        try:
+            await asyncio.shield(self._connecting)
+        finally:
+            if self._connecting is not None and self._connecting.done():
+                self._connecting = None
+
+    async def _connect(self):
+        await self.wsconnect()
+        await self.register_apis()
+
+    async def wsconnect(self):
+        cnt = 0
+        while True:
+            cnt += 1
+            self.url = next(self.urls)
+            log.debug("Trying to connect to node %s" % self.url)
+            sslopt = None
+            if self.url[:3] == "wss":
+                sslopt = ssl.create_default_context()
+                sslopt.check_hostname = False
+                sslopt.verify_mode = ssl.CERT_NONE
+            try:
+                self.ws = await websockets.connect(
+                    self.url, ssl=sslopt, max_size=None)
+                break
+            except KeyboardInterrupt:
+                raise
+            except Exception:
+                if (self.num_retries >= 0 and cnt > self.num_retries):
+                    raise NumRetriesReached()
+
+                sleeptime = (cnt - 1) * 2 if cnt < 10 else 10
+                if sleeptime:
+                    log.warning(
+                        "Lost connection to node during wsconnect(): %s (%d/%d) "
+                        % (self.url, cnt, self.num_retries) +
+                        "Retrying in %d seconds" % sleeptime
+                    )
+                    await asyncio.sleep(sleeptime)
+        self._reader = asyncio.ensure_future(self._read(self.ws))
+        await self.login(self.user, self.password, api_id=1)
+
+    async def register_apis(self):
+        self.api_id["database"] = await self.database(api_id=1)
+        self.api_id["history"] = await self.history(api_id=1)
+        self.api_id["network_broadcast"] = await self.network_broadcast(api_id=1)
+
+    async def close(self):
+        """ Close the websocket and fail all calls that are still in flight
+        """
+        if self.ws is not None:
+            await self.ws.close()
+        if self._reader is not None:
+            await self._reader
+            self._reader = None
+
+    async def _read(self, ws):
+        """ Reader task: receive every reply on ``ws`` and resolve the
+            future that waits for its id
+        """
+        try:
+            while True:
+                reply = await ws.recv()
+                try:
+                    ret = self.json_codec.loads(reply)
+                except ValueError:
+                    log.error("Client returned invalid format. Expected JSON!")
+                    continue
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug(reply)
+                if not isinstance(ret, dict):
+                    log.warning("Skipping reply that is not a JSON object")
+                    continue
+                future = self._pending.pop(ret.get("id"), None)
+                if future is None or future.done():
+                    # A reply nobody waits for (anymore)
+                    continue
+                if 'error' in ret:
+                    if 'detail' in ret['error']:
+                        future.set_exception(RPCError(ret['error']['detail']))
+                    else:
+                        future.set_exception(RPCError(ret['error']['message']))
+                else:
+                    future.set_result(ret["result"])
+        except websockets.exceptions.ConnectionClosed as e:
+            log.debug("Connection to node %s closed: %s" % (self.url, str(e)))
+            error = e
+        except Exception as e:
+            log.exception(e)
+            error = e
+        finally:
+            if self.ws is ws:
+                self.ws = None
+        # Nobody is going to answer the remaining calls on this socket
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    """ RPC Calls
+    """
+    async def rpcexec(self, payload):
+        """ Execute a call by sending the payload and wait for the
+            reply with the same id
+
+            :param json payload: Payload data
+            :raises RPCError: if the server returns an error
+        """
+        if self.ws is None:
+            await self.connect()
+        future = asyncio.get_event_loop().create_future()
+        self._pending[payload["id"]] = future
+        # websockets sends str as text and bytes as binary frames
+        data = self.json_codec.dumps(payload).decode('utf8')
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(data)
+        try:
+            await self.ws.send(data)
+        except Exception:
+            self._pending.pop(payload["id"], None)
+            raise
+        try:
+            return await future
+        finally:
+            self._pending.pop(payload["id"], None)
+
+    def __getattr__(self, name):
+        """ Map all methods to RPC calls and pass through the arguments.
+            The returned method is a coroutine function.
+        """
+        async def method(*args, **kwargs):
+
+            # Sepcify the api to talk to
+            if "api_id" not in kwargs:
+                if ("api" in kwargs):
+                    if (kwargs["api"] not in self.api_id and
+                            (self.ws is None or self._connecting is not None)):
+                        # Not connected yet, or still registering the APIs
+                        await self.connect()
+                    if (kwargs["api"] in self.api_id and
+                            self.api_id[kwargs["api"]]):
+                        api_id = self.api_id[kwargs["api"]]
+                    else:
+                        raise ValueError(
+                            "Unknown API! "
+                            "Verify that you have registered to %s"
+                            % kwargs["api"]
+                        )
+                else:
+                    api_id = 0
+            else:
+                api_id = kwargs["api_id"]
+
+            query = {"method": "call",
+                     "params": [api_id, name, list(args)],
+                     "jsonrpc": "2.0",
+                     "id": self.get_request_id()}
+            r = await self.rpcexec(query)
+            return r
+        return method
+
+
+class AsyncGrapheneNodeRPC(AsyncGrapheneWebsocketRPC):
+    """ asyncio counterpart of
+        :class:`PythonMiddlewareapi.graphenenoderpc.GrapheneNodeRPC`
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(AsyncGrapheneNodeRPC, self).__init__(*args, **kwargs)
+        self.chain_params = None
+
+    async def _connect(self):
+        await super(AsyncGrapheneNodeRPC, self)._connect()
+        if self.chain_params is None:
+            self.chain_params = await self.get_network()
+
+    async def rpcexec(self, payload):
+        """ Execute a call by sending the payload.
+            In here, we mostly deal with Graphene specific error handling
+
+            :param json payload: Payload data
+            :raises RPCError: if the server returns an error
+        """
+        try:
+            return await super(AsyncGrapheneNodeRPC, self).rpcexec(payload)
+        except exceptions.RPCError as e:
+            raise exceptions.translateRPCError(e)
+
+    async def get_account(self, name, **kwargs):
+        """ Get full account details from account name or id
+
+            :param str name: Account name or account id
+        """
+        if len(name.split(".")) == 3:
+            return (await self.get_objects([name]))[0]
+        else:
+            return await self.get_account_by_name(name, **kwargs)
+
+    async def get_asset(self, name, **kwargs):
+        """ Get full asset from name of id
+
+            :param str name: Symbol name or asset id (e.g. 1.3.0)
+        """
+        if len(name.split(".")) == 3:
+            return (await self.get_objects([name], **kwargs))[0]
+        else:
+            return (await self.lookup_asset_symbols([name], **kwargs))[0]
+
+    async def get_object(self, o, **kwargs):
+        """ Get object with id ``o``
+
+            :param str o: Full object id
+        """
+        return (await self.get_objects([o], **kwargs))[0]
+
+    async def get_network(self):
+        """ Identify the connected network. This call returns a
+            dictionary with keys chain_id, core_symbol and prefix
+        """
+        props = await self.get_chain_properties()
+        chain_id = props["chain_id"]
+        for k, v in known_chains.items():
+            if v["chain_id"] == chain_id:
+                return v
+        raise RPCError("Connecting to unknown network!")
@@ -0,0 +1,116 @@
+import json
+import time
+import threading
+from collections import OrderedDict
+
+#: Results that never change
+CACHE_FOREVER = "forever"
+#: Results that never change once their block is irreversible
+CACHE_IRREVERSIBLE = "irreversible"
+
+#: Default policy per method. A number is a time to live in seconds.
+#: Methods that are not listed (or map to ``None``) are never cached.
+default_policies = {
+    "get_chain_properties": CACHE_FOREVER,
+    "get_chain_id": CACHE_FOREVER,
+    "get_config": CACHE_FOREVER,
+    "get_block": CACHE_IRREVERSIBLE,
+    "get_block_header": CACHE_IRREVERSIBLE,
+    "get_transaction": CACHE_IRREVERSIBLE,
+    "get_transaction_by_id": CACHE_IRREVERSIBLE,
+    "get_dynamic_global_properties": None,
+}
+
+
+class ResponseCache(object):
+    """ LRU cache for RPC results, bounded by number of entries and by
+        the size of the (JSON encoded) results
+
+        Results are stored JSON encoded, so every hit returns a fresh
+        copy that callers may modify.
+
+        :param int max_entries: Maximum number of cached results
+        :param int max_bytes: Maximum total size of cached results
+        :param dict policies: Policy per method, merged into
+            ``default_policies``. Use ``CACHE_FOREVER``,
+            ``CACHE_IRREVERSIBLE``, a time to live in seconds or
+            ``None`` (never cache).
+
+        .. code-block:: python
+
+            rpc = GrapheneNodeRPC(url, cache=ResponseCache(
+                policies={"get_dynamic_global_properties": 1}))
+            rpc.get_block(1)
+            rpc.get_block(1)
+            print(rpc.cache.stats())
+    """
+    def __init__(self, max_entries=10000, max_bytes=64 * 1024 * 1024, policies=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.policies = dict(default_policies)
+        self.policies.update(policies or {})
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def policy(self, method):
+        return self.policies.get(method)
+
+    def get(self, key):
+        """ Return ``(True, result)`` on a hit and ``(False, None)``
+            otherwise
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                data, expires = entry
+                if expires is None or expires > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, json.loads(data)
+                self._remove(key)
+            self.misses += 1
+        return False, None
+
+    def put(self, key, result, ttl=None):
+        data = json.dumps(result)
+        if len(data) > self.max_bytes:
+            return
+        expires = time.time() + ttl if ttl else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (data, expires)
+            self._bytes += len(data)
+            while (len(self._entries) > self.max_entries or
+                    self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        data, _ = self._entries.pop(key)
+        self._bytes -= len(data)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """ Hit/miss statistics and current size of the cache
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": float(self.hits) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
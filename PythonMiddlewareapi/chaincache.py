@@ -0,0 +1,59 @@
+import os
+import json
+import threading
+import logging
+from appdirs import user_data_dir
+log = logging.getLogger(__name__)
+
+
+class ChainCache(object):
+    """ Remembers the chain parameters (chain_id, core_symbol, prefix)
+        of every node URL on disk, so that new connections do not need
+        to ask the node for them before they can be used.
+
+        The file lives in the ``PythonMiddleware`` directory of the
+        user's data directory (e.g. ``~/.local/share/PythonMiddleware``)
+        unless ``path`` is given.
+
+        :param str path: Path of the JSON file
+    """
+    appname = "PythonMiddleware"
+    appauthor = "UnitedLabs"
+    filename = "chains.json"
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(
+            user_data_dir(self.appname, self.appauthor), self.filename)
+        self._lock = threading.Lock()
+
+    def _read(self):
+        try:
+            with open(self.path) as fp:
+                return json.load(fp)
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def get(self, url):
+        """ Return the cached chain parameters of ``url`` or ``None``
+        """
+        with self._lock:
+            return self._read().get(url)
+
+    def set(self, url, chain_params):
+        """ Store the chain parameters of ``url``
+        """
+        with self._lock:
+            data = self._read()
+            if data.get(url) == chain_params:
+                return
+            data[url] = chain_params
+            try:
+                directory = os.path.dirname(self.path)
+                if directory and not os.path.isdir(directory):
+                    os.makedirs(directory)
+                tmp = "%s.%d.tmp" % (self.path, os.getpid())
+                with open(tmp, "w") as fp:
+                    json.dump(data, fp)
+                os.replace(tmp, self.path)
+            except (IOError, OSError) as e:
+                log.debug("Could not store chain parameters: %s" % str(e))
@@ -0,0 +1,152 @@
+import ssl
+import zlib
+import threading
+import logging
+import websocket
+from websocket._abnf import ABNF, frame_buffer, continuous_frame
+log = logging.getLogger(__name__)
+
+#: Extension offer sent with the opening handshake (RFC 7692). Only
+#: replies are compressed by the node; requests are sent as they are.
+DEFLATE_OFFER = "Sec-WebSocket-Extensions: permessage-deflate; client_max_window_bits"
+
+
+class DeflateStats(object):
+    """ Counts received messages and bytes, on the wire and after
+        decompression, for one or many connections
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.messages = 0
+        self.compressed_messages = 0
+        self.wire_bytes = 0
+        self.bytes = 0
+
+    def record(self, wire_bytes, size, compressed):
+        with self._lock:
+            self.messages += 1
+            self.compressed_messages += 1 if compressed else 0
+            self.wire_bytes += wire_bytes
+            self.bytes += size
+
+    @property
+    def bytes_saved(self):
+        return self.bytes - self.wire_bytes
+
+    def stats(self):
+        """ Counters and the ratio of bytes saved
+        """
+        return {
+            "messages": self.messages,
+            "compressed_messages": self.compressed_messages,
+            "wire_bytes": self.wire_bytes,
+            "bytes": self.bytes,
+            "bytes_saved": self.bytes_saved,
+            "ratio": float(self.bytes_saved) / self.bytes if self.bytes else 0.0,
+        }
+
+
+class _DeflateFrameBuffer(frame_buffer):
+    """ Frame buffer that accepts the RSV1 bit of compressed frames,
+        which ``websocket-client`` would reject otherwise
+    """
+    compressed = 0
+
+    def recv_header(self):
+        super(_DeflateFrameBuffer, self).recv_header()
+        self.compressed = self.header[1]
+        if self.compressed:
+            self.header = (self.header[0], 0) + self.header[2:]
+
+    def recv_frame(self):
+        frame = super(_DeflateFrameBuffer, self).recv_frame()
+        frame.rsv1 = self.compressed
+        return frame
+
+
+class DeflateWebSocket(websocket.WebSocket):
+    """ ``websocket.WebSocket`` that negotiates permessage-deflate with
+        the node and inflates compressed replies. If the node does not
+        support the extension, it behaves like a plain websocket.
+
+        :param DeflateStats stats: Counters to update (default: new ones)
+    """
+    def __init__(self, stats=None, **kwargs):
+        kwargs["skip_utf8_validation"] = True
+        super(DeflateWebSocket, self).__init__(**kwargs)
+        self.frame_buffer = _DeflateFrameBuffer(self._recv, True)
+        self._init_deflate(stats)
+
+    @classmethod
+    def upgrade(cls, sock, stats=None):
+        """ Turn the connected ``websocket.WebSocket`` ``sock`` (e.g. the
+            one of a ``websocket.WebSocketApp``) into a
+            :class:`DeflateWebSocket`. The handshake must have offered
+            :data:`DEFLATE_OFFER` and nothing must have been received yet.
+        """
+        sock.__class__ = cls
+        sock.frame_buffer = _DeflateFrameBuffer(sock._recv, True)
+        sock.cont_frame = continuous_frame(sock.cont_frame.fire_cont_frame, True)
+        sock._init_deflate(stats)
+        sock._negotiate()
+        return sock
+
+    def _init_deflate(self, stats):
+        self.stats = stats if stats is not None else DeflateStats()
+        self.deflate = False
+        self._decompressor = None
+        self._message_compressed = False
+
+    def connect(self, url, **options):
+        header = options.get("header") or []
+        if isinstance(header, dict):
+            header = [": ".join(h) for h in header.items()]
+        options["header"] = list(header) + [DEFLATE_OFFER]
+        super(DeflateWebSocket, self).connect(url, **options)
+        self._negotiate()
+
+    def _negotiate(self):
+        extensions = (self.headers or {}).get("sec-websocket-extensions", "")
+        self.deflate = "permessage-deflate" in extensions
+        # The default window size of 15 bits also inflates data that
+        # has been compressed with a smaller window
+        self._decompressor = (
+            zlib.decompressobj(-zlib.MAX_WBITS) if self.deflate else None)
+        log.debug("permessage-deflate %s" % (
+            "enabled" if self.deflate else "not supported by the node"))
+
+    def recv_frame(self):
+        frame = super(DeflateWebSocket, self).recv_frame()
+        if frame.opcode in (ABNF.OPCODE_TEXT, ABNF.OPCODE_BINARY):
+            # Only the first frame of a message carries RSV1
+            self._message_compressed = frame.rsv1
+        return frame
+
+    def recv_data_frame(self, control_frame=False):
+        opcode, frame = super(DeflateWebSocket, self).recv_data_frame(control_frame)
+        if opcode in (ABNF.OPCODE_TEXT, ABNF.OPCODE_BINARY):
+            wire_bytes = len(frame.data)
+            if self._message_compressed:
+                if not self.deflate:
+                    raise websocket.WebSocketProtocolException(
+                        "Compressed message without permessage-deflate")
+                frame.data = self._decompressor.decompress(
+                    frame.data + b"\x00\x00\xff\xff")
+            self.stats.record(wire_bytes, len(frame.data), self._message_compressed)
+        return opcode, frame
+
+
+class DeflateTransport(object):
+    """ Transport for :class:`PythonMiddlewareapi.graphenenoderpc.GrapheneWebsocketRPC`
+        that opens :class:`DeflateWebSocket` connections. All
+        connections share the counters in ``self.stats``.
+
+        :param DeflateStats stats: Counters to update (default: new ones)
+    """
+    def __init__(self, stats=None):
+        self.stats = stats if stats is not None else DeflateStats()
+
+    def __call__(self, url):
+        if url[:3] == "wss":
+            return DeflateWebSocket(self.stats, sslopt={'cert_reqs': ssl.CERT_NONE})
+        return DeflateWebSocket(self.stats)
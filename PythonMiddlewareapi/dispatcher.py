@@ -0,0 +1,235 @@
+import os
+import json
+import time
+import tempfile
+import threading
+import traceback
+import logging
+from collections import deque
+log = logging.getLogger(__name__)
+
+#: Wait for room in the queue (backpressure on the websocket)
+OVERFLOW_BLOCK = "block"
+#: Discard the oldest queued event
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+#: Write further events to a file until the workers have caught up
+OVERFLOW_SPILL = "spill"
+
+
+class _SpillFile(object):
+    """ Events of one worker that did not fit into the queue, in order
+    """
+    def __init__(self, directory=None):
+        fd, self.path = tempfile.mkstemp(
+            prefix="notices-", suffix=".jsonl", dir=directory)
+        self._writer = os.fdopen(fd, "w")
+        self._reader = open(self.path)
+        self.enqueued = deque()
+
+    def __len__(self):
+        return len(self.enqueued)
+
+    def push(self, item):
+        self._writer.write(json.dumps(item[1:]) + "\n")
+        self._writer.flush()
+        self.enqueued.append(item[0])
+
+    def pop(self):
+        key, name, payload = json.loads(self._reader.readline())
+        return (self.enqueued.popleft(), key, name, payload)
+
+    def close(self):
+        self._writer.close()
+        self._reader.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class _Worker(object):
+    def __init__(self, lock):
+        self.queue = deque()
+        self.spill = None
+        self.ready = threading.Condition(lock)
+        self.thread = None
+
+    def oldest(self):
+        if self.queue:
+            return self.queue[0][0]
+        if self.spill is not None and len(self.spill):
+            return self.spill.enqueued[0]
+
+
+class EventDispatcher(object):
+    """ Bounded queue of events that are handed to a pool of worker
+        threads, so that slow event handlers do not block the thread
+        that receives them
+
+        Every event has a key (e.g. an object id). Events with the same
+        key are always handled by the same worker, one after another,
+        in the order they were submitted.
+
+        :param callable handler: Called as ``handler(name, payload)``
+            for every event
+        :param int workers: Number of worker threads (default: 1)
+        :param int max_queue: Maximum number of queued events
+            (default: 10000)
+        :param str overflow: What to do with new events if the queue is
+            full: ``OVERFLOW_BLOCK`` (default), ``OVERFLOW_DROP_OLDEST``
+            or ``OVERFLOW_SPILL``
+        :param str spill_dir: Directory for spilled events (default:
+            the temp directory)
+
+        .. code-block:: python
+
+            dispatcher = EventDispatcher(handle, workers=4, overflow=OVERFLOW_SPILL)
+            dispatcher.submit("1.2.100", "on_object", notice)
+            print(dispatcher.metrics())
+    """
+    def __init__(self, handler, workers=1, max_queue=10000,
+                 overflow=OVERFLOW_BLOCK, spill_dir=None):
+        if overflow not in (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_SPILL):
+            raise ValueError("Unknown overflow policy %s" % overflow)
+        self.handler = handler
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.spill_dir = spill_dir
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._workers = [_Worker(self._lock) for _ in range(max(1, workers))]
+        self._depth = 0
+        self._running = False
+        self.dispatched = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.errors = 0
+        self.last_lag = 0.0
+
+    def start(self):
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            for worker in self._workers:
+                worker.thread = threading.Thread(target=self._run, args=(worker,))
+                worker.thread.daemon = True
+                worker.thread.start()
+
+    def stop(self, wait=True):
+        """ Stop the workers. With ``wait``, the events that are still
+            queued are handled first.
+        """
+        with self._lock:
+            self._running = False
+            for worker in self._workers:
+                worker.ready.notify_all()
+            self._not_full.notify_all()
+        if wait:
+            for worker in self._workers:
+                if worker.thread is not None:
+                    worker.thread.join()
+
+    def submit(self, key, name, payload):
+        """ Queue the event ``name`` with ``payload`` for the worker of
+            ``key``
+        """
+        if not self._running:
+            self.start()
+        worker = self._workers[hash(key) % len(self._workers)]
+        item = (time.time(), key, name, payload)
+        with self._lock:
+            if worker.spill is not None:
+                # Keep the order: once spilled, everything spills until
+                # the worker has caught up
+                self._spill(worker, item)
+                return
+            if self._depth >= self.max_queue:
+                if self.overflow == OVERFLOW_BLOCK:
+                    while self._depth >= self.max_queue and self._running:
+                        self._not_full.wait()
+                elif self.overflow == OVERFLOW_DROP_OLDEST:
+                    self._drop_oldest()
+                else:
+                    self._spill(worker, item)
+                    return
+            worker.queue.append(item)
+            self._depth += 1
+            worker.ready.notify()
+
+    def _spill(self, worker, item):
+        if worker.spill is None:
+            log.warning("Event queue is full, spilling events to disk")
+            worker.spill = _SpillFile(self.spill_dir)
+        worker.spill.push(item)
+        self.spilled += 1
+        worker.ready.notify()
+
+    def _drop_oldest(self):
+        queues = [w.queue for w in self._workers if w.queue]
+        oldest = min(queues, key=lambda q: q[0][0])
+        item = oldest.popleft()
+        self._depth -= 1
+        self.dropped += 1
+        log.debug("Event queue is full, dropping %s of %s" % (item[2], item[1]))
+
+    def _next(self, worker):
+        """ Next event of ``worker`` or ``None`` once stopped
+        """
+        with self._lock:
+            while True:
+                if worker.queue:
+                    self._depth -= 1
+                    self._not_full.notify()
+                    return worker.queue.popleft()
+                if worker.spill is not None:
+                    if len(worker.spill):
+                        return worker.spill.pop()
+                    worker.spill.close()
+                    worker.spill = None
+                if not self._running:
+                    return None
+                worker.ready.wait()
+
+    def _run(self, worker):
+        while True:
+            item = self._next(worker)
+            if item is None:
+                return
+            enqueued, key, name, payload = item
+            lag = time.time() - enqueued
+            failed = False
+            try:
+                self.handler(name, payload)
+            except Exception as e:
+                failed = True
+                log.critical("Error in {}: {}\n\n{}".format(
+                    name, str(e), traceback.format_exc()))
+            with self._lock:
+                self.last_lag = lag
+                self.dispatched += 1
+                self.errors += 1 if failed else 0
+
+    def metrics(self):
+        """ Queue depth, lag and counters
+
+            * ``depth``: events queued in memory
+            * ``spill_depth``: events waiting on disk
+            * ``lag``: age of the oldest waiting event in seconds
+            * ``last_lag``: time the last handled event has waited
+        """
+        now = time.time()
+        with self._lock:
+            oldest = [w.oldest() for w in self._workers]
+            oldest = [t for t in oldest if t is not None]
+            return {
+                "depth": self._depth,
+                "spill_depth": sum(len(w.spill) for w in self._workers if w.spill),
+                "max_queue": self.max_queue,
+                "lag": now - min(oldest) if oldest else 0.0,
+                "last_lag": self.last_lag,
+                "dispatched": self.dispatched,
+                "dropped": self.dropped,
+                "spilled": self.spilled,
+                "errors": self.errors,
+            }
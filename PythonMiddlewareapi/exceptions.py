@@ -20,6 +20,22 @@ def decodeRPCErrorMsg(e):
         return str(e)
 
 
+def translateRPCError(e):
+    """ Helper function that maps a raw ``RPCError`` onto the more
+        specific exception classes below. Returns the exception to
+        raise.
+    """
+    msg = decodeRPCErrorMsg(e).strip()
+    if msg == "missing required active authority":
+        return MissingRequiredActiveAuthority()
+    elif re.match("^no method with name.*", msg):
+        return NoMethodWithName(msg)
+    elif msg:
+        return UnhandledRPCError(msg)
+    else:
+        return e
+
+
 class RPCError(Exception):
     pass
 
@@ -38,3 +54,7 @@ class UnhandledRPCError(RPCError):
 
 class NumRetriesReached(Exception):
     pass
+
+
+class DeadlineExceeded(NumRetriesReached):
+    pass
@@ -5,14 +5,51 @@ import websocket
 import ssl
 import json
 import time
+import random
+import concurrent.futures
+from contextlib import contextmanager
 from itertools import cycle
 # from grapheneapi.graphenewsrpc import GrapheneWebsocketRPC
-from .exceptions import RPCError
+from .exceptions import RPCError, NumRetriesReached, DeadlineExceeded
+from .nodepool import NodePool
+from .loader import Coalescer
+from .cache import ResponseCache, CACHE_FOREVER, CACHE_IRREVERSIBLE
+from .chaincache import ChainCache
+from .replay import websocket_transport
+from .jsoncodec import default_codec
+from .compression import DeflateTransport
+from .limiter import AdaptiveLimiter
 from PythonMiddlewarebase.chains import known_chains
 from . import exceptions
 import logging
 log = logging.getLogger(__name__)
 
+#: Idempotent read calls that may be hedged across nodes. Anything that
+#: changes state (e.g. ``broadcast_transaction``) must never be listed.
+HEDGEABLE_METHODS = frozenset([
+    "get_objects",
+    "get_block",
+    "get_block_header",
+    "get_transaction",
+    "get_transaction_by_id",
+    "get_chain_properties",
+    "get_global_properties",
+    "get_dynamic_global_properties",
+    "get_account_by_name",
+    "get_accounts",
+    "get_full_accounts",
+    "lookup_account_names",
+    "lookup_asset_symbols",
+    "get_account_balances",
+    "get_named_account_balances",
+    "get_limit_orders",
+    "get_call_orders",
+    "get_settle_orders",
+    "get_order_book",
+    "get_ticker",
+    "get_account_history",
+])
+
 
 class GrapheneWebsocketRPC(object):
     """ This class allows to call API methods synchronously, without
@@ -21,11 +58,85 @@ class GrapheneWebsocketRPC(object):
         * database
         * history
 
-        :param str urls: Either a single Websocket URL, or a list of URLs
+        :param urls: Either a single Websocket URL, a list of URLs, or
+            a dict of URLs (or lists of URLs) by API (see below)
         :param str user: Username for Authentication
         :param str password: Password for Authentication
         :param Array apis: List of APIs to register to (default: ["database", "network_broadcast"])
         :param int num_retries: Try x times to num_retries to a node on disconnect, -1 for indefinitely
+        :param float timeout: Deadline of every call in seconds, ``None``
+            (default) to retry as long as ``num_retries`` allows
+        :param int max_connections: Maximum number of websocket connections
+            kept in the connection pool (default: 8)
+        :param int health_check_interval: Seconds between pings of all
+            nodes if more than one URL is given, ``0`` to disable
+            (default: 30)
+        :param bool hedge: Hedge idempotent reads (see below) (default: False)
+        :param float hedge_percentile: Latency percentile of the primary
+            node after which a read is hedged (default: 95)
+        :param float hedge_delay: Hedging delay in seconds as long as too
+            few latency samples are known (default: 0.25)
+        :param bool json_batch: Whether :meth:`batch` may send JSON-RPC
+            array frames. ``None`` (default) probes every node once.
+        :param cache: ``True`` or a
+            :class:`PythonMiddlewareapi.cache.ResponseCache` to cache
+            results of immutable calls such as irreversible blocks
+            (default: ``False``)
+        :param bool compression: Negotiate permessage-deflate with the
+            nodes (default: True). ``self.compression_stats`` counts the
+            bytes saved.
+        :param callable transport: Factory that returns an unconnected
+            websocket for a URL, e.g.
+            :class:`PythonMiddlewareapi.replay.ReplayTransport` to run
+            against a recording instead of a node
+        :param json_codec: :class:`PythonMiddlewareapi.jsoncodec.JSONCodec`
+            to encode requests and decode replies with (default: the
+            fastest JSON module installed)
+        :param limiter: ``True`` or a
+            :class:`PythonMiddlewareapi.limiter.AdaptiveLimiter` to adapt
+            the number of outstanding calls per node and API to the
+            load of the nodes (default: ``False``)
+
+        If several URLs are provided, they are kept in a
+        :class:`PythonMiddlewareapi.nodepool.NodePool` (``self.nodes``)
+        that scores every node by latency, error rate and block lag.
+        Calls are sent to the best healthy node, and connections to
+        ejected nodes are closed.
+
+        With a dict of URLs, calls are routed to a separate set of
+        nodes by their ``api`` kwarg, e.g. to send broadcasts to
+        low-latency nodes and history queries to full-history nodes:
+
+        .. code-block:: python
+
+            ws = GrapheneWebsocketRPC({
+                "database": ["ws://10.0.0.16:8090", "ws://10.0.0.17:8090"],
+                "network_broadcast": "ws://10.0.0.20:8090",
+                "history": "ws://10.0.0.30:8090",
+            })
+
+        The ``database`` nodes (required) serve all other calls. Every
+        set of nodes has its own :class:`PythonMiddlewareapi.nodepool.NodePool`
+        in ``self.routes`` (``self.nodes`` for ``database``), and only
+        reads on the ``database`` nodes are hedged.
+
+        With ``hedge=True`` (or ``hedge=True`` passed to a single call),
+        reads listed in ``HEDGEABLE_METHODS`` are sent to a second node
+        if the primary node has not answered within its
+        ``hedge_percentile`` latency. The first answer wins, the other
+        one is discarded. Other calls are never hedged.
+
+        With ``limiter=True``, calls wait until the node and API they
+        go to have room for another outstanding call. The limit grows
+        while calls succeed and shrinks when they fail or their latency
+        rises (``self.limiter.limit(url, api)``).
+
+        ``timeout`` and ``num_retries`` can also be given to a single
+        call (e.g. ``rpc.get_block(1, timeout=2)``) and only apply to
+        that call. If a connection breaks during a call, a background
+        thread opens a new one (with jittered backoff) while the call
+        waits for it at most until its deadline and then raises
+        :class:`PythonMiddlewareapi.exceptions.DeadlineExceeded`.
 
         Available APIs
 
@@ -45,59 +156,522 @@ class GrapheneWebsocketRPC(object):
                   websocket. If you want to use the notification
                   subsystem, please use ``GrapheneWebsocket`` instead.
 
+        .. note:: Instances are thread-safe. Every call checks out a
+                  connection from a pool for its whole duration, so
+                  replies can not get mixed up between threads. Calls
+                  made while a thread already holds a connection (e.g.
+                  inside :meth:`connection`) reuse that connection.
+
     """
+    #: Seconds between fetches of the last irreversible block for the
+    #: response cache
+    irreversible_refresh = 3
+
     def __init__(self, urls, user="", password="", **kwargs):
-        self.api_id = {}
         self._request_id = 0
-        if isinstance(urls, list):
-            self.urls = cycle(urls)
-        else:
-            self.urls = cycle([urls])
+        self._request_id_lock = threading.Lock()
+        self._local = threading.local()
+        self._idle = []
+        self._num_connections = 0
+        self._pool_condition = threading.Condition()
+        self.max_connections = kwargs.get("max_connections", 8)
+        routes = {}
+        if isinstance(urls, dict):
+            routes = dict(urls)
+            if "database" not in routes:
+                raise ValueError("No nodes given for the database API")
+            urls = routes.pop("database")
+        if not isinstance(urls, list):
+            urls = [urls]
+        self.urls = cycle(urls)
         self.user = user
         self.password = password
         self.num_retries = kwargs.get("num_retries", -1)
+        self.timeout = kwargs.get("timeout", None)
+        self._spare = []
+        self._waiting = {}
+        self._reconnecting = set()
+        self._api_names = set()
+        self.hedge = kwargs.get("hedge", False)
+        self.hedge_percentile = kwargs.get("hedge_percentile", 95)
+        self.hedge_delay = kwargs.get("hedge_delay", 0.25)
+        self._hedge_executor = None
+        self.json_batch = kwargs.get("json_batch", None)
+        self._json_batch_support = {}
+        self._irreversible_checked = 0
+        cache = kwargs.get("cache", False)
+        if cache is True:
+            cache = ResponseCache()
+        self.cache = cache if cache is not False else None
+        self.transport = kwargs.get("transport", None)
+        self.compression_stats = None
+        if self.transport is None:
+            if kwargs.get("compression", True):
+                self.transport = DeflateTransport()
+                self.compression_stats = self.transport.stats
+            else:
+                self.transport = websocket_transport
+        self.json_codec = kwargs.get("json_codec", default_codec)
+        limiter = kwargs.get("limiter", False)
+        if limiter is True:
+            limiter = AdaptiveLimiter()
+        self.limiter = limiter if limiter is not False else None
+        # Pings go through the same transport and codec as calls
+        self.nodes = NodePool(
+            urls, transport=self.transport, json_codec=self.json_codec)
+        self.routes = dict(
+            (api, NodePool(
+                route_urls, transport=self.transport,
+                json_codec=self.json_codec))
+            for api, route_urls in routes.items())
+
+        health_check_interval = kwargs.get("health_check_interval", 30)
+        if health_check_interval:
+            for nodes in self._pools():
+                if len(nodes) > 1:
+                    nodes.start(health_check_interval)
+
+        # Open the first connection right away, within ``timeout``
+        with self._scope({}), self.connection():
+            pass
+
+    def _pools(self):
+        return [self.nodes] + list(self.routes.values())
 
-        self.wsconnect()
-        self.register_apis()
+    @property
+    def last_irreversible_block_num(self):
+        """ Highest last irreversible block any node has reported, in
+            a reply to a call or to a ping
+        """
+        return max(nodes.last_irreversible_block_num for nodes in self._pools())
+
+    def _route(self, api):
+        """ Nodes that serve calls to ``api``
+        """
+        return self.routes.get(api, self.nodes)
+
+    @property
+    def _pool(self):
+        """ Nodes of the connection held by the calling thread
+        """
+        conn = getattr(self._local, "connection", None)
+        return conn.nodes if conn is not None else self.nodes
 
     def get_request_id(self):
-        self._request_id += 1
-        return self._request_id
+        with self._request_id_lock:
+            self._request_id += 1
+            return self._request_id
+
+    @contextmanager
+    def _scope(self, kwargs):
+        """ Apply ``timeout`` and ``num_retries`` of a call to the
+            calling thread until the call returns. Nested calls (e.g.
+            the registration of an API) share the deadline of the
+            outer call.
+        """
+        outer = getattr(self._local, "scope", None)
+        if outer is None:
+            deadline, num_retries = None, self.num_retries
+            timeout = kwargs.get("timeout", self.timeout)
+        else:
+            deadline, num_retries = outer
+            timeout = kwargs.get("timeout")
+        if timeout is not None:
+            deadline = min(deadline or float("inf"), time.time() + timeout)
+        self._local.scope = (deadline, kwargs.get("num_retries", num_retries))
+        try:
+            yield
+        finally:
+            self._local.scope = outer
+
+    @contextmanager
+    def _limited(self, api, weight=1):
+        """ Hold ``weight`` outstanding calls to ``api`` on the node of
+            the current connection. Nested calls (e.g. the registration
+            of an API) are part of the outer call.
+
+            :raises DeadlineExceeded: if the deadline of the call passes
+                while waiting
+        """
+        if self.limiter is None or getattr(self._local, "limited", False):
+            yield
+            return
+        permit = self.limiter.acquire(
+            self.url, api, weight, timeout=self._remaining())
+        if permit is None:
+            raise DeadlineExceeded()
+        self._local.limited = True
+        start = time.time()
+        # Errors raised on this side (e.g. an unknown API) say nothing
+        # about the load of the node
+        ok = None
+        try:
+            yield
+            ok = True
+        except RPCError:
+            # The node has answered
+            ok = True
+            raise
+        except (NumRetriesReached, websocket.WebSocketException, OSError):
+            # The node has failed or stalled
+            ok = False
+            raise
+        finally:
+            self._local.limited = False
+            self.limiter.release(permit, time.time() - start, ok)
+
+    def _num_retries(self):
+        scope = getattr(self._local, "scope", None)
+        return scope[1] if scope else self.num_retries
+
+    def _remaining(self):
+        """ Seconds until the deadline of the current call, or ``None``
+
+            :raises DeadlineExceeded: if the deadline has passed
+        """
+        scope = getattr(self._local, "scope", None)
+        if not scope or scope[0] is None:
+            return None
+        remaining = scope[0] - time.time()
+        if remaining <= 0:
+            raise DeadlineExceeded()
+        return remaining
+
+    def _backoff(self, cnt):
+        """ Seconds to wait before attempt ``cnt``, with jitter so that
+            many threads do not hit a recovering node at the same time
+        """
+        return min((cnt - 1) * 2, 10) * random.uniform(0.5, 1.0)
+
+    def _settimeout(self, timeout):
+        conn = self._local.connection
+        if conn.timeout != timeout:
+            conn.ws.settimeout(timeout)
+            conn.timeout = timeout
+
+    def _current_connection(self):
+        """ Connection held by the calling thread, or, outside of a
+            call, the most recently used idle connection
+        """
+        conn = getattr(self._local, "connection", None)
+        if conn is None and self._idle:
+            conn = self._idle[-1]
+        return conn
+
+    @property
+    def ws(self):
+        conn = self._current_connection()
+        return conn.ws if conn else None
+
+    @ws.setter
+    def ws(self, ws):
+        self._local.connection.ws = ws
+
+    @property
+    def url(self):
+        conn = self._current_connection()
+        return conn.url if conn else None
+
+    @url.setter
+    def url(self, url):
+        self._local.connection.url = url
+
+    @property
+    def api_id(self):
+        conn = self._current_connection()
+        return conn.api_id if conn else {}
+
+    @contextmanager
+    def connection(self, url=None, api=None):
+        """ Check out a connection to the best node from the pool for the
+            calling thread. A new connection is opened (and its APIs
+            registered) if there is no idle connection to that node. If
+            ``max_connections`` has been reached, an idle connection to
+            another node is closed to make room, or this waits for
+            another thread to return its connection.
+
+            :param str url: Use this node instead of the best one
+            :param str api: Use the nodes that serve this API
+            :raises DeadlineExceeded: if no connection could be opened
+                before the deadline of the current call
+
+            Within a deadline, new connections are opened by the
+            background reconnector, so that a node that does not answer
+            can not block the call beyond its deadline.
+        """
+        nodes = self._route(api)
+        outer = getattr(self._local, "connection", None)
+        if outer is not None and (api is None or outer.nodes is nodes):
+            # Re-entrant use within the same thread
+            yield outer
+            return
+
+        url = url or nodes.best()
+        stale = None
+        with self._pool_condition:
+            while True:
+                conn = self._pop_idle(url)
+                if conn is not None:
+                    break
+                if self._num_connections < self.max_connections:
+                    # Prefer a connection the reconnector opened ahead
+                    conn = self._pop_spare(nodes) or RPCConnection(nodes)
+                    self._num_connections += 1
+                    break
+                if self._idle:
+                    stale = self._idle.pop(0)
+                    conn = RPCConnection(nodes)
+                    break
+                self._pool_condition.wait()
+        if stale is not None:
+            stale.close()
+
+        self._local.connection = conn
+        try:
+            if conn.ws is None:
+                self._open(conn, url)
+            yield conn
+        finally:
+            # Calls routed to other nodes hand the connection of the
+            # enclosing call back afterwards
+            self._local.connection = outer
+            with self._pool_condition:
+                if (conn.ws is not None and conn.ws.connected and
+                        conn.nodes.is_healthy(conn.url)):
+                    self._idle.append(conn)
+                else:
+                    # Broken connections are dropped from the pool
+                    conn.close()
+                    self._num_connections -= 1
+                self._pool_condition.notify()
+
+    def _open(self, conn, url):
+        """ Connect ``conn`` to ``url``. Without a deadline, this
+            retries as often as ``num_retries`` allows. Otherwise it
+            waits for the background reconnector at most until the
+            deadline.
 
-    def wsconnect(self):
+            :raises DeadlineExceeded: if the deadline passes first
+        """
+        remaining = self._remaining()
+        if remaining is None:
+            self.wsconnect(url)
+            return
+        spare = self._wait_for_spare(remaining, conn.nodes)
+        if spare is None:
+            raise DeadlineExceeded()
+        conn.ws, conn.url, conn.timeout = spare.ws, spare.url, spare.timeout
+        conn.api_id, conn.logged_in = spare.api_id, spare.logged_in
+
+    def _pop_idle(self, url):
+        """ Take the most recently used idle connection to ``url``
+        """
+        for i in range(len(self._idle) - 1, -1, -1):
+            if self._idle[i].url == url:
+                return self._idle.pop(i)
+
+    def _pop_spare(self, nodes):
+        """ Take a connection to one of ``nodes`` opened by the
+            reconnector
+        """
+        for i in range(len(self._spare) - 1, -1, -1):
+            if self._spare[i].nodes is nodes:
+                return self._spare.pop(i)
+
+    def close(self):
+        """ Close all idle connections of the pool and stop the health
+            checks of the nodes
+        """
+        for nodes in self._pools():
+            nodes.stop()
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+            self._hedge_executor = None
+        with self._pool_condition:
+            idle, self._idle = self._idle, []
+            self._num_connections -= len(idle)
+            spare, self._spare = self._spare, []
+        for conn in idle + spare:
+            conn.close()
+
+    def wsconnect(self, url=None):
+        nodes = self._pool
         cnt = 0
+        tried = []
         while True:
             cnt += 1
-            self.url = next(self.urls)
-            log.debug("Trying to connect to node %s" % self.url)
-            if self.url[:3] == "wss":
-                sslopt_ca_certs = {'cert_reqs': ssl.CERT_NONE}
-                self.ws = websocket.WebSocket(sslopt=sslopt_ca_certs)
+            if len(tried) >= len(nodes):
+                tried = []
+            if cnt == 1 and url:
+                self.url = url
             else:
-                self.ws = websocket.WebSocket()
+                self.url = nodes.best(exclude=tried)
+            tried.append(self.url)
+            log.debug("Trying to connect to node %s" % self.url)
+            self.ws = self.transport(self.url)
+            remaining = self._remaining()
             try:
-                self.ws.connect(self.url)
+                if remaining is None:
+                    self.ws.connect(self.url)
+                else:
+                    self.ws.connect(self.url, timeout=remaining)
                 break
             except KeyboardInterrupt:
                 raise
             except:
-                if (self.num_retries >= 0 and cnt > self.num_retries):
+                nodes.record(self.url, None, False)
+                num_retries = self._num_retries()
+                if (num_retries >= 0 and cnt > num_retries):
                     raise NumRetriesReached()
 
-                sleeptime = (cnt - 1) * 2 if cnt < 10 else 10
+                sleeptime = self._backoff(cnt)
+                remaining = self._remaining()
+                if remaining is not None and sleeptime >= remaining:
+                    raise DeadlineExceeded()
                 if sleeptime:
                     log.warning(
                         "Lost connection to node during wsconnect(): %s (%d/%d) "
-                        % (self.url, cnt, self.num_retries) +
-                        "Retrying in %d seconds" % sleeptime
+                        % (self.url, cnt, num_retries) +
+                        "Retrying in %.1f seconds" % sleeptime
                     )
                     time.sleep(sleeptime)
-        self.login(self.user, self.password, api_id=1)
+
+        # Login and API registration happen lazily on first use of an
+        # API (see ``register_api``)
+        self._local.connection.api_id = {}
+        self._local.connection.logged_in = False
+        self._local.connection.timeout = remaining
+
+    def _recover(self, cnt, method, payloads):
+        """ Handle a broken connection during a call: drop it, let the
+            background reconnector open a new one and wait for it at
+            most until the deadline of the call. The API ids in
+            ``payloads`` are updated to those of the new connection.
+
+            :raises NumRetriesReached: if the call is out of retries
+            :raises DeadlineExceeded: if the deadline of the call has passed
+        """
+        conn = self._local.connection
+        conn.nodes.record(conn.url, None, False)
+        conn.close()
+        num_retries = self._num_retries()
+        if (num_retries > -1 and cnt > num_retries):
+            raise NumRetriesReached()
+        wait = self._backoff(cnt + 1)
+        remaining = self._remaining()
+        if remaining is not None:
+            wait = min(wait, remaining)
+        log.warning(
+            "Lost connection to node during %s(): %s (%d/%d) "
+            % (method, conn.url, cnt, num_retries) +
+            "Waiting up to %.1f seconds for a new connection" % wait
+        )
+        spare = self._wait_for_spare(wait, conn.nodes)
+        if spare is None:
+            return
+
+        old_api_id = conn.api_id
+        conn.ws, conn.url, conn.timeout = spare.ws, spare.url, spare.timeout
+        conn.api_id, conn.logged_in = spare.api_id, spare.logged_in
+        ids = {}
+        for name, api_id in old_api_id.items():
+            if not api_id:
+                continue
+            if name not in conn.api_id:
+                # Registered after the reconnector started
+                try:
+                    self.register_api(name)
+                except RPCError:
+                    continue
+            ids[api_id] = conn.api_id[name]
+        for payload in payloads:
+            if ids.get(payload["params"][0]):
+                payload["params"][0] = ids[payload["params"][0]]
+
+    def _wait_for_spare(self, timeout, nodes):
+        """ Wait up to ``timeout`` seconds for a connection to one of
+            ``nodes`` opened by the background reconnector
+        """
+        end = time.time() + timeout
+        with self._pool_condition:
+            self._waiting[nodes] = self._waiting.get(nodes, 0) + 1
+            try:
+                if nodes not in self._reconnecting:
+                    self._reconnecting.add(nodes)
+                    reconnector = threading.Thread(
+                        target=self._reconnect, args=(nodes,))
+                    reconnector.daemon = True
+                    reconnector.start()
+                while True:
+                    spare = self._pop_spare(nodes)
+                    if spare is not None:
+                        return spare
+                    remaining = end - time.time()
+                    if remaining <= 0:
+                        return None
+                    self._pool_condition.wait(remaining)
+            finally:
+                self._waiting[nodes] -= 1
+
+    def _reconnect(self, nodes):
+        """ Open connections to the best of ``nodes`` (and register the
+            APIs in use) for as long as calls are waiting for one
+        """
+        cnt = 0
+        tried = []
+        while True:
+            with self._pool_condition:
+                spares = len([c for c in self._spare if c.nodes is nodes])
+                if self._waiting.get(nodes, 0) <= spares:
+                    self._reconnecting.discard(nodes)
+                    return
+            cnt += 1
+            if len(tried) >= len(nodes):
+                tried = []
+            url = nodes.best(exclude=tried)
+            tried.append(url)
+            conn = RPCConnection(nodes)
+            self._local.connection = conn
+            # A node that accepts the connection but never answers must
+            # not keep the reconnector from trying the other nodes
+            self._local.scope = (
+                time.time() + self.timeout if self.timeout else None, 0)
+            try:
+                self.wsconnect(url)
+                for name in list(self._api_names):
+                    self.register_api(name)
+            except Exception as e:
+                log.debug("Reconnecting to %s failed: %s" % (url, str(e)))
+                conn.close()
+                time.sleep(self._backoff(cnt + 1))
+                continue
+            finally:
+                self._local.connection = None
+                self._local.scope = None
+            cnt = 0
+            tried = []
+            with self._pool_condition:
+                self._spare.append(conn)
+                self._pool_condition.notify_all()
+
+    def register_api(self, name):
+        """ Register to the API ``name`` (e.g. ``history``) on the
+            current connection and return its id. This logs in first if
+            necessary. APIs are registered automatically on the first
+            call that uses them through ``api=name``.
+        """
+        with self.connection() as conn:
+            if not conn.logged_in:
+                self.login(self.user, self.password, api_id=1)
+                conn.logged_in = True
+            self._api_names.add(name)
+            self.api_id[name] = self._method(name)(api_id=1)
+            return self.api_id[name]
 
     def register_apis(self):
-        self.api_id["database"] = self.database(api_id=1)
-        self.api_id["history"] = self.history(api_id=1)
-        self.api_id["network_broadcast"] = self.network_broadcast(api_id=1)
+        self.register_api("database")
+        self.register_api("history")
+        self.register_api("network_broadcast")
 
     """ RPC Calls
     """
@@ -108,47 +682,214 @@ class GrapheneWebsocketRPC(object):
             :raises ValueError: if the server does not respond in proper JSON format
             :raises RPCError: if the server returns an error
         """
-        log.debug(json.dumps(payload))
+        with self.connection():
+            return self._rpcexec(payload)
+
+    def _send(self, payload):
+        data = self.json_codec.dumps(payload)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(data.decode('utf8'))
+        self.ws.send(data)
+
+    def _rpcexec(self, payload):
         cnt = 0
         while True:
             cnt += 1
 
             try:
-                self.ws.send(json.dumps(payload, ensure_ascii=False).encode('utf8'))
-                reply = self.ws.recv()
+                start = time.time()
+                self._send(payload)
+                ret = self._recv(payload["id"])
+                self._record(payload, ret, time.time() - start)
                 break
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, ValueError, NumRetriesReached):
                 raise
             except:
-                if (self.num_retries > -1 and
-                        cnt > self.num_retries):
-                    raise NumRetriesReached()
-                sleeptime = (cnt - 1) * 2 if cnt < 10 else 10
-                if sleeptime:
-                    log.warning(
-                        "Lost connection to node during rpcexec(): %s (%d/%d) "
-                        % (self.url, cnt, self.num_retries) +
-                        "Retrying in %d seconds" % sleeptime
-                    )
-                    time.sleep(sleeptime)
+                self._recover(cnt, "rpcexec", [payload])
 
-                # retry
-                try:
-                    self.ws.close()
-                    time.sleep(sleeptime)
-                    self.wsconnect()
-                    self.register_apis()
-                except:
-                    pass
+        return self._get_result(ret)
+
+    def _recv(self, request_ids):
+        """ Receive and decode replies until one for ``request_ids``
+            (a single id or a collection of ids) arrives. Late replies to
+            earlier (failed) requests are skipped.
 
-        ret = {}
+            :raises ValueError: if the server does not respond in proper JSON format
+        """
+        if not isinstance(request_ids, (set, frozenset, dict)):
+            request_ids = {request_ids}
+        while True:
+            self._settimeout(self._remaining())
+            reply = self.ws.recv()
+            if not reply:
+                # The node closed the connection
+                raise websocket.WebSocketConnectionClosedException(
+                    "Connection closed by %s" % self.url)
+            try:
+                ret = self.json_codec.loads(reply)
+            except ValueError:
+                raise ValueError("Client returned invalid format. Expected JSON!")
+
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(reply)
+
+            if isinstance(ret, dict) and ret.get("id") in request_ids:
+                return ret
+            log.debug("Skipping reply to request %s" % (
+                ret.get("id") if isinstance(ret, dict) else None))
+
+    def rpcexec_many(self, payloads, batch=False):
+        """ Execute several calls by sending all payloads back-to-back
+            and collecting the replies by their request id afterwards
+            (pipelining). This costs one round trip instead of one per
+            call.
+
+            :param list payloads: List of payloads
+            :param bool batch: Pack all payloads into a single JSON-RPC
+                array frame if the node supports it
+            :returns: List of results in the order of ``payloads``.
+                Calls that failed are represented by their ``RPCError``
+                instance instead of a result.
+            :raises ValueError: if the server does not respond in proper JSON format
+        """
+        with self.connection():
+            if batch and len(payloads) > 1 and self._supports_json_batch():
+                results = self._rpcexec_batch(payloads)
+                if results is not None:
+                    return results
+            return self._rpcexec_many(payloads)
+
+    def _supports_json_batch(self):
+        if self.json_batch is not None:
+            return self.json_batch
+        return self._json_batch_support.get(self.url, True)
+
+    def _rpcexec_batch(self, payloads):
+        """ Send all payloads as one JSON-RPC array frame. Returns
+            ``None`` if the node does not support batches, in which case
+            the caller falls back to pipelining.
+
+            A node is only marked as not supporting batches once it has
+            answered the array frame with an error. If it does not
+            answer in time or drops the connection, the next batch
+            probes it again.
+        """
+        probing = self.json_batch is None and self.url not in self._json_batch_support
+        ids = set(p["id"] for p in payloads)
         try:
-            ret = json.loads(reply, strict=False)
-        except ValueError:
-            raise ValueError("Client returned invalid format. Expected JSON!")
+            start = time.time()
+            timeout = self._remaining()
+            if probing:
+                timeout = min(timeout or 5, 5)
+            end = time.time() + timeout if timeout is not None else None
+            self._send(payloads)
+            while True:
+                self._settimeout(
+                    max(end - time.time(), 0.001) if end is not None else None)
+                reply = self.ws.recv()
+                if not reply:
+                    raise websocket.WebSocketConnectionClosedException(
+                        "Connection closed by %s" % self.url)
+                ret = self.json_codec.loads(reply)
+                if isinstance(ret, list):
+                    break
+                if (isinstance(ret, dict) and "error" in ret and
+                        ret.get("id") in ids | {None}):
+                    break
+                # Late reply to an earlier (failed) request
+                log.debug("Skipping reply to request %s" % (
+                    ret.get("id") if isinstance(ret, dict) else None))
+        except (KeyboardInterrupt, NumRetriesReached):
+            raise
+        except Exception as e:
+            if probing:
+                log.debug("JSON-RPC batch probe of %s failed: %s" % (self.url, str(e)))
+            # Pipelining retries the calls on the new connection
+            self._recover(1, "rpcexec_batch", payloads)
+            return None
+
+        if not isinstance(ret, list):
+            log.debug("Node %s does not support JSON-RPC batches" % self.url)
+            self._json_batch_support[self.url] = False
+            return None
+        self._json_batch_support[self.url] = True
+        replies = dict(
+            (r.get("id"), r) for r in ret if isinstance(r, dict))
+        head_block_number = last_irreversible_block_num = None
+        for payload in payloads:
+            if payload["id"] in replies:
+                head, irreversible = self._properties(
+                    payload, replies[payload["id"]])
+                head_block_number = head or head_block_number
+                last_irreversible_block_num = (
+                    irreversible or last_irreversible_block_num)
+        self._pool.record(
+            self.url, time.time() - start, True, head_block_number,
+            last_irreversible_block_num)
+
+        results = {}
+        for r in replies.values():
+            try:
+                results[r.get("id")] = self._get_result(r)
+            except RPCError as e:
+                results[r.get("id")] = e
+        return [
+            results.get(p["id"], RPCError("No reply for request %d" % p["id"]))
+            for p in payloads]
+
+    def _rpcexec_many(self, payloads):
+        results = {}
+        cnt = 0
+        while True:
+            cnt += 1
+            missing = [p for p in payloads if p["id"] not in results]
+            if not missing:
+                break
+            try:
+                start = time.time()
+                for payload in missing:
+                    self._send(payload)
+                pending = dict((p["id"], p) for p in missing)
+                while pending:
+                    ret = self._recv(pending)
+                    self._record(pending.pop(ret["id"]), ret, time.time() - start)
+                    try:
+                        results[ret["id"]] = self._get_result(ret)
+                    except RPCError as e:
+                        results[ret["id"]] = e
+            except (KeyboardInterrupt, ValueError, NumRetriesReached):
+                raise
+            except:
+                # retry all calls that have not been answered yet
+                self._recover(cnt, "rpcexec_many", missing)
 
-        log.debug(json.dumps(reply))
+        return [results[p["id"]] for p in payloads]
 
+    def _record(self, payload, ret, latency):
+        """ Feed the latency of a successful round trip into the node
+            statistics. Replies to ``get_dynamic_global_properties``
+            also update the known head block of the node and the last
+            irreversible block.
+        """
+        self._pool.record(
+            self.url, latency, True, *self._properties(payload, ret))
+
+    def _properties(self, payload, ret):
+        """ ``(head_block_number, last_irreversible_block_num)`` of a
+            reply to ``get_dynamic_global_properties``, ``(None, None)``
+            for replies to other calls
+        """
+        if (payload["params"][1] == "get_dynamic_global_properties" and
+                isinstance(ret.get("result"), dict)):
+            self._irreversible_checked = time.time()
+            return (
+                ret["result"].get("head_block_number"),
+                ret["result"].get("last_irreversible_block_num"))
+        return None, None
+
+    def _get_result(self, ret):
+        """ Return the result of a decoded reply or raise its error
+        """
         if 'error' in ret:
             if 'detail' in ret['error']:
                 raise RPCError(ret['error']['detail'])
@@ -157,58 +898,399 @@ class GrapheneWebsocketRPC(object):
         else:
             return ret["result"]
 
+    def call_many(self, calls, return_exceptions=False, batch=False, **kwargs):
+        """ Pipeline several calls on this connection
+
+            :param list calls: List of ``(name, args)`` tuples, e.g.
+                ``[("get_account_by_name", ["init0"]), ...]``. A third
+                element may carry per-call kwargs such as ``api``.
+            :param bool return_exceptions: Return failed calls as
+                exception instances instead of raising the first one
+            :param bool batch: Send a single JSON-RPC array frame if the
+                node supports it
+            :returns: List of results in the order of ``calls``
+
+            .. code-block:: python
+
+                accounts = rpc.call_many(
+                    [("get_account_by_name", [n]) for n in names])
+        """
+        # Calls routed to different nodes are pipelined per route
+        routes = {}
+        for i, call in enumerate(calls):
+            call_kwargs = dict(kwargs)
+            if len(call) > 2:
+                call_kwargs.update(call[2])
+            api = call_kwargs.get("api")
+            api = api if api in self.routes else None
+            routes.setdefault(api, []).append((i, call[0], call[1], call_kwargs))
+        results = [None] * len(calls)
+        with self._scope(kwargs):
+            for api, routed in routes.items():
+                with self.connection(api=api), self._limited(api, len(routed)):
+                    payloads = [
+                        self._get_query(name, args, call_kwargs)
+                        for _, name, args, call_kwargs in routed]
+                    for (i, _, _, _), r in zip(
+                            routed, self.rpcexec_many(payloads, batch=batch)):
+                        results[i] = r
+        if not return_exceptions:
+            for r in results:
+                if isinstance(r, Exception):
+                    raise r
+        return results
+
+    def pipeline(self):
+        """ Return a :class:`RPCPipeline` that queues calls and sends
+            them in one go when leaving the ``with`` block:
+
+            .. code-block:: python
+
+                with rpc.pipeline() as p:
+                    calls = [p.get_account_by_name(n) for n in names]
+                accounts = [c.result() for c in calls]
+        """
+        return RPCPipeline(self)
+
+    def batch(self, fn):
+        """ Execute the calls made by ``fn`` as one JSON-RPC batch. If
+            the node does not support array frames, the calls are
+            pipelined instead.
+
+            :param fn: Callable that takes a :class:`RPCPipeline` and
+                returns the list of calls made on it
+            :returns: List of results in the order of the calls returned
+                by ``fn``. Calls that failed are represented by their
+                exception instead of a result.
+
+            .. code-block:: python
+
+                accounts = rpc.batch(
+                    lambda b: [b.get_account_by_name(n) for n in names])
+        """
+        pipeline = RPCPipeline(self, batch=True)
+        calls = fn(pipeline)
+        if calls is None:
+            calls = list(pipeline.calls)
+        pipeline.execute()
+        if isinstance(calls, PendingCall):
+            return calls.outcome()
+        return [c.outcome() for c in calls]
+
+    def _get_query(self, name, args, kwargs):
+        """ Build the payload for the call ``name``
+        """
+        # Sepcify the api to talk to
+        if "api_id" not in kwargs:
+            if ("api" in kwargs):
+                if kwargs["api"] not in self.api_id:
+                    try:
+                        self.register_api(kwargs["api"])
+                    except RPCError:
+                        self.api_id[kwargs["api"]] = None
+                if (kwargs["api"] in self.api_id and
+                        self.api_id[kwargs["api"]]):
+                    api_id = self.api_id[kwargs["api"]]
+                else:
+                    raise ValueError(
+                        "Unknown API! "
+                        "Verify that you have registered to %s"
+                        % kwargs["api"]
+                    )
+            else:
+                api_id = 0
+        else:
+            api_id = kwargs["api_id"]
+
+        return {"method": "call",
+                "params": [api_id, name, list(args)],
+                "jsonrpc": "2.0",
+                "id": self.get_request_id()}
+
+    def _hedged_call(self, name, args, kwargs):
+        """ Send the call to the best node and, if it takes longer than
+            the ``hedge_percentile`` latency of that node, to the second
+            best node as well. The first answer is returned.
+            The slower leg is cancelled if it has not been sent yet and
+            its reply is discarded otherwise.
+        """
+        healthy = self.nodes.healthy()
+        if len(healthy) < 2:
+            return self._call(name, args, kwargs)
+        primary, secondary = healthy[0], healthy[1]
+
+        delay = self.hedge_delay
+        if len(primary.samples) >= 20:
+            delay = primary.percentile(self.hedge_percentile)
+
+        if self._hedge_executor is None:
+            self._hedge_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_connections)
+        legs = [self._hedge_executor.submit(
+            self._call, name, args, kwargs, primary.url)]
+        done, _ = concurrent.futures.wait(legs, timeout=delay)
+        if not done:
+            log.debug("Hedging %s to node %s" % (name, secondary.url))
+            legs.append(self._hedge_executor.submit(
+                self._call, name, args, kwargs, secondary.url))
+
+        pending = set(legs)
+        error = None
+        while pending:
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for leg in done:
+                # An error reported by the node is an answer, too. Only
+                # connection problems make us wait for the other leg.
+                if (leg.exception() is None or
+                        isinstance(leg.exception(), RPCError)):
+                    for other in pending:
+                        other.cancel()
+                    return leg.result()
+                error = error or leg.exception()
+        raise error
+
+    def _call(self, name, args, kwargs, url=None):
+        api = kwargs.get("api")
+        with self._scope(kwargs), self.connection(url, api), self._limited(api):
+            query = self._get_query(name, args, kwargs)
+            return self.rpcexec(query)
+
     # End of Deprecated methods
     ####################################################################
     def __getattr__(self, name):
         """ Map all methods to RPC calls and pass through the arguments
         """
+        return self._method(name)
+
+    def _method(self, name):
         def method(*args, **kwargs):
+            policy = self.cache.policy(name) if self.cache is not None else None
+            if policy is not None:
+                key = (name, kwargs.get("api"), json.dumps(args, sort_keys=True))
+                hit, result = self.cache.get(key)
+                if hit:
+                    return result
 
-            # Sepcify the api to talk to
-            if "api_id" not in kwargs:
-                if ("api" in kwargs):
-                    if (kwargs["api"] in self.api_id and
-                            self.api_id[kwargs["api"]]):
-                        api_id = self.api_id[kwargs["api"]]
-                    else:
-                        raise ValueError(
-                            "Unknown API! "
-                            "Verify that you have registered to %s"
-                            % kwargs["api"]
-                        )
-                else:
-                    api_id = 0
+            if (name in HEDGEABLE_METHODS and
+                    kwargs.get("hedge", self.hedge) and
+                    kwargs.get("api") not in self.routes and
+                    getattr(self._local, "connection", None) is None):
+                result = self._hedged_call(name, args, kwargs)
             else:
-                api_id = kwargs["api_id"]
-
-            # let's be able to define the num_retries per query
-            self.num_retries = kwargs.get("num_retries", self.num_retries)
+                result = self._call(name, args, kwargs)
 
-            query = {"method": "call",
-                     "params": [api_id, name, list(args)],
-                     "jsonrpc": "2.0",
-                     "id": self.get_request_id()}
-            r = self.rpcexec(query)
-            return r
+            if policy is not None and result:
+                if policy == CACHE_FOREVER:
+                    self.cache.put(key, result)
+                elif policy == CACHE_IRREVERSIBLE:
+                    if self._is_irreversible(args, result):
+                        self.cache.put(key, result)
+                else:
+                    self.cache.put(key, result, ttl=policy)
+            return result
         return method
 
+    def _is_irreversible(self, args, result):
+        """ Whether the block a result belongs to is irreversible. The
+            block number is taken from the first argument (e.g.
+            ``get_block``) or from the ``block_num`` of the result.
 
-class NumRetriesReached(Exception):
-    pass
+            If the block is newer than the last irreversible block known,
+            the dynamic global properties are fetched again, at most
+            every ``irreversible_refresh`` seconds.
+        """
+        if args and isinstance(args[0], int):
+            block_num = args[0]
+        elif isinstance(result, dict) and isinstance(result.get("block_num"), int):
+            block_num = result["block_num"]
+        else:
+            return False
+        if (block_num > self.last_irreversible_block_num and
+                time.time() - self._irreversible_checked >= self.irreversible_refresh):
+            self._irreversible_checked = time.time()
+            try:
+                self.get_dynamic_global_properties()
+            except KeyboardInterrupt:
+                raise
+            except Exception as e:
+                log.debug("Could not fetch the last irreversible block: %s" % str(e))
+        return 0 < block_num <= self.last_irreversible_block_num
+
+
+class RPCConnection(object):
+    """ A single websocket connection of the pool together with the
+        API ids that have been registered on it
+
+        :param NodePool nodes: Nodes the connection may be opened to
+    """
+    def __init__(self, nodes=None):
+        self.nodes = nodes
+        self.ws = None
+        self.url = None
+        self.api_id = {}
+        self.logged_in = False
+        self.timeout = None
+
+    def close(self):
+        if self.ws is not None:
+            try:
+                self.ws.close()
+            except Exception:
+                pass
+
+
+class PendingCall(object):
+    """ Placeholder for the result of a call queued in a
+        :class:`RPCPipeline`
+    """
+    def __init__(self, name, args, kwargs):
+        self.name = name
+        self.args = args
+        self.kwargs = kwargs
+        self.done = False
+        self._result = None
+        self._error = None
+
+    def set_result(self, result):
+        if isinstance(result, Exception):
+            self._error = result
+        else:
+            self._result = result
+        self.done = True
+
+    def result(self):
+        """ Return the result of the call, or raise its error
+        """
+        if not self.done:
+            raise ValueError("Call %s has not been executed yet" % self.name)
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def outcome(self):
+        """ Return the result of the call, or its error
+        """
+        if self._error is not None:
+            return self._error
+        return self.result()
+
+
+class RPCPipeline(object):
+    """ Queue calls and send them back-to-back with
+        :meth:`GrapheneWebsocketRPC.rpcexec_many`. Every queued method
+        call returns a :class:`PendingCall`.
+
+        :param GrapheneWebsocketRPC rpc: RPC connection to use
+        :param bool batch: Send the calls as one JSON-RPC array frame
+            if the node supports it
+    """
+    def __init__(self, rpc, batch=False):
+        self.rpc = rpc
+        self.batch = batch
+        self.calls = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.execute()
+
+    def execute(self):
+        """ Send all queued calls and fill in their results
+        """
+        calls, self.calls = self.calls, []
+        if not calls:
+            return []
+        results = self.rpc.call_many(
+            [(c.name, c.args, c.kwargs) for c in calls],
+            return_exceptions=True,
+            batch=self.batch)
+        for call, result in zip(calls, results):
+            call.set_result(result)
+        return calls
+
+    def __getattr__(self, name):
+        def method(*args, **kwargs):
+            call = PendingCall(name, args, kwargs)
+            self.calls.append(call)
+            return call
+        return method
 
 
 class GrapheneNodeRPC(GrapheneWebsocketRPC):
+    """ Graphene specific RPC connection
+
+        On top of :class:`GrapheneWebsocketRPC`, single lookups through
+        ``get_objects``, ``lookup_account_names`` and
+        ``lookup_asset_symbols`` can be coalesced:
+
+        * With ``coalesce_window`` (seconds, default: 0 = off),
+          lookups made by different threads within that window are
+          sent as one call, and ids that are already being fetched are
+          not requested twice.
+        * Within ``with rpc.coalesce():`` results are remembered for the
+          calling thread, and :meth:`prefetch_objects` fetches many ids
+          with a single call up front.
+
+        With ``chain_cache=True``, the chain parameters of every node
+        are remembered on disk
+        (:class:`PythonMiddlewareapi.chaincache.ChainCache`). If they
+        are known, no call is made during startup and the parameters
+        are verified in the background instead.
+
+        :param float coalesce_window: Coalescing window in seconds
+        :param chain_cache: ``True`` or a
+            :class:`PythonMiddlewareapi.chaincache.ChainCache` to cache
+            the chain parameters on disk (default: ``False``, always ask
+            the node)
+    """
 
     def __init__(self, *args, **kwargs):
+        window = kwargs.get("coalesce_window", 0)
+        self.loaders = {
+            name: Coalescer(self._fetcher(name), window=window)
+            for name in ["get_objects", "lookup_account_names", "lookup_asset_symbols"]
+        }
         super(GrapheneNodeRPC, self).__init__(*args, **kwargs)
-        chain_params=self.get_network()
-        print("chain_params",chain_params)
-        self.chain_params = chain_params
+
+        self.chain_cache = kwargs.get("chain_cache", False)
+        if self.chain_cache is True:
+            self.chain_cache = ChainCache()
+        self.chain_params = None
+        if self.chain_cache:
+            self.chain_params = self.chain_cache.get(self.url)
+        if self.chain_params:
+            verify = threading.Thread(target=self.verify_network)
+            verify.daemon = True
+            verify.start()
+        else:
+            self.chain_params = self.get_network()
+            if self.chain_cache:
+                self.chain_cache.set(self.url, self.chain_params)
+
+    def verify_network(self):
+        """ Compare the cached chain parameters with those of the node
+            and replace them if they differ
+        """
+        try:
+            chain_params = self.get_network()
+        except Exception as e:
+            log.warning("Could not verify the chain parameters: %s" % str(e))
+            return
+        if chain_params != self.chain_params:
+            log.error(
+                "Cached chain parameters of %s are outdated: %s" %
+                (self.url, str(self.chain_params)))
+            self.chain_params = chain_params
+        if self.chain_cache:
+            self.chain_cache.set(self.url, chain_params)
 
     def register_apis(self):
-        self.api_id["database"] = self.database(api_id=1)
-        self.api_id["history"] = self.history(api_id=1)
-        self.api_id["network_broadcast"] = self.network_broadcast(api_id=1)
+        self.register_api("database")
+        self.register_api("history")
+        self.register_api("network_broadcast")
 
     def rpcexec(self, payload):
         """ Execute a call by sending the payload.
@@ -224,18 +1306,63 @@ class GrapheneNodeRPC(GrapheneWebsocketRPC):
             # Forward call to GrapheneWebsocketRPC and catch+evaluate errors
             return super(GrapheneNodeRPC, self).rpcexec(payload)
         except exceptions.RPCError as e:
-            msg = exceptions.decodeRPCErrorMsg(e).strip()
-            if msg == "missing required active authority":
-                raise exceptions.MissingRequiredActiveAuthority
-            elif re.match("^no method with name.*", msg):
-                raise exceptions.NoMethodWithName(msg)
-            elif msg:
-                raise exceptions.UnhandledRPCError(msg)
-            else:
-                raise e
+            raise exceptions.translateRPCError(e)
         except Exception as e:
             raise e
 
+    def rpcexec_many(self, payloads, batch=False):
+        """ Execute several calls by pipelining the payloads. Errors
+            are translated per call like in :meth:`rpcexec`.
+        """
+        results = super(GrapheneNodeRPC, self).rpcexec_many(payloads, batch=batch)
+        return [
+            exceptions.translateRPCError(r) if isinstance(r, exceptions.RPCError) else r
+            for r in results
+        ]
+
+    def _fetcher(self, name):
+        def fetch(keys):
+            return self._method(name)(keys)
+        return fetch
+
+    def _load(self, name, keys, kwargs):
+        loader = self.loaders[name]
+        if kwargs or not (loader.window or getattr(loader._local, "memo", None) is not None):
+            return self._method(name)(keys, **kwargs)
+        return loader.load_many(keys)
+
+    @contextmanager
+    def coalesce(self):
+        """ Remember the results of ``get_objects``,
+            ``lookup_account_names`` and ``lookup_asset_symbols`` for
+            the calling thread until the block is left
+
+            .. code-block:: python
+
+                with rpc.coalesce():
+                    rpc.prefetch_objects(asset_ids)
+                    assets = [Asset(i) for i in asset_ids]
+        """
+        with self.loaders["get_objects"].scope(), \
+                self.loaders["lookup_account_names"].scope(), \
+                self.loaders["lookup_asset_symbols"].scope():
+            yield self
+
+    def prefetch_objects(self, ids):
+        """ Fetch ``ids`` with a single call so that later lookups
+            within :meth:`coalesce` do not need a call of their own
+        """
+        self.loaders["get_objects"].prefetch(ids)
+
+    def get_objects(self, ids, **kwargs):
+        return self._load("get_objects", ids, kwargs)
+
+    def lookup_account_names(self, names, **kwargs):
+        return self._load("lookup_account_names", names, kwargs)
+
+    def lookup_asset_symbols(self, symbols, **kwargs):
+        return self._load("lookup_asset_symbols", symbols, kwargs)
+
     def get_account(self, name, **kwargs):
         """ Get full account details from account name or id
 
@@ -272,4 +1399,4 @@ class GrapheneNodeRPC(GrapheneWebsocketRPC):
         for k, v in known_chains.items():
             if v["chain_id"] == chain_id:
                 return v
-        raise("Connecting to unknown network!")
+        raise exceptions.RPCError("Connecting to unknown network!")
@@ -0,0 +1,72 @@
+import json
+import logging
+log = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+if orjson is not None:
+    JSON_MODULE = "orjson"
+elif ujson is not None:
+    JSON_MODULE = "ujson"
+else:
+    JSON_MODULE = "json"
+
+
+class JSONCodec(object):
+    """ Encodes requests and decodes replies of the RPC and websocket
+        layers with the fastest JSON module available: ``orjson``, then
+        ``ujson``, then the standard library.
+
+        Documents that the fast modules reject (e.g. raw control
+        characters in strings or integers beyond 64 bit, both of which
+        the standard library accepts in non-strict mode) are handled by
+        the standard library instead.
+
+        :param str module: Force ``"orjson"``, ``"ujson"`` or ``"json"``
+            (default: the fastest one installed)
+    """
+    def __init__(self, module=None):
+        self.module = module or JSON_MODULE
+        if self.module == "orjson" and orjson is None:
+            raise ImportError("orjson is not installed")
+        if self.module == "ujson" and ujson is None:
+            raise ImportError("ujson is not installed")
+
+    def dumps(self, obj):
+        """ Encode ``obj`` as UTF-8 ``bytes``
+        """
+        try:
+            if self.module == "orjson":
+                return orjson.dumps(obj)
+            if self.module == "ujson":
+                return ujson.dumps(obj, ensure_ascii=False).encode('utf8')
+        except (TypeError, ValueError, OverflowError):
+            pass
+        return json.dumps(obj, ensure_ascii=False).encode('utf8')
+
+    def loads(self, data):
+        """ Decode ``data`` (``str`` or ``bytes``)
+
+            :raises ValueError: if ``data`` is not valid JSON
+        """
+        try:
+            if self.module == "orjson":
+                return orjson.loads(data)
+            if self.module == "ujson":
+                return ujson.loads(data)
+        except (TypeError, ValueError, OverflowError):
+            pass
+        if isinstance(data, bytes):
+            data = data.decode('utf8')
+        return json.loads(data, strict=False)
+
+
+#: Codec used unless another one is passed as ``json_codec``
+default_codec = JSONCodec()
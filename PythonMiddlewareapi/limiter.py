@@ -0,0 +1,196 @@
+import time
+import threading
+import logging
+from collections import deque
+log = logging.getLogger(__name__)
+
+
+class Limit(object):
+    """ Adaptive limit of outstanding requests to one API of one node
+
+        :param float limit: Initial limit
+        :param float min_limit: Never allow fewer outstanding requests
+        :param float max_limit: Never allow more outstanding requests
+        :param float alpha: Weight of new samples in the moving average
+            of the latency
+        :param int window: Number of latency samples the baseline is
+            taken from
+    """
+    def __init__(self, limit=4, min_limit=1, max_limit=64, alpha=0.2,
+                 window=100):
+        self.limit = float(limit)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.alpha = alpha
+        self.inflight = 0
+        self.latency = None
+        self.samples = deque(maxlen=window)
+        self.last_decrease = 0.0
+        self.successes = 0
+        self.failures = 0
+
+    def available(self, weight):
+        # A request heavier than the whole limit still goes through
+        # once nothing else is outstanding
+        return self.inflight == 0 or self.inflight + weight <= int(self.limit)
+
+    @property
+    def min_latency(self):
+        """ Baseline latency: the 10th percentile of the recent
+            samples, so that a single lucky sample does not count as
+            the normal latency of the node. ``None`` until there are
+            enough samples.
+        """
+        samples = sorted(self.samples)
+        if len(samples) < 10:
+            return None
+        return samples[int(len(samples) * 0.1)]
+
+    def __repr__(self):
+        return "<Limit %.1f inflight=%d latency=%s>" % (
+            self.limit, self.inflight,
+            "%.3fs" % self.latency if self.latency is not None else "?")
+
+
+class AdaptiveLimiter(object):
+    """ Client-side concurrency limits that adapt to the load of the
+        nodes (additive increase, multiplicative decrease)
+
+        Every node and API (e.g. ``("ws://...", "history")``) has its own
+        :class:`Limit` of outstanding requests. A successful request
+        raises the limit by ``1 / limit``, so the limit grows by about
+        one per round trip. A failed request, or a moving average of the
+        latency above both ``latency_tolerance`` times the baseline (the
+        10th percentile of the recent latencies) and the baseline plus
+        ``latency_floor``, multiplies the limit by ``backoff``, at most
+        once per round trip. Requests with a weight above one (e.g.
+        pipelined batches) count with their latency per request.
+
+        :param float initial_limit: Limit of nodes that have not been
+            used yet (default: 4)
+        :param float min_limit: Lowest limit (default: 1)
+        :param float max_limit: Highest limit (default: 64)
+        :param float backoff: Factor applied on overload (default: 0.5)
+        :param float latency_tolerance: Latency, relative to the
+            baseline, that counts as overload (default: 2.0)
+        :param float latency_floor: Seconds the latency must rise above
+            the baseline to count as overload, so that jitter of fast
+            nodes is not mistaken for overload (default: 0.05)
+
+        .. code-block:: python
+
+            limiter = AdaptiveLimiter(max_limit=32)
+            permit = limiter.acquire("ws://10.0.0.16:8090", "database")
+            try:
+                ...
+            finally:
+                limiter.release(permit, latency, ok)
+            print(limiter.limit("ws://10.0.0.16:8090", "database"))
+    """
+    def __init__(self, initial_limit=4, min_limit=1, max_limit=64,
+                 backoff=0.5, latency_tolerance=2.0, latency_floor=0.05):
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.latency_floor = latency_floor
+        self._limits = {}
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+
+    def _get(self, key):
+        limit = self._limits.get(key)
+        if limit is None:
+            limit = self._limits[key] = Limit(
+                self.initial_limit, self.min_limit, self.max_limit)
+        return limit
+
+    def acquire(self, url, api=None, weight=1, timeout=None):
+        """ Wait until ``weight`` more requests to ``api`` on ``url``
+            may be sent
+
+            :returns: A permit for :meth:`release`, or ``None`` if
+                ``timeout`` seconds have passed
+        """
+        key = (url, api or "database")
+        end = time.time() + timeout if timeout is not None else None
+        with self._lock:
+            limit = self._get(key)
+            while not limit.available(weight):
+                if end is None:
+                    self._available.wait()
+                else:
+                    remaining = end - time.time()
+                    if remaining <= 0:
+                        return None
+                    self._available.wait(remaining)
+            limit.inflight += weight
+        return (key, weight)
+
+    def release(self, permit, latency=None, ok=True):
+        """ Return ``permit`` and adapt the limit to the outcome of the
+            requests
+
+            :param float latency: Seconds the requests took (all of
+                them together)
+            :param bool ok: ``False`` if the node failed or stalled,
+                ``None`` if the requests failed for reasons unrelated to
+                the node (the limit is left as it is)
+        """
+        key, weight = permit
+        now = time.time()
+        with self._lock:
+            limit = self._limits[key]
+            limit.inflight -= weight
+            if ok is None:
+                self._available.notify_all()
+                return
+            overloaded = not ok
+            if ok and latency is not None:
+                latency = float(latency) / max(weight, 1)
+                if limit.latency is None:
+                    limit.latency = latency
+                else:
+                    limit.latency += limit.alpha * (latency - limit.latency)
+                limit.samples.append(latency)
+                baseline = limit.min_latency
+                overloaded = baseline is not None and limit.latency > max(
+                    baseline * self.latency_tolerance,
+                    baseline + self.latency_floor)
+
+            if overloaded:
+                limit.failures += 1
+                # Outstanding requests that were sent before the
+                # decrease must not shrink the limit again
+                if now - limit.last_decrease > (limit.latency or 0):
+                    limit.limit = max(limit.min_limit, limit.limit * self.backoff)
+                    limit.last_decrease = now
+                    log.debug("Lowering the limit of %s %s to %.1f" % (
+                        key[0], key[1], limit.limit))
+            else:
+                limit.successes += 1
+                limit.limit = min(limit.max_limit, limit.limit + 1.0 / limit.limit)
+            self._available.notify_all()
+
+    def limit(self, url, api=None):
+        """ Current limit of outstanding requests to ``api`` on ``url``
+        """
+        with self._lock:
+            return int(self._get((url, api or "database")).limit)
+
+    def limits(self):
+        """ Current limit, outstanding requests and latency of every
+            node and API that has been used
+        """
+        with self._lock:
+            return dict(
+                (key, {
+                    "limit": int(limit.limit),
+                    "inflight": limit.inflight,
+                    "latency": limit.latency,
+                    "min_latency": limit.min_latency,
+                    "successes": limit.successes,
+                    "failures": limit.failures,
+                })
+                for key, limit in self._limits.items())
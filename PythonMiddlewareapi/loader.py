@@ -0,0 +1,135 @@
+import time
+import threading
+import logging
+from contextlib import contextmanager
+log = logging.getLogger(__name__)
+
+
+class _Batch(object):
+    """ Keys that are fetched together with one call
+    """
+    def __init__(self):
+        self.keys = []
+        self.results = {}
+        self.error = None
+        self.done = threading.Event()
+
+
+class Coalescer(object):
+    """ DataLoader-style coalescing of lookups by key (e.g. object ids
+        for ``get_objects``)
+
+        Lookups that are made by different threads within ``window``
+        seconds are collected and fetched with a single call. Keys that
+        are already being fetched are not requested again; their callers
+        wait for the pending call instead.
+
+        Inside of :meth:`scope`, results are additionally remembered for
+        the calling thread, so looking up the same key again does not
+        cost another call. :meth:`prefetch` fetches many keys up front.
+
+        :param callable fetch: Function that takes a list of keys and
+            returns the list of results in the same order
+        :param float window: Seconds to wait for more lookups before
+            fetching, ``0`` to disable coalescing between threads
+        :param int max_batch: Maximum number of keys per call
+    """
+    def __init__(self, fetch, window=0.002, max_batch=100):
+        self.fetch = fetch
+        self.window = window
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._batch = None
+        self._inflight = {}
+        self._local = threading.local()
+
+    @contextmanager
+    def scope(self):
+        """ Remember all results for the calling thread until the scope
+            is left. Scopes can be nested.
+        """
+        memo = getattr(self._local, "memo", None)
+        if memo is not None:
+            yield self
+            return
+        self._local.memo = {}
+        try:
+            yield self
+        finally:
+            self._local.memo = None
+
+    def prefetch(self, keys):
+        """ Fetch ``keys`` with one call, e.g. at the beginning of a scope
+        """
+        self.load_many(keys)
+
+    def load(self, key):
+        return self.load_many([key])[0]
+
+    def load_many(self, keys):
+        """ Return the results for ``keys`` in the same order
+        """
+        memo = getattr(self._local, "memo", None)
+        wanted = []
+        for key in keys:
+            if (memo is None or key not in memo) and key not in wanted:
+                wanted.append(key)
+
+        results = {}
+        if wanted:
+            if self.window:
+                results = self._load_coalesced(wanted)
+            else:
+                for i in range(0, len(wanted), self.max_batch):
+                    chunk = wanted[i:i + self.max_batch]
+                    results.update(zip(chunk, self.fetch(chunk)))
+            if memo is not None:
+                memo.update(results)
+        return [results[k] if k in results else memo[k] for k in keys]
+
+    def _load_coalesced(self, keys):
+        batches = {}
+        leading = []
+        with self._lock:
+            for key in keys:
+                batch = self._inflight.get(key)
+                if batch is None:
+                    if self._batch is None or len(self._batch.keys) >= self.max_batch:
+                        # The thread that opens a batch dispatches it
+                        self._batch = _Batch()
+                        leading.append(self._batch)
+                    batch = self._batch
+                    batch.keys.append(key)
+                    self._inflight[key] = batch
+                batches[key] = batch
+
+        if leading:
+            # Give other threads the chance to join
+            time.sleep(self.window)
+            for batch in leading:
+                self._dispatch(batch)
+
+        results = {}
+        for key, batch in batches.items():
+            batch.done.wait()
+            if batch.error is not None:
+                raise batch.error
+            results[key] = batch.results[key]
+        return results
+
+    def _dispatch(self, batch):
+        with self._lock:
+            if self._batch is batch:
+                self._batch = None
+            keys = list(batch.keys)
+        log.debug("Fetching %d coalesced keys" % len(keys))
+        try:
+            batch.results = dict(zip(keys, self.fetch(keys)))
+        except Exception as e:
+            batch.error = e
+        finally:
+            with self._lock:
+                for key in keys:
+                    if self._inflight.get(key) is batch:
+                        del self._inflight[key]
+            batch.done.set()
@@ -0,0 +1,278 @@
+import time
+import threading
+import logging
+from collections import deque
+from .replay import websocket_transport
+from .jsoncodec import default_codec
+log = logging.getLogger(__name__)
+
+
+class Node(object):
+    """ Health statistics of a single API node
+
+        :param str url: Websocket URL of the node
+        :param float alpha: Weight of new samples in the moving averages
+        :param int window: Number of latency samples kept for percentiles
+    """
+    def __init__(self, url, alpha=0.2, window=100):
+        self.url = url
+        self.alpha = alpha
+        self.samples = deque(maxlen=window)
+        self.latency = None
+        self.error_rate = 0.0
+        self.head_block_number = None
+        self.last_check = None
+        self.ejected = False
+
+    def record(self, latency=None, ok=True):
+        """ Feed the outcome of a call (or ping) into the moving averages
+        """
+        if latency is not None:
+            self.samples.append(latency)
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency += self.alpha * (latency - self.latency)
+        self.error_rate += self.alpha * ((0.0 if ok else 1.0) - self.error_rate)
+
+    def percentile(self, p):
+        """ Latency percentile ``p`` (0-100) of the recent samples, or
+            ``None`` if there are no samples yet
+        """
+        samples = sorted(self.samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * p / 100.0))]
+
+    def score(self):
+        """ Lower is better. Unknown nodes score zero so that they are
+            tried at least once.
+        """
+        if self.latency is None:
+            return 0.0
+        return self.latency * (1.0 + 10.0 * self.error_rate)
+
+    def __repr__(self):
+        return "<Node %s latency=%s error_rate=%.2f head=%s%s>" % (
+            self.url,
+            "%.3fs" % self.latency if self.latency is not None else "?",
+            self.error_rate,
+            self.head_block_number,
+            " ejected" if self.ejected else "")
+
+
+class NodePool(object):
+    """ Latency-aware pool of API nodes
+
+        Every node keeps a moving average of its latency and error rate,
+        fed by the calls that go through it and by periodic pings
+        (``get_dynamic_global_properties``). :meth:`best` returns the
+        healthy node with the best score. Nodes are ejected when they
+        fail too often, are much slower than the fastest node, or lag
+        behind the highest known ``head_block_number``. The best node is
+        never ejected if it is the last healthy one. Ejected nodes are
+        still pinged and come back once they have recovered. The highest
+        ``last_irreversible_block_num`` seen is kept, too.
+
+        :param list urls: Websocket URLs of the nodes
+        :param float max_error_rate: Eject nodes above this error rate
+        :param float max_latency: Eject nodes slower than this (seconds)
+        :param float max_slowdown: Eject nodes slower than this factor
+            times the fastest node
+        :param float latency_floor: Seconds a node may be slower than
+            ``max_slowdown`` times the fastest node, so that fast nodes
+            are not ejected over a few milliseconds (default: 0.05)
+        :param int max_block_lag: Eject nodes that are more than this
+            many blocks behind the best node
+        :param float timeout: Timeout for pings (seconds)
+        :param callable transport: Factory that returns an unconnected
+            websocket for a URL, used for pings (see
+            :class:`PythonMiddlewareapi.graphenenoderpc.GrapheneWebsocketRPC`)
+        :param json_codec: :class:`PythonMiddlewareapi.jsoncodec.JSONCodec`
+            for pings
+    """
+    def __init__(
+        self,
+        urls,
+        max_error_rate=0.5,
+        max_latency=None,
+        max_slowdown=5.0,
+        max_block_lag=3,
+        timeout=5,
+        alpha=0.2,
+        latency_floor=0.05,
+        transport=websocket_transport,
+        json_codec=default_codec,
+    ):
+        if not isinstance(urls, list):
+            urls = [urls]
+        self.nodes = [Node(url, alpha=alpha) for url in urls]
+        self.max_error_rate = max_error_rate
+        self.max_latency = max_latency
+        self.max_slowdown = max_slowdown
+        self.latency_floor = latency_floor
+        self.max_block_lag = max_block_lag
+        self.timeout = timeout
+        self.transport = transport
+        self.json_codec = json_codec
+        self.last_irreversible_block_num = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __getitem__(self, url):
+        for node in self.nodes:
+            if node.url == url:
+                return node
+        raise KeyError(url)
+
+    @property
+    def urls(self):
+        return [node.url for node in self.nodes]
+
+    def record(
+        self, url, latency=None, ok=True, head_block_number=None,
+        last_irreversible_block_num=None
+    ):
+        """ Record the outcome of a call to ``url`` and re-evaluate
+            the health of all nodes
+        """
+        with self._lock:
+            try:
+                node = self[url]
+            except KeyError:
+                return
+            node.record(latency, ok)
+            if head_block_number is not None:
+                node.head_block_number = head_block_number
+            if last_irreversible_block_num is not None:
+                self.last_irreversible_block_num = max(
+                    self.last_irreversible_block_num,
+                    last_irreversible_block_num)
+            self._update_health()
+
+    def _update_health(self):
+        latencies = [
+            n.latency for n in self.nodes
+            if n.latency is not None and n.error_rate <= self.max_error_rate]
+        fastest = min(latencies) if latencies else None
+        heads = [n.head_block_number for n in self.nodes if n.head_block_number]
+        head = max(heads) if heads else None
+        ejected = {}
+        for node in self.nodes:
+            eject = node.error_rate > self.max_error_rate
+            if node.latency is not None:
+                if self.max_latency and node.latency > self.max_latency:
+                    eject = True
+                if (fastest and self.max_slowdown and node.latency >
+                        fastest * self.max_slowdown + self.latency_floor):
+                    eject = True
+            if (head and node.head_block_number is not None and
+                    head - node.head_block_number > self.max_block_lag):
+                eject = True
+            ejected[node] = eject
+        if self.nodes and all(ejected.values()):
+            # Calls need somewhere to go: keep the best of the nodes
+            # that are still admitted
+            admitted = [n for n in self.nodes if not n.ejected] or self.nodes
+            ejected[min(admitted, key=lambda n: n.score())] = False
+        for node in self.nodes:
+            if ejected[node] != node.ejected:
+                log.warning("%s node %s" % (
+                    "Ejecting" if ejected[node] else "Readmitting", node))
+            node.ejected = ejected[node]
+
+    def healthy(self):
+        """ Healthy nodes, best first
+        """
+        with self._lock:
+            nodes = [n for n in self.nodes if not n.ejected]
+        return sorted(nodes, key=lambda n: n.score())
+
+    def best(self, exclude=()):
+        """ Return the URL of the best healthy node. If all nodes are
+            ejected, the best ejected one is returned instead.
+
+            :param list exclude: URLs not to return (if possible)
+        """
+        with self._lock:
+            candidates = [n for n in self.nodes if n.url not in exclude] or self.nodes
+            healthy = [n for n in candidates if not n.ejected] or candidates
+            return min(healthy, key=lambda n: n.score()).url
+
+    def is_healthy(self, url):
+        try:
+            return not self[url].ejected
+        except KeyError:
+            return False
+
+    def ping(self, url):
+        """ Measure the latency of ``url`` with a
+            ``get_dynamic_global_properties`` call and record it
+        """
+        ws = None
+        try:
+            ws = self.transport(url)
+            ws.settimeout(self.timeout)
+            ws.connect(url, timeout=self.timeout)
+            start = time.time()
+            ws.send(self.json_codec.dumps({
+                "method": "call",
+                "params": [0, "get_dynamic_global_properties", []],
+                "jsonrpc": "2.0",
+                "id": 1}))
+            props = self.json_codec.loads(ws.recv())["result"]
+            self.record(
+                url, time.time() - start, True,
+                head_block_number=props["head_block_number"],
+                last_irreversible_block_num=props.get(
+                    "last_irreversible_block_num"))
+        except Exception as e:
+            log.debug("Ping of node %s failed: %s" % (url, str(e)))
+            self.record(url, None, False)
+        finally:
+            if ws is not None:
+                try:
+                    ws.close()
+                except Exception:
+                    pass
+            self[url].last_check = time.time()
+
+    def check(self):
+        """ Ping all nodes concurrently
+        """
+        threads = [
+            threading.Thread(target=self.ping, args=(node.url,))
+            for node in self.nodes]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def start(self, interval=30):
+        """ Ping all nodes every ``interval`` seconds in a background
+            thread
+        """
+        if self._thread and self._thread.is_alive():
+            return
+
+        def run():
+            while not self._stop.is_set():
+                self.check()
+                self._stop.wait(interval)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name="NodePool")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """ Stop the background health checks
+        """
+        self._stop.set()
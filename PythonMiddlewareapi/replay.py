@@ -0,0 +1,210 @@
+import ssl
+import json
+import time
+import heapq
+import random
+import threading
+import logging
+from collections import deque
+import websocket
+log = logging.getLogger(__name__)
+
+
+def websocket_transport(url):
+    """ Default transport: a (not yet connected) ``websocket.WebSocket``
+        for ``url``
+    """
+    if url[:3] == "wss":
+        return websocket.WebSocket(sslopt={'cert_reqs': ssl.CERT_NONE})
+    return websocket.WebSocket()
+
+
+def _request_key(request):
+    return json.dumps([request.get("method"), request.get("params")], sort_keys=True)
+
+
+class RecordingTransport(object):
+    """ Transport that records all calls and their replies to a file
+        while talking to a real node. Each line of the file is a JSON
+        object with the ``request`` (without id), the ``response``
+        (without id) and the ``latency`` in seconds. The health check
+        pings of the nodes are recorded as well (and answered from the
+        recording by :class:`ReplayTransport`).
+
+        .. code-block:: python
+
+            rpc = GrapheneNodeRPC(url, transport=RecordingTransport("node.jsonl"))
+
+        :param str path: File to append the recording to
+        :param callable transport: Transport that does the actual work
+    """
+    def __init__(self, path, transport=websocket_transport):
+        self.path = path
+        self.transport = transport
+        self._lock = threading.Lock()
+
+    def __call__(self, url):
+        return _RecordingWebSocket(self, self.transport(url))
+
+    def write(self, request, response, latency):
+        request = dict(request)
+        request.pop("id", None)
+        response = dict(response)
+        response.pop("id", None)
+        line = json.dumps({
+            "request": request,
+            "response": response,
+            "latency": latency}, sort_keys=True)
+        with self._lock:
+            with open(self.path, "a") as fp:
+                fp.write(line + "\n")
+
+
+class _RecordingWebSocket(object):
+    def __init__(self, recorder, ws):
+        self.recorder = recorder
+        self.ws = ws
+        self._sent = {}
+
+    def __getattr__(self, name):
+        return getattr(self.ws, name)
+
+    def send(self, data):
+        requests = json.loads(data)
+        now = time.time()
+        for request in requests if isinstance(requests, list) else [requests]:
+            self._sent[request.get("id")] = (request, now)
+        return self.ws.send(data)
+
+    def recv(self):
+        reply = self.ws.recv()
+        responses = json.loads(reply, strict=False)
+        now = time.time()
+        for response in responses if isinstance(responses, list) else [responses]:
+            if not isinstance(response, dict) or response.get("id") not in self._sent:
+                continue
+            request, sent = self._sent.pop(response["id"])
+            self.recorder.write(request, response, now - sent)
+        return reply
+
+
+class ReplayTransport(object):
+    """ In-process stand-in for a node that replays a recording made
+        with :class:`RecordingTransport`, without any network access.
+
+        Requests are matched by method and parameters. If the same
+        request was recorded several times, the replies are replayed in
+        order (the last one is repeated). Every reply is delayed by its
+        recorded latency (or ``latency`` if given) plus a random
+        ``jitter``. The random generator is seeded, so runs are
+        deterministic.
+
+        .. code-block:: python
+
+            rpc = GrapheneNodeRPC("ws://replay", transport=ReplayTransport("node.jsonl"))
+
+        :param str path: Recording to replay
+        :param float latency: Fixed latency per reply in seconds
+            (default: the recorded latency)
+        :param float jitter: Maximum random extra latency in seconds
+        :param float speed: Divide all latencies by this factor
+        :param int seed: Seed for the jitter
+    """
+    def __init__(self, path, latency=None, jitter=0.0, speed=1.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.speed = speed
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.responses = {}
+        with open(path) as fp:
+            for line in fp:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self.responses.setdefault(
+                    _request_key(entry["request"]), deque()
+                ).append((entry["response"], entry["latency"]))
+
+    def __call__(self, url):
+        return _ReplayWebSocket(self)
+
+    def respond(self, request):
+        """ Return the reply to ``request`` and its latency
+        """
+        with self._lock:
+            recorded = self.responses.get(_request_key(request))
+            if not recorded:
+                response = {"error": {"message": "No recorded reply for %s" % (
+                    _request_key(request))}}
+                latency = 0.0
+            elif len(recorded) > 1:
+                response, latency = recorded.popleft()
+            else:
+                response, latency = recorded[0]
+            if self.latency is not None:
+                latency = self.latency
+            if self.jitter:
+                latency += self.random.uniform(0, self.jitter)
+        response = dict(response)
+        response["id"] = request.get("id")
+        return response, latency / self.speed
+
+
+class _ReplayWebSocket(object):
+    def __init__(self, replay):
+        self.replay = replay
+        self.connected = False
+        self.timeout = None
+        self._queue = []
+        self._seq = 0
+
+    def connect(self, url, **kwargs):
+        self.connected = True
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+    def gettimeout(self):
+        return self.timeout
+
+    def close(self, *args, **kwargs):
+        self.connected = False
+
+    def ping(self, *args):
+        pass
+
+    def send(self, data):
+        if not self.connected:
+            raise websocket.WebSocketConnectionClosedException("socket is already closed.")
+        requests = json.loads(data)
+        now = time.time()
+        if isinstance(requests, list):
+            responses = [self.replay.respond(r) for r in requests]
+            ready = now + max([latency for _, latency in responses] or [0])
+            self._push(ready, [response for response, _ in responses])
+        else:
+            response, latency = self.replay.respond(requests)
+            self._push(now + latency, response)
+
+    def _push(self, ready, response):
+        self._seq += 1
+        heapq.heappush(self._queue, (ready, self._seq, json.dumps(response)))
+
+    def recv(self):
+        if not self.connected:
+            raise websocket.WebSocketConnectionClosedException("socket is already closed.")
+        if not self._queue:
+            if self.timeout is not None:
+                time.sleep(self.timeout)
+                raise websocket.WebSocketTimeoutException("Connection timed out")
+            raise websocket.WebSocketConnectionClosedException("Nothing to receive")
+        ready, _, reply = self._queue[0]
+        wait = ready - time.time()
+        if self.timeout is not None and wait > self.timeout:
+            time.sleep(self.timeout)
+            raise websocket.WebSocketTimeoutException("Connection timed out")
+        if wait > 0:
+            time.sleep(wait)
+        heapq.heappop(self._queue)
+        return reply
@@ -0,0 +1,81 @@
+import threading
+
+
+class SubscriptionIndex(object):
+    """ Hash indexes from object ids to the handlers subscribed to them
+
+        Subscriptions are either exact object ids (``1.2.100``) or
+        wildcards for all objects of a space and type (``1.2.x``).
+        Looking up the handlers of an object id costs two dictionary
+        lookups, independent of the number of subscriptions.
+
+        A handler is any hashable token, e.g. the name of an event slot.
+
+        .. code-block:: python
+
+            index = SubscriptionIndex()
+            index.add("1.3.x", "on_object")
+            index.add("1.2.100", "on_account_100")
+            index.route("1.2.100")  # ["on_account_100"]
+    """
+    def __init__(self, subscriptions=None, handler=None):
+        self._lock = threading.Lock()
+        self._exact = {}
+        self._wildcard = {}
+        for id in subscriptions or []:
+            self.add(id, handler)
+
+    def _index(self, id):
+        """ Return the index and key for ``id``
+        """
+        prefix, _, instance = id.rpartition(".")
+        if instance == "x":
+            return self._wildcard, prefix
+        return self._exact, id
+
+    def add(self, id, handler):
+        """ Route notices for ``id`` (an object id or ``space.type.x``)
+            to ``handler``
+        """
+        index, key = self._index(id)
+        with self._lock:
+            # Handlers are immutable tuples, so route() does not need
+            # the lock
+            handlers = index.get(key, ())
+            if handler not in handlers:
+                index[key] = handlers + (handler,)
+
+    def remove(self, id, handler=None):
+        """ Remove ``handler`` (or all handlers) for ``id``
+        """
+        index, key = self._index(id)
+        with self._lock:
+            handlers = tuple(
+                h for h in index.get(key, ()) if handler is not None and h != handler)
+            if handlers:
+                index[key] = handlers
+            else:
+                index.pop(key, None)
+
+    def route(self, id):
+        """ Handlers for the object ``id``, exact subscriptions first,
+            each handler only once
+        """
+        exact = self._exact.get(id, ())
+        wildcard = self._wildcard.get(id[:id.rfind(".")], ())
+        if not wildcard:
+            return exact
+        if not exact:
+            return wildcard
+        return exact + tuple(h for h in wildcard if h not in exact)
+
+    def ids(self):
+        """ Exact object ids that have handlers (no wildcards)
+        """
+        return list(self._exact)
+
+    def __contains__(self, id):
+        return bool(self.route(id))
+
+    def __len__(self):
+        return len(self._exact) + len(self._wildcard)
@@ -5,9 +5,15 @@ import time
 import json
 import logging
 import websocket
+from collections import OrderedDict
+from contextlib import contextmanager
 from itertools import cycle
 from threading import Thread
 from .exceptions import NumRetriesReached
+from .jsoncodec import default_codec
+from .compression import DEFLATE_OFFER, DeflateStats, DeflateWebSocket
+from .dispatcher import EventDispatcher, OVERFLOW_BLOCK
+from .subscriptions import SubscriptionIndex
 from events import Events
 
 log = logging.getLogger(__name__)
@@ -24,6 +30,26 @@ class GrapheneWebsocket(Events):
         :param list markets: list of asset_ids, e.g. ``[['1.3.0', '1.3.121']]``
         :param list objects: list of objects id's you'd like to be notified when changing
         :param int keep_alive: seconds between a ping to the backend (defaults to 25seconds)
+        :param json_codec: :class:`PythonMiddlewareapi.jsoncodec.JSONCodec`
+            to decode notifications with (default: the fastest JSON
+            module installed)
+        :param bool compression: Negotiate permessage-deflate with the
+            node (default: True). ``self.compression_stats`` counts the
+            bytes saved.
+        :param int workers: Number of threads that call the event slots
+            (default: 1), ``0`` to call them on the receiving thread
+        :param int max_queue: Maximum number of notifications waiting
+            for a worker (default: 10000)
+        :param str overflow: Policy if the queue is full, see
+            :class:`PythonMiddlewareapi.dispatcher.EventDispatcher`
+            (default: ``"block"``)
+        :param str spill_dir: Directory for notifications spilled to disk
+        :param int max_backfill: Maximum number of blocks to fetch after
+            a reconnect (default: 1000)
+        :param int fan_in: Subscribe on this many of the ``urls`` at the
+            same time (default: 1)
+        :param int shards: Spread the accounts, markets and objects over
+            this many connections per node (default: 1)
 
         After instanciating this class, you can add event slots for:
 
@@ -88,6 +114,42 @@ class GrapheneWebsocket(Events):
 
                 ['1.7.68612']
 
+        Notifications are handed to a pool of ``workers`` through a
+        bounded queue, so that slow slots do not stall the websocket.
+        Notifications for the same object (and all notifications of
+        ``on_tx``, ``on_block`` and ``on_market`` respectively) are
+        delivered in order. ``self.dispatcher.metrics()`` reports the
+        depth and lag of the queue.
+
+        After a reconnect, blocks that have been applied while the
+        connection was down are fetched with ``get_block`` and delivered
+        to ``on_block`` before any live block, so no block is missed or
+        delivered twice (``self.last_block_num`` is the last delivered
+        block). The objects subscribed to by id are fetched again and
+        passed to their handlers, as changes during the outage are
+        unknown. The connection is kept alive with websocket pings every
+        ``keep_alive`` seconds.
+
+        With ``fan_in=2`` (or more), the notifications are received from
+        several nodes at once and every block and every notification is
+        delivered once, from the node that reports it first. Blocks are
+        deduplicated by their number, all other notifications by their
+        content: a notification is dropped if another connection has
+        delivered the same one within the last ``dedup_window`` seconds.
+        Repeated notifications on the same connection are always
+        delivered. ``self.fan_in_stats`` counts how often each node was
+        first.
+
+        With ``shards=4``, the accounts, markets and objects are split
+        over four connections (per node) that subscribe concurrently,
+        which keeps every connection below the subscription limits of
+        the node. Blocks and transactions are only subscribed to on the
+        first shard, object notices only on the first shard and the
+        shards that have accounts or objects. As the node pushes some
+        objects (e.g. ``2.1.0``) to every connection, notifications are
+        deduplicated across the shards like across the nodes of a
+        fan-in. All shards are merged into one stream of events.
+
     """
     __events__ = [
         'on_tx',
@@ -97,6 +159,12 @@ class GrapheneWebsocket(Events):
         'on_market',
     ]
 
+    #: Number of recent notifications remembered for deduplication
+    max_seen = 100000
+    #: Seconds within which the same notification from another
+    #: connection counts as a duplicate
+    dedup_window = 10
+
     def __init__(
         self,
         urls,
@@ -113,11 +181,36 @@ class GrapheneWebsocket(Events):
         on_market=None,
         keep_alive=25,
         num_retries=-1,
+        json_codec=None,
+        compression=True,
+        workers=1,
+        max_queue=10000,
+        overflow=OVERFLOW_BLOCK,
+        spill_dir=None,
+        max_backfill=1000,
+        fan_in=1,
+        shards=1,
         **kwargs
     ):
 
+        self._local = threading.local()
         self.num_retries = num_retries
+        self.json_codec = json_codec or default_codec
+        self.compression_stats = DeflateStats() if compression else None
+        self.dispatcher = None
+        if workers:
+            self.dispatcher = EventDispatcher(
+                self._handle_event,
+                workers=workers,
+                max_queue=max_queue,
+                overflow=overflow,
+                spill_dir=spill_dir)
         self.keepalive = None
+        self.last_block_num = 0
+        self.max_backfill = max_backfill
+        self._backfilling = None
+        self._connected_before = False
+        self._pending = {}
         self._request_id = 0
         self.ws = None
         self.user = user
@@ -138,6 +231,8 @@ class GrapheneWebsocket(Events):
         self.subscription_accounts = accounts
         self.subscription_markets = markets
         self.subscription_objects = objects
+        self.subscriptions = SubscriptionIndex(objects, "on_object")
+        self._callbacks = {}
 
         if on_tx:
             self.on_tx += on_tx
@@ -150,6 +245,32 @@ class GrapheneWebsocket(Events):
         if on_market:
             self.on_market += on_market
 
+        self.primary = True
+        self.members = []
+        self.fan_in_stats = {}
+        self._merge_lock = threading.Lock()
+        self._seen = OrderedDict()
+        self._dedup = fan_in > 1 or shards > 1
+        if self._dedup:
+            # Members share the slots and subscriptions set up above
+            member_urls = []
+            for _ in range(fan_in * 2):
+                url = next(self.urls)
+                if url in member_urls:
+                    break
+                member_urls.append(url)
+                if len(member_urls) == fan_in:
+                    break
+            for url in member_urls:
+                for shard in range(shards):
+                    self.members.append(_Member(
+                        self, url,
+                        accounts=accounts[shard::shards],
+                        markets=markets[shard::shards],
+                        objects=objects[shard::shards],
+                        primary=shard == 0))
+            self.fan_in_stats = dict((url, 0) for url in member_urls)
+
     def cancel_subscriptions(self):
         self.cancel_all_subscriptions()
 
@@ -162,22 +283,26 @@ class GrapheneWebsocket(Events):
             * subscribe to the objects defined if there is a
               callback/slot available for callbacks
         """
+        if self.compression_stats is not None:
+            # Nothing has been received yet, so the socket can still
+            # learn to inflate compressed frames
+            DeflateWebSocket.upgrade(ws.sock, self.compression_stats)
         self.login(self.user, self.password, api_id=1)
         self.database(api_id=1)
         self.cancel_all_subscriptions()
 
         # Subscribe to events on the Backend and give them a
         # callback number that allows us to identify the event
-        if len(self.on_object) or len(self.subscription_accounts):
+        if self._subscribes_objects():
             self.set_subscribe_callback(
                 self.__events__.index('on_object'),
                 False)
 
-        if len(self.on_tx):
+        if len(self.on_tx) and self.primary:
             self.set_pending_transaction_callback(
                 self.__events__.index('on_tx'))
 
-        if len(self.on_block):
+        if len(self.on_block) and self.primary:
             self.set_block_applied_callback(
                 self.__events__.index('on_block'))
 
@@ -196,36 +321,196 @@ class GrapheneWebsocket(Events):
                     self.__events__.index('on_market'),
                     market[0], market[1])
 
-        # We keep the connetion alive by requesting a short object
-        def ping(self):
-            while 1:
-                log.debug('Sending ping')
-                self.get_objects(["2.8.0"])
-                time.sleep(self.keep_alive)
+        if self._connected_before:
+            self._resync()
+        self._connected_before = True
+
+    def _subscribes_objects(self):
+        """ Whether this connection needs object notices
+        """
+        return bool(
+            len(self.on_object) or len(self.subscription_accounts) or
+            self._callbacks)
+
+    def _resync(self):
+        """ Catch up with what happened while the connection was down
+        """
+        if len(self.on_block) and self.primary and self.last_block_num:
+            # Hold back live blocks until the missed ones are delivered
+            self._backfilling = []
+            self.get_dynamic_global_properties(callback=self._backfill)
+
+        object_ids = [
+            id for id in self._resync_objects() if not id.startswith("2.6.")]
+        for i in range(0, len(object_ids), 100):
+            self.get_objects(object_ids[i:i + 100], callback=self._refresh_objects)
+
+    def _resync_objects(self):
+        """ Ids of the objects to fetch again after a reconnect: all
+            exact subscriptions, including those added with
+            :meth:`subscribe_object`
+        """
+        return self.subscriptions.ids()
+
+    def _refresh_objects(self, objects):
+        for notice in objects or []:
+            if notice:
+                self.process_notice(notice)
 
-        self.keepalive = threading.Thread(
-            target=ping,
-            args=(self,)
-        )
-        self.keepalive.start()
+    def _backfill(self, props):
+        """ Fetch the blocks between the last delivered one and the
+            current head block
+        """
+        head = props["head_block_number"] if props else self.last_block_num
+        start = self.last_block_num + 1
+        if head - start + 1 > self.max_backfill:
+            log.warning(
+                "Skipping %d blocks that were missed while disconnected" %
+                (head - start + 1 - self.max_backfill))
+            start = head - self.max_backfill + 1
+        if start > head:
+            return self._end_backfill()
+        log.info("Backfilling blocks %d to %d" % (start, head))
+        blocks = {}
+
+        def received(block_num):
+            def callback(block):
+                blocks[block_num] = block
+                if len(blocks) < head - start + 1:
+                    return
+                for num in range(start, head + 1):
+                    if not blocks[num] or "block_id" not in blocks[num]:
+                        log.warning("Could not backfill block %d" % num)
+                        continue
+                    self._deliver_block(num, blocks[num]["block_id"])
+                self._end_backfill()
+            return callback
+
+        for block_num in range(start, head + 1):
+            self.get_block(block_num, callback=received(block_num))
+
+    def _end_backfill(self):
+        held, self._backfilling = self._backfilling, None
+        for block_id in held or []:
+            self._block_applied(block_id)
+
+    def _block_applied(self, block_id):
+        if self._backfilling is not None:
+            self._backfilling.append(block_id)
+        else:
+            # The block number makes up the first 4 bytes of its id
+            self._deliver_block(int(block_id[:8], 16), block_id)
+
+    def _deliver_block(self, block_num, block_id):
+        if block_num <= self.last_block_num:
+            # Delivered already
+            return
+        self.last_block_num = block_num
+        self._emit("on_block", "on_block", block_id)
+
+    def _merge(self, member, key, name, payload):
+        """ Deliver a notification received by ``member`` unless
+            another member has delivered it within ``dedup_window``
+            seconds
+        """
+        with self._merge_lock:
+            if name == "on_block":
+                block_num = int(payload[:8], 16)
+                if block_num <= self.last_block_num:
+                    return
+                self.last_block_num = block_num
+            elif self._dedup:
+                now = time.time()
+                # Forget what is older than the window (oldest first)
+                while self._seen:
+                    digest, (_, seen_at) = next(iter(self._seen.items()))
+                    if now - seen_at <= self.dedup_window:
+                        break
+                    self._seen.popitem(last=False)
+                # The nodes of a fan-in, and the shards of one node for
+                # objects such as 2.1.0, report the same notifications.
+                # Repeats on the same connection are real changes.
+                digest = json.dumps([name, payload], sort_keys=True)
+                seen = self._seen.get(digest)
+                if seen is not None and seen[0] is not member:
+                    return
+                self._seen.pop(digest, None)
+                self._seen[digest] = (member, now)
+                if len(self._seen) > self.max_seen:
+                    self._seen.popitem(last=False)
+            self.fan_in_stats[member.url] += 1
+        self._emit(key, name, payload)
+
+    def _keep_alive(self):
+        """ Send a websocket ping every ``keep_alive`` seconds and drop
+            the connection if the node has not answered the last one
+        """
+        while True:
+            time.sleep(self.keep_alive)
+            app = self.ws
+            if app is None or app.sock is None or not app.sock.connected:
+                continue
+            if app.last_ping_tm > app.last_pong_tm:
+                log.warning("Node %s did not answer the ping" % self.url)
+                app.sock.close()
+                continue
+            try:
+                app.last_ping_tm = time.time()
+                app.sock.ping()
+            except Exception as e:
+                log.debug("Sending ping failed: %s" % str(e))
+
+    def subscribe_object(self, object_id, callback=None):
+        """ Call ``callback`` (default: the ``on_object`` slot) on
+            changes of the object ``object_id``, or of all objects of a
+            space and type if ``object_id`` is e.g. ``1.2.x``
+        """
+        name = "on_object"
+        if callback is not None:
+            name = "object:%s:%x" % (object_id, id(callback))
+            self._callbacks[name] = callback
+        self.subscriptions.add(object_id, name)
+
+    def unsubscribe_object(self, object_id, callback=None):
+        """ Undo :meth:`subscribe_object`. Without ``callback``, all
+            callbacks for ``object_id`` are removed.
+        """
+        name = None
+        if callback is not None:
+            name = "object:%s:%x" % (object_id, id(callback))
+            self._callbacks.pop(name, None)
+        self.subscriptions.remove(object_id, name)
 
     def process_notice(self, notice):
         """ This method is called on notices that need processing. Here,
-            we call ``on_object`` and ``on_account`` slots.
+            we call the handlers subscribed to the object (by default
+            the ``on_object`` slot) or the ``on_account`` slot.
         """
         id = notice["id"]
 
-        _a, _b, _ = id.split(".")
+        handlers = self.subscriptions.route(id)
+        for name in handlers:
+            self._emit(id, name, notice)
 
-        if id in self.subscription_objects:
-            self.on_object(notice)
+        if not handlers and id[:4] == "2.6.":
+            # Treat account updates separately
+            self._emit(id, "on_account", notice)
 
-        elif ".".join([_a, _b, "x"]) in self.subscription_objects:
-            self.on_object(notice)
+    def _emit(self, key, name, payload):
+        """ Call the slot ``name`` with ``payload``, through the worker
+            pool if there is one
+        """
+        if self.dispatcher is not None:
+            self.dispatcher.submit(key, name, payload)
+        else:
+            self._handle_event(name, payload)
 
-        elif id[:4] == "2.6.":
-            # Treat account updates separately
-            self.on_account(notice)
+    def _handle_event(self, name, payload):
+        callback = self._callbacks.get(name)
+        if callback is not None:
+            callback(payload)
+        else:
+            getattr(self.events, name)(payload)
 
     def on_message(self, ws, reply, *args):
         """ This method is called by the websocket connection on every
@@ -233,13 +518,21 @@ class GrapheneWebsocket(Events):
             hand over post-processing and signalling of events to
             ``process_notice``.
         """
-        log.debug("Received message: %s" % str(reply))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Received message: %s" % str(reply))
         data = {}
         try:
-            data = json.loads(reply, strict=False)
+            data = self.json_codec.loads(reply)
         except ValueError:
             raise ValueError("API node returned invalid format. Expected JSON!")
 
+        callback = self._pending.pop(data.get("id"), None)
+        if callback is not None:
+            if "error" in data:
+                log.error("Call %s failed: %s" % (data["id"], str(data["error"])))
+            callback(data.get("result"))
+            return
+
         if data.get("method") == "notice":
             id = data["params"][0]
 
@@ -267,7 +560,11 @@ class GrapheneWebsocket(Events):
                 try:
                     callbackname = self.__events__[id]
                     log.debug("Patching through to call %s" % callbackname)
-                    [getattr(self.events, callbackname)(x) for x in data["params"][1]]
+                    for x in data["params"][1]:
+                        if callbackname == "on_block":
+                            self._block_applied(x)
+                        else:
+                            self._emit(callbackname, callbackname, x)
                 except Exception as e:
                     log.critical("Error in {}: {}\n\n{}".format(
                         callbackname, str(e), traceback.format_exc()))
@@ -281,15 +578,31 @@ class GrapheneWebsocket(Events):
         """ Called when websocket connection is closed
         """
         log.debug('Closing WebSocket connection with {}'.format(self.url))
-        if self.keepalive and self.keepalive.is_alive():
-            self.keepalive.do_run = False
-            self.keepalive.join()
+        # Replies to calls on this connection will not arrive anymore
+        self._pending = {}
 
     def run_forever(self):
         """ This method is used to run the websocket app continuously.
             It will execute callbacks as defined and try to stay
             connected with the provided APIs
         """
+        if self.members:
+            threads = []
+            for member in self.members:
+                thread = threading.Thread(target=member.run_forever)
+                thread.daemon = True
+                thread.start()
+                threads.append(thread)
+            for thread in threads:
+                thread.join()
+            return
+
+        if self.keep_alive and self.keepalive is None:
+            # One thread for all connections
+            self.keepalive = threading.Thread(target=self._keep_alive)
+            self.keepalive.daemon = True
+            self.keepalive.start()
+
         cnt = 0
         while True:
             cnt += 1
@@ -299,21 +612,24 @@ class GrapheneWebsocket(Events):
                 # websocket.enableTrace(True)
                 self.ws = websocket.WebSocketApp(
                     self.url,
+                    header=[DEFLATE_OFFER] if self.compression_stats else None,
                     on_message=self.on_message,
                     on_error=self.on_error,
                     on_close=self.on_close,
                     on_open=self.on_open
                 )
-                self.ws.run_forever()
+                self.ws.run_forever(
+                    skip_utf8_validation=self.compression_stats is not None)
             except websocket.WebSocketException as exc:
-                if (self.num_retries >= 0 and cnt > self.num_retries):
+                num_retries = self._num_retries()
+                if (num_retries >= 0 and cnt > num_retries):
                     raise NumRetriesReached()
 
                 sleeptime = (cnt - 1) * 2 if cnt < 10 else 10
                 if sleeptime:
                     log.warning(
                         "Lost connection to node during wsconnect(): %s (%d/%d) "
-                        % (self.url, cnt, self.num_retries) +
+                        % (self.url, cnt, num_retries) +
                         "Retrying in %d seconds" % sleeptime
                     )
                     time.sleep(sleeptime)
@@ -329,6 +645,23 @@ class GrapheneWebsocket(Events):
         self._request_id += 1
         return self._request_id
 
+    @contextmanager
+    def _scope(self, kwargs):
+        """ Apply ``num_retries`` of a call to the calling thread until
+            the call returns
+        """
+        outer = getattr(self._local, "num_retries", None)
+        self._local.num_retries = kwargs.get(
+            "num_retries", self.num_retries if outer is None else outer)
+        try:
+            yield
+        finally:
+            self._local.num_retries = outer
+
+    def _num_retries(self):
+        num_retries = getattr(self._local, "num_retries", None)
+        return self.num_retries if num_retries is None else num_retries
+
     """ RPC Calls
     """
     def rpcexec(self, payload):
@@ -338,8 +671,10 @@ class GrapheneWebsocket(Events):
             :raises ValueError: if the server does not respond in proper JSON format
             :raises RPCError: if the server returns an error
         """
-        log.debug(json.dumps(payload))
-        self.ws.send(json.dumps(payload, ensure_ascii=False).encode('utf8'))
+        data = self.json_codec.dumps(payload)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(data.decode('utf8'))
+        self.ws.send(data)
 
     def __getattr__(self, name):
         """ Map all methods to RPC calls and pass through the arguments
@@ -366,13 +701,63 @@ class GrapheneWebsocket(Events):
             else:
                 api_id = kwargs["api_id"]
 
-            # let's be able to define the num_retries per query
-            self.num_retries = kwargs.get("num_retries", self.num_retries)
-
             query = {"method": "call",
                      "params": [api_id, name, list(args)],
                      "jsonrpc": "2.0",
                      "id": self.get_request_id()}
-            r = self.rpcexec(query)
+            if kwargs.get("callback"):
+                # Called with the result once the reply arrives
+                self._pending[query["id"]] = kwargs["callback"]
+            # num_retries may be given per query, for this query only
+            with self._scope(kwargs):
+                r = self.rpcexec(query)
             return r
         return method
+
+
+class _Member(GrapheneWebsocket):
+    """ A single connection (to one node, for one shard of the
+        subscriptions) of a fan-in or sharded :class:`GrapheneWebsocket`.
+        It shares the event slots and the routing of its parent and
+        hands all notifications to the parent to be merged.
+    """
+    def __init__(self, parent, url, accounts, markets, objects, primary):
+        super(_Member, self).__init__(
+            url,
+            parent.user,
+            parent.password,
+            accounts=accounts,
+            markets=markets,
+            objects=objects,
+            keep_alive=parent.keep_alive,
+            num_retries=parent.num_retries,
+            json_codec=parent.json_codec,
+            compression=False,
+            workers=0,
+            max_backfill=parent.max_backfill)
+        self.parent = parent
+        self.url = url
+        self.primary = primary
+        self.events = parent.events
+        self.subscriptions = parent.subscriptions
+        self._callbacks = parent._callbacks
+        self.compression_stats = parent.compression_stats
+
+    def _subscribes_objects(self):
+        # Objects fetched by another shard are pushed to that shard only
+        return bool(
+            (self.primary and super(_Member, self)._subscribes_objects()) or
+            self.subscription_accounts or self.subscription_objects)
+
+    def _resync_objects(self):
+        # Every shard fetches its own objects again, the first shard
+        # also those added with subscribe_object()
+        subscribed = set(self.subscriptions.ids())
+        object_ids = [id for id in self.subscription_objects if id in subscribed]
+        if self.primary:
+            initial = set(self.parent.subscription_objects)
+            object_ids += [id for id in subscribed if id not in initial]
+        return object_ids
+
+    def _emit(self, key, name, payload):
+        self.parent._merge(self, key, name, payload)
@@ -7,6 +7,7 @@ __all__ = [
     'objecttypes',
     'operationids',
     'operations',
+    'schema',
     'signedtransactions',
     'transactions',
 ]
@@ -6,16 +6,17 @@ from .types import (
     Array, PointInTime, Signature, Bool,
     Set, Fixed_array, Optional, Static_variant,
     Map, Id, VoteId, ObjectId,
-    JsonObj
+    JsonObj, Serializable, varint, to_native
 )
 from .chains import known_chains
 from .objecttypes import object_type
 from .account import PublicKey
 from .chains import default_prefix
 from .operationids import operations
+from .schema import encode_into, decode, build_fields
 
 
-class Operation():
+class Operation(Serializable):
     def __init__(self, op):
         if isinstance(op, list) and len(op) == 2:
             if isinstance(op[0], int):
@@ -54,52 +55,106 @@ class Operation():
         class_ = getattr(module, name)
         return class_
 
-    def __bytes__(self):
-        return bytes(Id(self.opId)) + bytes(self.op)
+    def serialize_into(self, buffer):
+        buffer += varint(self.opId)
+        encode_into(self.op, buffer)
+
+    @classmethod
+    def from_bytes(cls, data, prefix=None):
+        """ Parse an operation from its wire format
+
+            :param bytes data: Operation id and operation
+            :param str prefix: Prefix of public keys
+        """
+        return cls(_decode_all(cls, data, prefix))
 
     def __str__(self):
-        return json.dumps([self.opId, self.op.toJson()])
+        return json.dumps(self.to_native())
 
+    def to_native(self):
+        return [self.opId, to_native(self.op)]
 
-class GrapheneObject(object):
+
+class GrapheneObject(Serializable):
     """ Core abstraction class
 
         This class is used for any JSON reflected object in Graphene.
 
         * ``instance.__json__()``: encodes data into json format
+        * ``instance.to_native()``: same as ``__json__()``, nested objects
+          are converted without a detour through json strings
         * ``bytes(instance)``: encodes data into wire format
+        * ``instance.serialize_into(buffer)``: appends the wire format
+          to the ``bytearray`` ``buffer``
         * ``str(instances)``: dumps json object as string
 
+        Subclasses may declare their wire format in ``schema`` to be
+        encoded by a compiled encoder and to be parsed with
+        ``from_bytes()`` (see :mod:`PythonMiddlewarebase.schema`).
+        Objects of such classes are built from their json, given as
+        keyword arguments or as a single ``dict``, with the keys of the
+        schema (and ``prefix`` for public keys).
+
     """
-    def __init__(self, data=None):
-        self.data = data
+    #: List of ``(name, type)`` tuples, or ``None``
+    schema = None
+    #: Whether the fields are encoded as part of the parent object
+    inline = True
+    #: Values of the fields that may be left out of the json
+    defaults = {}
+
+    def __init__(self, *args, **kwargs):
+        if isArgsThisClass(self, args):
+            self.data = args[0].data
+            return
+        if self.schema is None:
+            # Classes without a schema pass their data
+            self.data = args[0] if args else kwargs.get("data")
+            return
+        prefix = kwargs.pop("prefix", None)
+        if len(args) == 1 and len(kwargs) == 0:
+            kwargs = args[0]
+        prefix = prefix or kwargs.get("prefix", default_prefix)
+        self.data = build_fields(
+            type(self), self.prepare(kwargs, prefix), prefix)
+
+    def prepare(self, kwargs, prefix):
+        """ Adjust the json of the object before its fields are built,
+            e.g. to sort lists
+
+            :param dict kwargs: Json of the object
+            :param str prefix: Prefix of public keys
+            :returns: The json to build the fields from
+        """
+        return kwargs
 
-    def __bytes__(self):
-        if self.data is None:
-            return bytes()
-        b = b""
-        for name, value in self.data.items():
-            if isinstance(value, str):
-                b += bytes(value, 'utf-8')
-            else:
-                b += bytes(value)
-        return b
+    def serialize_into(self, buffer):
+        encode_into(self, buffer)
+
+    @classmethod
+    def from_bytes(cls, data, prefix=None):
+        """ Parse an object of this class from its wire format
+
+            :param bytes data: Encoded object
+            :param str prefix: Prefix of public keys
+            :raises ValueError: if ``data`` is not a valid encoding
+            :raises TypeError: if the class has no schema to decode with
+        """
+        if cls.schema is None:
+            raise TypeError("%s has no schema" % cls.__name__)
+        return cls(_decode_all(cls, data, prefix))
 
     def __json__(self):
+        return self.to_native()
+
+    def to_native(self):
         if self.data is None:
             return {}
         d = {}  # JSON output is *not* ordered
         for name, value in self.data.items():
             if isinstance(value, Optional) and value.isempty():
                 continue
-
-            if isinstance(value, String):
-                d.update({name: str(value)})
-            else:
-                try:
-                    d.update({name: JsonObj(value)})
-                except:
-                    d.update({name: value.__str__()})
+            d[name] = to_native(value)
         return d
 
     def __str__(self):
@@ -111,5 +166,13 @@ class GrapheneObject(object):
     def json(self):
         return self.__json__()
     
+def _decode_all(kind, data, prefix):
+    value, pos = decode(kind, data, prefix=prefix)
+    if pos != len(data):
+        raise ValueError("%d bytes left after %s" % (
+            len(data) - pos, kind.__name__))
+    return value
+
+
 def isArgsThisClass(self, args):
     return (len(args) == 1 and type(args[0]).__name__ == type(self).__name__)
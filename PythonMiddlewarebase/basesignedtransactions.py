@@ -15,6 +15,7 @@ from .types import (
     Uint32,
 )
 from .objects import GrapheneObject, isArgsThisClass
+from .schema import array_of, decode
 from .operations import Operation
 from .chains import known_chains
 import logging
@@ -39,41 +40,46 @@ class Signed_Transaction(GrapheneObject):
         :param str expiration: expiration date
         :param Array operations:  array of operations
     """
-    def __init__(self, *args, **kwargs):
-        if isArgsThisClass(self, args):
-            self.data = args[0].data
-        else:
-            if len(args) == 1 and len(kwargs) == 0:
-                kwargs = args[0]
-            if "extensions" not in kwargs:
-                kwargs["extensions"] = Set([])
-            elif not kwargs.get("extensions"):
-                kwargs["extensions"] = Set([])
-            if "signatures" not in kwargs:
-                kwargs["signatures"] = Array([])
-            else:
-                kwargs["signatures"] = Array([Signature(unhexlify(a)) for a in kwargs["signatures"]])
-
-            if "operations" in kwargs:
-                opklass = self.getOperationKlass()
-                if all([not isinstance(a, opklass) for a in kwargs["operations"]]):
-                    kwargs['operations'] = Array([opklass(a) for a in kwargs["operations"]])
-                else:
-                    kwargs['operations'] = Array(kwargs["operations"])
-            # print("kwargs:>>>", kwargs.items())
-
-            super().__init__(OrderedDict([
-                ('ref_block_num', Uint16(kwargs['ref_block_num'])),
-                ('ref_block_prefix', Uint32(kwargs['ref_block_prefix'])),
-                ('expiration', PointInTime(kwargs['expiration'])),
-                ('operations', kwargs['operations']),
-                ('extensions', kwargs['extensions']),
-                ('signatures', kwargs['signatures']),
-            ]))
+    schema = [
+        ('ref_block_num', Uint16),
+        ('ref_block_prefix', Uint32),
+        ('expiration', PointInTime),
+        ('operations', array_of(Operation)),
+        ('extensions', Set),
+        ('signatures', None),
+    ]
+
+    def prepare(self, kwargs, prefix):
+        operations = kwargs["operations"]
+        opklass = self.getOperationKlass()
+        if all([not isinstance(a, opklass) for a in operations]):
+            operations = [opklass(a) for a in operations]
+        signatures = Array([
+            Signature(unhexlify(a)) for a in kwargs.get("signatures", [])])
+        return dict(kwargs, operations=operations, signatures=signatures)
 
     def getOperationKlass(self):
         return Operation
 
+    @classmethod
+    def from_bytes(cls, data, prefix=None):
+        """ Parse a transaction from its wire format, with or without
+            signatures
+
+            :param bytes data: Encoded transaction
+            :param str prefix: Prefix of public keys
+        """
+        # Signatures are not part of the schema, as they are left out
+        # of the digest
+        tx, pos = decode(cls.schema[:-1], data, prefix=prefix)
+        if pos < len(data):
+            tx["signatures"], pos = decode(
+                array_of(Signature), data, pos, prefix=prefix)
+        if pos != len(data):
+            raise ValueError("%d bytes left after the transaction" % (
+                len(data) - pos))
+        return cls(tx)
+
     def recoverPubkeyParameter(self, digest, signature, pubkey):
         """ Use to derive a number that allows to easily recover the
             public key from the signature
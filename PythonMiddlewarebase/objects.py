@@ -9,6 +9,7 @@ from .types import (
     ObjectId as GPHObjectId
 )
 from .baseobjects import GrapheneObject, isArgsThisClass
+from .schema import array_of, optional_of, map_of, object_id
 from .chains import known_chains, default_prefix
 from .objecttypes import object_type
 from .account import PublicKey
@@ -63,24 +64,10 @@ class transaction_id_type(GrapheneObject):
                 ('trx_num', kwargs["trx_num"]),
             ]))
             
-class ObjectId(GPHObjectId): 
+class ObjectId(GPHObjectId):
     """ Encodes object/protocol ids
     """
-    def __init__(self, object_str, type_verify=None):
-        if len(object_str.split(".")) == 3:
-            space, type, id = object_str.split(".")
-            self.space = Uint8(space)
-            self.type = Uint8(type)
-            # self.instance = Id(int(id))
-            self.instance = Uint64(id)
-            self.Id = object_str
-            if type_verify:
-                assert object_type[type_verify] == int(type),\
-                    "Object id does not match object type! " +\
-                    "Excpected %d, got %d" %\
-                    (object_type[type_verify], int(type))
-        else:
-            raise Exception("Object id is invalid")
+    __slots__ = ()
 
 
 class Operation(GPHOperation):
@@ -104,32 +91,36 @@ class Operation(GPHOperation):
         return "Unknown Operation ID %d" % i
 
     def json(self):
-        return json.loads(str(self))
+        return self.to_native()
 
 
 class Asset(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if isArgsThisClass(self, args):
-                self.data = args[0].data
-        else:
-            if len(args) == 1 and len(kwargs) == 0:
-                kwargs = args[0]
-            super().__init__(OrderedDict([
-                ('amount', Int64(kwargs["amount"])),
-                ('asset_id', ObjectId(kwargs["asset_id"], "asset"))
-            ]))
+    schema = [
+        ('amount', Int64),
+        ('asset_id', object_id("asset")),
+    ]
 
 
 class Memo(GrapheneObject):
+    schema = [
+        ('from', PublicKey),
+        ('to', PublicKey),
+        ('nonce', Uint64),
+        ('message', Bytes),
+    ]
+    #: Memos without a message have no data at all
+    inline = False
+
     def __init__(self, *args, **kwargs):
         if isArgsThisClass(self, args):
                 self.data = args[0].data
         else:
+            prefix = kwargs.pop("prefix", default_prefix)
             if len(args) == 1 and len(kwargs) == 0:
                 kwargs = args[0]
             if "message" in kwargs and kwargs["message"]:
                 if "chain" not in kwargs:
-                    chain = default_prefix
+                    chain = {"prefix": prefix}
                 else:
                     chain = kwargs["chain"]
                 if isinstance(chain, str) and chain in known_chains:
@@ -140,193 +131,123 @@ class Memo(GrapheneObject):
                     raise Exception("Memo() only takes a string or a dict as chain!")
                 if "prefix" not in chain_params:
                     raise Exception("Memo() needs a 'prefix' in chain params!")
-                prefix = chain_params["prefix"]
-                super().__init__(OrderedDict([
-                    ('from', PublicKey(kwargs["from"], prefix=prefix)),
-                    ('to', PublicKey(kwargs["to"], prefix=prefix)),
-                    ('nonce', Uint64(int(kwargs["nonce"]))),
-                    ('message', Bytes(kwargs["message"]))
-                ]))
+                super().__init__(kwargs, prefix=chain_params["prefix"])
             else:
-                super().__init__(None)
+                self.data = None
 
 
 class Price(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if isArgsThisClass(self, args):
-                self.data = args[0].data
-        else:
-            if len(args) == 1 and len(kwargs) == 0:
-                kwargs = args[0]
-            super().__init__(OrderedDict([
-                ('base', Asset(kwargs["base"])),
-                ('quote', Asset(kwargs["quote"]))
-            ]))
+    schema = [
+        ('base', Asset),
+        ('quote', Asset),
+    ]
 
 
 class PriceFeed(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if isArgsThisClass(self, args):
-                self.data = args[0].data
-        else:
-            if len(args) == 1 and len(kwargs) == 0:
-                kwargs = args[0]
-            super().__init__(OrderedDict([
-                ('settlement_price', Price(kwargs["settlement_price"])),
-                ('maintenance_collateral_ratio', Uint16(kwargs["maintenance_collateral_ratio"])),
-                ('maximum_short_squeeze_ratio', Uint16(kwargs["maximum_short_squeeze_ratio"])),
-                # ('core_exchange_rate', Price(kwargs["core_exchange_rate"])),
-            ]))
+    schema = [
+        ('settlement_price', Price),
+        ('maintenance_collateral_ratio', Uint16),
+        ('maximum_short_squeeze_ratio', Uint16),
+    ]
 
 
 class Permission(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if isArgsThisClass(self, args):
-            self.data = args[0].data
-        else:
-            prefix = kwargs.pop("prefix", default_prefix)
-
-            if len(args) == 1 and len(kwargs) == 0:
-                kwargs = args[0]
-
-            # Sort keys (FIXME: ideally, the sorting is part of Public
-            # Key and not located here)
-            kwargs["key_auths"] = sorted(
-                kwargs["key_auths"],
-                key=lambda x: repr(PublicKey(x[0], prefix=prefix).address),
-                reverse=False,
-            )
-            accountAuths = Map([
-                [ObjectId(e[0], "account"), Uint16(e[1])]
-                for e in kwargs["account_auths"]
-            ])
-            keyAuths = Map([
-                [PublicKey(e[0], prefix=prefix), Uint16(e[1])]
-                for e in kwargs["key_auths"]
-            ])
-            super().__init__(OrderedDict([
-                ('weight_threshold', Uint32(int(kwargs["weight_threshold"]))),
-                ('account_auths', accountAuths),
-                ('key_auths', keyAuths),
-                ('extensions', Set([])),
-            ]))
+    schema = [
+        ('weight_threshold', Uint32),
+        ('account_auths', map_of(object_id("account"), Uint16)),
+        ('key_auths', map_of(PublicKey, Uint16)),
+        ('extensions', Set),
+    ]
+
+    def prepare(self, kwargs, prefix):
+        # Sort keys (FIXME: ideally, the sorting is part of Public
+        # Key and not located here)
+        return dict(kwargs, key_auths=sorted(
+            kwargs["key_auths"],
+            key=lambda x: repr(PublicKey(x[0], prefix=prefix).address),
+        ))
 
 
 class AccountOptions(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        # Allow for overwrite of prefix
-        prefix = kwargs.pop("prefix", default_prefix)
-        
-        if isArgsThisClass(self, args):
-                self.data = args[0].data
-        else:
-            if len(args) == 1 and len(kwargs) == 0:
-                kwargs = args[0]
-            # remove dublicates
-            kwargs["votes"] = list(set(kwargs["votes"]))
-            # Sort votes
-            kwargs["votes"] = sorted(
-                kwargs["votes"],
-                key=lambda x: float(x.split(":")[1]),
-            )
-            votes=Array([VoteId(o) for o in kwargs["votes"]])
-            extensions=Array([String(o) for o in kwargs["extensions"]])
-            super().__init__(OrderedDict([
-                ('memo_key', PublicKey(kwargs["memo_key"], prefix=prefix)),
-                # ('voting_account', ObjectId(kwargs["voting_account"], "account")),
-                # ('num_witness', Uint16(kwargs["num_witness"])),
-                # ('num_committee', Uint16(kwargs["num_committee"])),
-                ('votes', votes),
-                ('extensions', extensions),
-                #('extensions', Set([])),
-                #('extensions',Map([[ObjectId("1.3.0","asset"),"GCS Data Test !!!"]])),
-                #('extensions', Array([String(o) for o in kwargs["extensions"]])),
-            ]))
+    schema = [
+        ('memo_key', PublicKey),
+        ('votes', array_of(VoteId)),
+        ('extensions', array_of(String)),
+    ]
 
+    def prepare(self, kwargs, prefix):
+        # remove dublicates and sort votes
+        return dict(kwargs, votes=sorted(
+            set(kwargs["votes"]),
+            key=lambda x: float(x.split(":")[1]),
+        ))
 
-class AssetOptions(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if isArgsThisClass(self, args):
-                self.data = args[0].data
-        else:
-            if len(args) == 1 and len(kwargs) == 0:
-                kwargs = args[0]
 
-            # Sorting
-            # for key in [
-            #     "whitelist_authorities",
-            #     "blacklist_authorities",
-            #     "whitelist_markets",
-            #     "blacklist_markets"
-            # ]:
-            #     kwargs[key] = sorted(
-            #         set(kwargs[key]),
-            #         key=lambda x: int(x.split(".")[2]),
-            #     )
-
-            super().__init__(OrderedDict([
-                ('max_supply', Uint64(kwargs["max_supply"])),
-                ('market_fee_percent', Uint16(kwargs["market_fee_percent"])),
-                ('max_market_fee', Uint64(kwargs["max_market_fee"])),
-                ('issuer_permissions', Uint16(kwargs["issuer_permissions"])),
-                ('flags', Uint16(kwargs["flags"])),
-                ('core_exchange_rate', Optional(None)),
-                ('description', String(kwargs["description"])),
-                ('extensions', Set([])),
-            ]))
+class AssetOptions(GrapheneObject):
+    schema = [
+        ('max_supply', Uint64),
+        ('market_fee_percent', Uint16),
+        ('max_market_fee', Uint64),
+        ('issuer_permissions', Uint16),
+        ('flags', Uint16),
+        ('core_exchange_rate', optional_of(Price)),
+        ('description', String),
+        ('extensions', Set),
+    ]
+
+    def prepare(self, kwargs, prefix):
+        # The core exchange rate is never set
+        return dict(kwargs, core_exchange_rate=None)
 
 
 class BitassetOptions(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if isArgsThisClass(self, args):
-            self.data = args[0].data
-        else:
-            if len(args) == 1 and len(kwargs) == 0:
-                kwargs = args[0]
-        super().__init__(OrderedDict([
-            ("feed_lifetime_sec", Uint32(kwargs.get("feed_lifetime_sec", 60*60*24))),
-            ("minimum_feeds", Uint8(kwargs.get("minimum_feeds", 1))),
-            ("force_settlement_delay_sec", Uint32(kwargs.get("force_settlement_delay_sec", 60*60*24))),
-            ("force_settlement_offset_percent", Uint16(kwargs.get("force_settlement_offset_percent", 0))),
-            ("maximum_force_settlement_volume", Uint16(kwargs.get("maximum_force_settlement_volume", 2000))),
-            ("short_backing_asset", ObjectId(kwargs.get("short_backing_asset", "1.3.0"), "asset")),
-            ("extensions", Set([]))
-        ]))
+    schema = [
+        ('feed_lifetime_sec', Uint32),
+        ('minimum_feeds', Uint8),
+        ('force_settlement_delay_sec', Uint32),
+        ('force_settlement_offset_percent', Uint16),
+        ('maximum_force_settlement_volume', Uint16),
+        ('short_backing_asset', object_id("asset")),
+        ('extensions', Set),
+    ]
+    defaults = {
+        "feed_lifetime_sec": 60*60*24,
+        "minimum_feeds": 1,
+        "force_settlement_delay_sec": 60*60*24,
+        "force_settlement_offset_percent": 0,
+        "maximum_force_settlement_volume": 2000,
+        "short_backing_asset": "1.3.0",
+    }
 
 
 class Vesting_balance_worker_initializer(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if isArgsThisClass(self, args):
-            self.data = args[0].data
-        else:
-            if len(args) == 1 and len(kwargs) == 0:
-                kwargs = args[0]
-            if "describe" in kwargs and kwargs["describe"]:
-                describe = Optional(String(kwargs["describe"]))
-            else:
-                describe = Optional(None)
-            super().__init__(OrderedDict([
-                ('pay_vesting_period_days', Uint16(kwargs["pay_vesting_period_days"])),
-                ('describe', describe)
-            ]))
+    schema = [
+        ('pay_vesting_period_days', Uint16),
+        ('describe', optional_of(String)),
+    ]
 
 
 class Burn_worker_initializer(GrapheneObject):
-    def __init__(self, kwargs):
-        super().__init__(OrderedDict([]))
+    schema = []
 
 
 class Destroy_worker_initializer(GrapheneObject):
-    def __init__(self, kwargs):
-        super().__init__(OrderedDict([]))
+    schema = []
 
 
 class Issuance_worker_initializer(GrapheneObject):
-    def __init__(self, kwargs):
-        super().__init__(OrderedDict([]))
+    schema = []
 
 
 class Worker_initializer(Static_variant):
+    __slots__ = ()
+    variants = [
+        Destroy_worker_initializer,
+        Vesting_balance_worker_initializer,
+        Burn_worker_initializer,
+        Issuance_worker_initializer,
+    ]
+
     def __init__(self, o):
         id = o[0]
         if id == 0:
@@ -343,33 +264,34 @@ class Worker_initializer(Static_variant):
 
 
 class Linear_vesting_policy_initializer(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if isArgsThisClass(self, args):
-            self.data = args[0].data
-        else:
-            if len(args) == 1 and len(kwargs) == 0:
-                kwargs = args[0]
-            super().__init__(OrderedDict([
-                ('begin_timestamp', PointInTime(kwargs["begin_timestamp"])),
-                ('vesting_cliff_seconds', Uint32(kwargs.get("vesting_cliff_seconds", 0))),
-                ('vesting_duration_seconds', Uint32(kwargs.get("vesting_duration_seconds", 0))),
-            ]))
+    schema = [
+        ('begin_timestamp', PointInTime),
+        ('vesting_cliff_seconds', Uint32),
+        ('vesting_duration_seconds', Uint32),
+    ]
+    defaults = {
+        "vesting_cliff_seconds": 0,
+        "vesting_duration_seconds": 0,
+    }
 
 
 class Cdd_vesting_policy_initializer(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if isArgsThisClass(self, args):
-            self.data = args[0].data
-        else:
-            if len(args) == 1 and len(kwargs) == 0:
-                kwargs = args[0]
-            super().__init__(OrderedDict([
-                ('start_claim', PointInTime(kwargs["start_claim"])),
-                ('vesting_seconds', Uint32(kwargs.get("vesting_seconds", 0))),
-            ]))
+    schema = [
+        ('start_claim', PointInTime),
+        ('vesting_seconds', Uint32),
+    ]
+    defaults = {
+        "vesting_seconds": 0,
+    }
 
 
 class Vesting_policy_initializer(Static_variant):
+    __slots__ = ()
+    variants = [
+        Linear_vesting_policy_initializer,
+        Cdd_vesting_policy_initializer,
+    ]
+
     def __init__(self, o):
         id = o[0]
         if id == 0:
@@ -382,15 +304,9 @@ class Vesting_policy_initializer(Static_variant):
 
 
 class Int(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if isArgsThisClass(self, args):
-            self.data = args[0].data
-        else:
-            if len(args) == 1 and len(kwargs) == 0:
-                kwargs = args[0]
-            super().__init__(OrderedDict([
-                ('v', Uint64(kwargs["v"]))
-            ]))
+    schema = [
+        ('v', Uint64),
+    ]
 
 
 class Number(GrapheneObject):
@@ -406,27 +322,15 @@ class Number(GrapheneObject):
 
 
 class Lua_String(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if isArgsThisClass(self, args):
-            self.data = args[0].data
-        else:
-            if len(args) == 1 and len(kwargs) == 0:
-                kwargs = args[0]
-            super().__init__(OrderedDict([
-                ('v', String(kwargs["v"]))
-            ]))
+    schema = [
+        ('v', String),
+    ]
 
 
 class Lua_Bool(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if isArgsThisClass(self, args):
-            self.data = args[0].data
-        else:
-            if len(args) == 1 and len(kwargs) == 0:
-                kwargs = args[0]
-            super().__init__(OrderedDict([
-                ('v', Bool(kwargs["v"]))
-            ]))
+    schema = [
+        ('v', Bool),
+    ]
 
 
 class Table(GrapheneObject):
@@ -442,11 +346,13 @@ class Table(GrapheneObject):
 
 
 class Function(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        super().__init__(OrderedDict([]))
+    schema = []
 
 
 class Lua(Static_variant):
+    __slots__ = ()
+    variants = [Int, Number, Lua_String, Lua_Bool, Table, Function]
+
     def __init__(self, o):
         id = o[0]
         # print("id", id)
@@ -466,7 +372,12 @@ class Lua(Static_variant):
         else:
             raise ValueError("Unknown Lua_type")
         super().__init__(data, id)
+
+
 class Memo_variant(Static_variant):
+    __slots__ = ()
+    variants = [String, Memo]
+
     def __init__(self,o):
         id=o[0]
         if id==0:
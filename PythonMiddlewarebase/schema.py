@@ -0,0 +1,854 @@
+""" Compiled encoders for :class:`PythonMiddlewarebase.baseobjects.GrapheneObject`
+
+    A class that declares its wire format in ``schema``, a list of
+    ``(name, type)`` tuples in the order of its ``data``, is encoded by
+    a function that is generated once per class:
+
+    .. code-block:: python
+
+        class Transfer(GrapheneObject):
+            schema = [
+                ('from', object_id("account")),
+                ('to', object_id("account")),
+                ('amount', Asset),
+                ('memo', optional_of(Memo_variant)),
+                ('extensions', array_of(String)),
+            ]
+
+    Types are the wrapper classes of :mod:`PythonMiddlewarebase.types`,
+    other ``GrapheneObject`` classes with a ``schema`` (which are
+    inlined), :class:`object_id`, :class:`array_of`,
+    :class:`optional_of`, :class:`map_of`, :class:`pair_of`,
+    :class:`switch_on` or ``None`` for anything else. Consecutive
+    fixed size fields are packed with a single ``struct`` format, and
+    everything is written into one ``bytearray``. Objects whose
+    ``data`` does not match the schema raise ``ValueError`` (for other
+    fields) or ``TypeError`` (for values of another type) instead of
+    being encoded.
+
+    Inlined classes must always fill all fields of their schema.
+    Classes such as ``Memo`` (which may have no data at all) set
+    ``inline = False``.
+
+    A field whose type depends on the value of an earlier field is
+    declared with :class:`switch_on`.
+
+    The same schemas build the objects (see :func:`build_fields`):
+    ``GrapheneObject`` wraps the json of an object field by field, so
+    that constructors do not list the fields again.
+
+    The same schemas drive the decoders (see :func:`decode`), which
+    parse the wire format back into the json of the objects. Fields of
+    type ``None`` and ``ObjectId`` (whose type is not known) can not be
+    decoded and raise ``ValueError`` like malformed data.
+"""
+import re
+import struct
+import time
+from calendar import timegm
+from collections import OrderedDict
+from functools import lru_cache
+from binascii import hexlify, unhexlify
+from .types import (
+    Uint8, Int16, Uint16, Uint32, Uint64,
+    Varint32, Int64, String, Bytes, Array,
+    PointInTime, Optional, Static_variant,
+    Id, VoteId, ObjectId, Signature, Bool,
+    Set, Map, Pair, varint, timeformat, serialize_into
+)
+from .objecttypes import object_type
+from .chains import default_prefix
+
+
+#: Characters that ``String.unicodify`` escapes
+_CONTROL = re.compile("[\x00-\x1f]")
+
+#: ``struct`` format and value expression of fixed size wrapper types
+_FIXED = [
+    (Uint8, "B", "{0}.data"),  # and Bool
+    (Int16, "h", "{0}.data"),
+    (Uint16, "H", "{0}.data"),
+    (Uint32, "I", "{0}.data"),
+    (Uint64, "Q", "{0}.data"),
+    (Int64, "q", "{0}.data"),
+    (ObjectId, "Q", "{0}._instance"),
+    (PointInTime, "I", "_timestamp({0}.data)"),
+    (VoteId, "I", "({0}.type & 0xff) | ({0}.instance << 8)"),
+]
+
+
+class array_of(object):
+    """ ``Array`` (or ``Set``) whose elements are of type ``kind``
+    """
+    def __init__(self, kind=None):
+        self.kind = kind
+
+
+class optional_of(object):
+    """ ``Optional`` whose value is of type ``kind``
+    """
+    def __init__(self, kind=None):
+        self.kind = kind
+
+
+class map_of(object):
+    """ ``Map`` from ``key`` to ``value``
+    """
+    def __init__(self, key=None, value=None):
+        self.key = key
+        self.value = value
+
+
+class pair_of(object):
+    """ ``Pair`` of ``first`` and ``second``
+    """
+    def __init__(self, first=None, second=None):
+        self.first = first
+        self.second = second
+
+
+class switch_on(object):
+    """ Field whose type depends on the value of the earlier field
+        ``field`` of the same object: ``kinds`` maps the values of
+        ``field`` to types. All of them must share the wire format of
+        ``default``, which is used to encode the field and to decode it
+        for values that are not in ``kinds``.
+    """
+    def __init__(self, field, kinds, default=None):
+        self.field = field
+        self.kinds = kinds
+        self.default = default
+
+
+#: Object types that are not in the protocol space
+_SPACES = {
+    "nh_asset_creator": 4,
+    "world_view": 4,
+    "nh_asset": 4,
+    "nh_asset_order": 4,
+}
+
+
+class object_id(object):
+    """ ``ObjectId`` of an object of type ``type_name`` (see
+        :mod:`PythonMiddlewarebase.objecttypes`). Only the instance is
+        serialized, the type is needed to decode the full id.
+    """
+    def __init__(self, type_name=None):
+        self.type_name = type_name
+        self.prefix = None
+        if type_name is not None:
+            self.prefix = "%d.%d." % (
+                _SPACES.get(type_name, 1), object_type[type_name])
+
+    def __repr__(self):
+        return "object_id(%r)" % self.type_name
+
+
+@lru_cache(maxsize=1024)
+def _timestamp(d):
+    return timegm(time.strptime(d + "UTC", timeformat))
+
+
+def _string(value, out):
+    d = value.data
+    if isinstance(d, str) and not _CONTROL.search(d):
+        d = d.encode("utf-8")
+    else:
+        d = value.unicodify()
+    out += varint(len(d))
+    out += d
+
+
+def _bytes(value, out):
+    d = unhexlify(bytes(value.data, 'utf-8'))
+    out += varint(len(d))
+    out += d
+
+
+def _raw(value, out):
+    if isinstance(value, str):
+        out += bytes(value, 'utf-8')
+    else:
+        encode_into(value, out)
+
+
+def _wrong_type(value, kind):
+    raise TypeError("Expected %s, got %s" % (
+        kind.__name__, type(value).__name__))
+
+
+def _wrong_fields(obj, names):
+    raise ValueError("Fields of %s do not match its schema: %s, not %s" % (
+        type(obj).__name__, ", ".join(obj.data), ", ".join(names)))
+
+
+def _wrapper(kind):
+    """ Class of the values of ``kind``, or ``None`` if it takes any value
+    """
+    if isinstance(kind, switch_on):
+        kind = kind.default
+    if isinstance(kind, object_id):
+        return ObjectId
+    for schema_kind, klass in (
+            (array_of, Array), (optional_of, Optional),
+            (map_of, Map), (pair_of, Pair)):
+        if isinstance(kind, schema_kind):
+            return klass
+    if isinstance(kind, type):
+        return kind
+    return None
+
+
+def _optional(value, out, encode):
+    # An optional whose value encodes to nothing counts as empty
+    if not value.data:
+        out += b"\x00"
+        return
+    start = len(out)
+    out += b"\x01"
+    encode(value.data, out)
+    if len(out) == start + 1:
+        out[start:] = b"\x00"
+
+
+class _Compiler(object):
+    def __init__(self):
+        self.lines = []
+        self.namespace = {
+            "varint": varint,
+            "_timestamp": _timestamp,
+            "_string": _string,
+            "_bytes": _bytes,
+            "_raw": _raw,
+            "_optional": _optional,
+            "_wrong_type": _wrong_type,
+            "_wrong_fields": _wrong_fields,
+            "encode_into": encode_into,
+        }
+        self.fmt = ""
+        self.args = []
+        self.vars = 0
+
+    def const(self, value):
+        name = "_c%d" % len(self.namespace)
+        self.namespace[name] = value
+        return name
+
+    def var(self):
+        self.vars += 1
+        return "v%d" % self.vars
+
+    def emit(self, indent, line):
+        self.lines.append("    " * indent + line)
+
+    def flush(self, indent):
+        """ Pack the pending fixed size fields
+        """
+        if self.fmt:
+            pack = self.const(struct.Struct("<" + self.fmt).pack)
+            self.emit(indent, "out += %s(%s)" % (pack, ", ".join(self.args)))
+            self.fmt = ""
+            self.args = []
+
+    def check(self, kind, value, indent):
+        """ Raise ``TypeError`` unless ``value`` is of ``kind``
+        """
+        klass = _wrapper(kind)
+        if klass is not None:
+            klass = self.const(klass)
+            self.emit(indent, "if not isinstance(%s, %s): _wrong_type(%s, %s)" % (
+                value, klass, value, klass))
+
+    def fields(self, schema, data, indent):
+        for name, kind in schema:
+            value = self.var()
+            self.emit(indent, "%s = %s[%r]" % (value, data, name))
+            self.field(kind, value, indent)
+
+    def field(self, kind, value, indent):
+        self.check(kind, value, indent)
+        if isinstance(kind, switch_on):
+            kind = kind.default
+        if isinstance(kind, object_id):
+            kind = ObjectId
+        for klass, fmt, expr in _FIXED:
+            if isinstance(kind, type) and issubclass(kind, klass):
+                self.fmt += fmt
+                self.args.append(expr.format(value))
+                return
+        if (isinstance(kind, type) and getattr(kind, "schema", None) and
+                getattr(kind, "inline", True)):
+            # Nested objects are inlined
+            data = self.var()
+            names = self.const(tuple(name for name, _ in kind.schema))
+            self.emit(indent, "%s = %s.data" % (data, value))
+            self.emit(indent, "if tuple(%s) != %s: _wrong_fields(%s, %s)" % (
+                data, names, value, names))
+            self.fields(kind.schema, data, indent)
+            return
+
+        self.flush(indent)
+        if isinstance(kind, type) and issubclass(kind, Array):
+            kind = array_of()
+        elif isinstance(kind, type) and issubclass(kind, Optional):
+            kind = optional_of()
+        if isinstance(kind, array_of):
+            items = self.var()
+            item = self.var()
+            self.emit(indent, "%s = %s.data" % (items, value))
+            self.emit(indent, "out += varint(len(%s))" % items)
+            self.emit(indent, "for %s in %s:" % (item, items))
+            self.field(kind.kind, item, indent + 1)
+            self.flush(indent + 1)
+        elif isinstance(kind, optional_of):
+            self.emit(indent, "_optional(%s, out, %s)" % (
+                value, self.const(compile_field(kind.kind))))
+        elif kind is String:
+            self.emit(indent, "_string(%s, out)" % value)
+        elif kind is Bytes:
+            self.emit(indent, "_bytes(%s, out)" % value)
+        elif kind is Varint32:
+            self.emit(indent, "out += varint(%s.data)" % value)
+        elif kind is Id:
+            self.emit(indent, "out += varint(%s.data.data)" % value)
+        elif isinstance(kind, type) and issubclass(kind, Static_variant):
+            self.emit(indent, "out += varint(%s.type_id)" % value)
+            self.emit(indent, "_raw(%s.data, out)" % value)
+        elif _is_operation(kind):
+            self.emit(indent, "out += varint(%s.opId)" % value)
+            self.emit(indent, "_raw(%s.op, out)" % value)
+        else:
+            self.emit(indent, "_raw(%s, out)" % value)
+
+    def build(self, name, arg="data"):
+        source = "def %s(%s, out):\n%s\n" % (
+            name, arg, "\n".join(self.lines) or "    pass")
+        exec(compile(source, "<schema %s>" % name, "exec"), self.namespace)
+        encoder = self.namespace[name]
+        encoder.source = source
+        return encoder
+
+
+def _is_operation(kind):
+    from .baseobjects import Operation
+    return isinstance(kind, type) and issubclass(kind, Operation)
+
+
+def compile_schema(schema, name="encode"):
+    """ Generate ``encode(data, out)`` that appends the fields of
+        ``data`` (an ``OrderedDict`` laid out as ``schema``) to the
+        ``bytearray`` ``out``
+    """
+    compiler = _Compiler()
+    compiler.fields(schema, "data", 1)
+    compiler.flush(1)
+    return compiler.build(name)
+
+
+def compile_field(kind):
+    """ Generate ``encode(value, out)`` for a single value of ``kind``
+    """
+    compiler = _Compiler()
+    compiler.field(kind, "value", 1)
+    compiler.flush(1)
+    return compiler.build("encode", "value")
+
+
+_encoders = {}
+
+
+def encoder_for(cls):
+    """ Field names and compiled encoder of ``cls``, or ``None`` if it
+        does not have a schema
+    """
+    try:
+        return _encoders[cls]
+    except KeyError:
+        pass
+    schema = getattr(cls, "schema", None)
+    encoder = None
+    if schema is not None:
+        encoder = (
+            tuple(name for name, _ in schema),
+            compile_schema(schema, "encode_" + cls.__name__))
+    _encoders[cls] = encoder
+    return encoder
+
+
+def encode_into(obj, out):
+    """ Append the wire format of ``obj`` to the ``bytearray`` ``out``
+    """
+    if getattr(type(obj), "schema", False) is False:
+        # Not a GrapheneObject
+        serialize_into(obj, out)
+        return
+    data = obj.data
+    if data is None:
+        return
+    encoder = encoder_for(type(obj))
+    if encoder is None:
+        for value in data.values():
+            _raw(value, out)
+        return
+    if tuple(data) != encoder[0]:
+        _wrong_fields(obj, encoder[0])
+    encoder[1](data, out)
+
+
+def _is_empty(value):
+    # Empty objects are kept, as they may be filled with defaults
+    return value is None or (not value and not isinstance(value, dict))
+
+
+def _builder(kind):
+    """ Build ``build(value, prefix)`` that wraps the json ``value`` as a
+        value of ``kind``
+    """
+    from .account import PublicKey
+    if isinstance(kind, object_id):
+        type_name = kind.type_name
+        return lambda value, prefix: ObjectId(value, type_name)
+    if isinstance(kind, array_of):
+        item = builder_for(kind.kind)
+        return lambda value, prefix: Array([item(v, prefix) for v in value])
+    if isinstance(kind, optional_of):
+        inner = builder_for(kind.kind)
+
+        def build(value, prefix):
+            if _is_empty(value):
+                return Optional(None)
+            return Optional(inner(value, prefix))
+        return build
+    if isinstance(kind, map_of):
+        key, item = builder_for(kind.key), builder_for(kind.value)
+        return lambda value, prefix: Map([
+            [key(k, prefix), item(v, prefix)] for k, v in value])
+    if isinstance(kind, pair_of):
+        first, second = builder_for(kind.first), builder_for(kind.second)
+        return lambda value, prefix: Pair(
+            first(value[0], prefix), second(value[1], prefix))
+    if not isinstance(kind, type):
+        return lambda value, prefix: value
+    if issubclass(kind, Set):
+        # Extensions, which are always left empty
+        return lambda value, prefix: Set([])
+    if issubclass(kind, PublicKey) or getattr(kind, "schema", None) is not None:
+        def build(value, prefix):
+            if isinstance(value, kind):
+                return value
+            return kind(value, prefix=prefix)
+        return build
+
+    def build(value, prefix):
+        if isinstance(value, kind):
+            return value
+        return kind(value)
+    return build
+
+
+_builders = {}
+
+
+def builder_for(kind):
+    """ Cached ``build(value, prefix)`` of ``kind``, which wraps the json
+        ``value`` (values that are wrapped already are kept)
+    """
+    try:
+        return _builders[kind]
+    except KeyError:
+        pass
+    builder = _builders[kind] = _builder(kind)
+    return builder
+
+
+def _switch_selector(kind):
+    """ Build ``select(data)`` that returns the builder of a
+        :class:`switch_on` field, given the fields built so far
+    """
+    builders = dict(
+        (value, builder_for(k)) for value, k in kind.kinds.items())
+    default = builder_for(kind.default)
+    return lambda data: builders.get(data[kind.field].data, default)
+
+
+def _field_builders(cls):
+    fields = []
+    for name, kind in cls.schema:
+        build = select = None
+        if isinstance(kind, switch_on):
+            select = _switch_selector(kind)
+        else:
+            build = builder_for(kind)
+        optional = isinstance(kind, optional_of) or (
+            isinstance(kind, type) and issubclass(kind, (Set, Optional)))
+        fields.append((name, build, select, optional))
+    return fields
+
+
+_object_builders = {}
+
+
+def build_fields(cls, values, prefix=default_prefix):
+    """ Build the ``data`` of an object of ``cls`` from its json
+
+        :param dict values: Json of the fields; fields that are left
+            out take their value from ``cls.defaults`` and optional
+            fields (and extensions) are left empty
+        :param str prefix: Prefix of public keys
+        :returns: ``OrderedDict`` laid out as the schema of ``cls``
+        :raises KeyError: if a field without default is left out
+    """
+    fields = _object_builders.get(cls)
+    if fields is None:
+        fields = _object_builders[cls] = _field_builders(cls)
+    defaults = cls.defaults
+    data = OrderedDict()
+    for name, build, select, optional in fields:
+        if select is not None:
+            build = select(data)
+        if name in values:
+            value = values[name]
+        elif name in defaults:
+            value = defaults[name]
+        elif optional:
+            value = None
+        else:
+            raise KeyError(name)
+        data[name] = build(value, prefix)
+    return data
+
+
+#: Decoded optionals without a value, which are left out of objects
+_ABSENT = object()
+
+
+def _varint(data, pos):
+    result = 0
+    shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        result |= (b & 0x7f) << shift
+        if not b & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _take(data, pos, size):
+    end = pos + size
+    if end > len(data):
+        raise IndexError("Unexpected end of data")
+    return data[pos:end], end
+
+
+@lru_cache(maxsize=1024)
+def _time(timestamp):
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(timestamp))
+
+
+def _vote(value):
+    return "%d:%d" % (value & 0xff, value >> 8)
+
+
+def _fixed_decoder(kind):
+    """ ``struct`` format and conversion of the fixed size ``kind``, or
+        ``None``
+    """
+    if isinstance(kind, object_id):
+        if kind.prefix is None:
+            return None
+        prefix = kind.prefix
+        return "Q", lambda instance: prefix + str(instance)
+    if not isinstance(kind, type) or issubclass(kind, ObjectId):
+        return None
+    if issubclass(kind, Bool):
+        return "B", bool
+    if issubclass(kind, PointInTime):
+        return "I", _time
+    if issubclass(kind, VoteId):
+        return "I", _vote
+    for klass, fmt, _ in _FIXED:
+        if issubclass(kind, klass):
+            return fmt, None
+    return None
+
+
+def _unsupported(kind):
+    def decode(data, pos):
+        raise ValueError("Can not decode %s" % getattr(
+            kind, "__name__", kind))
+    return decode
+
+
+#: Step of an object decoder whose decoder depends on earlier fields
+_SWITCH = object()
+
+
+def _switch_decoder(kind, prefix):
+    """ ``select(d)`` that returns the decoder of the ``switch_on``
+        field ``kind`` for the fields ``d`` decoded so far
+    """
+    decoders = dict(
+        (value, _decoder(k, prefix)) for value, k in kind.kinds.items())
+    default = _decoder(kind.default, prefix)
+
+    def select(d):
+        return decoders.get(d.get(kind.field), default)
+    return select
+
+
+def _object_decoder(schema, prefix):
+    """ Decoder of the fields of ``schema`` into a ``dict``.
+        Consecutive fixed size fields are unpacked at once.
+    """
+    steps = []
+    fmt = ""
+    fixed = []
+
+    def flush():
+        if fixed:
+            layout = struct.Struct("<" + fmt)
+            steps.append((layout.unpack_from, layout.size, list(fixed)))
+            del fixed[:]
+
+    for name, kind in schema:
+        f = _fixed_decoder(kind)
+        if f is not None:
+            fmt += f[0]
+            fixed.append((name, f[1]))
+            continue
+        flush()
+        fmt = ""
+        if isinstance(kind, switch_on):
+            steps.append((_SWITCH, name, _switch_decoder(kind, prefix)))
+        else:
+            steps.append((None, name, _decoder(kind, prefix)))
+    flush()
+
+    def decode(data, pos):
+        d = {}
+        for unpack, arg, fields in steps:
+            if unpack is None or unpack is _SWITCH:
+                if unpack is _SWITCH:
+                    value, pos = fields(d)(data, pos)
+                else:
+                    value, pos = fields(data, pos)
+                if value is not _ABSENT:
+                    d[arg] = value
+            else:
+                values = unpack(data, pos)
+                pos += arg
+                for (name, convert), value in zip(fields, values):
+                    d[name] = convert(value) if convert else value
+        return d, pos
+    return decode
+
+
+def _array_decoder(kind, prefix):
+    item = _decoder(kind, prefix)
+
+    def decode(data, pos):
+        n, pos = _varint(data, pos)
+        r = []
+        for _ in range(n):
+            value, pos = item(data, pos)
+            r.append(value)
+        return r, pos
+    return decode
+
+
+def _optional_decoder(kind, prefix):
+    value = _decoder(kind, prefix)
+
+    def decode(data, pos):
+        if data[pos]:
+            return value(data, pos + 1)
+        return _ABSENT, pos + 1
+    return decode
+
+
+def _map_decoder(key, value, prefix):
+    key = _decoder(key, prefix)
+    value = _decoder(value, prefix)
+
+    def decode(data, pos):
+        n, pos = _varint(data, pos)
+        r = []
+        for _ in range(n):
+            # Like Map.to_native()
+            k, pos = key(data, pos)
+            v, pos = value(data, pos)
+            r.append([str(k), str(v)])
+        return r, pos
+    return decode
+
+
+def _pair_decoder(first, second, prefix):
+    first = _decoder(first, prefix)
+    second = _decoder(second, prefix)
+
+    def decode(data, pos):
+        a, pos = first(data, pos)
+        b, pos = second(data, pos)
+        return [a, b], pos
+    return decode
+
+
+def _variant_decoder(kind, prefix):
+    variants = getattr(kind, "variants", None)
+    if not variants:
+        return _unsupported(kind)
+
+    def decode(data, pos):
+        type_id, pos = _varint(data, pos)
+        if type_id >= len(variants):
+            raise ValueError("Unknown %s %d" % (kind.__name__, type_id))
+        value, pos = decoder_for(variants[type_id], prefix)(data, pos)
+        return [type_id, value], pos
+    return decode
+
+
+_operation_classes = {}
+
+
+def _operation_class(op_id):
+    try:
+        return _operation_classes[op_id]
+    except KeyError:
+        pass
+    from . import operations as module
+    from .operationids import operations
+    for name, i in operations.items():
+        if i == op_id:
+            klass = getattr(module, name[0].upper() + name[1:], None)
+            break
+    else:
+        raise ValueError("Unknown operation id %d" % op_id)
+    if klass is None:
+        raise ValueError("Unimplemented Operation %s" % name)
+    _operation_classes[op_id] = klass
+    return klass
+
+
+def _operation_decoder(prefix):
+    def decode(data, pos):
+        op_id, pos = _varint(data, pos)
+        op, pos = decoder_for(_operation_class(op_id), prefix)(data, pos)
+        return [op_id, op], pos
+    return decode
+
+
+def _decode_string(data, pos):
+    n, pos = _varint(data, pos)
+    value, pos = _take(data, pos, n)
+    return bytes(value).decode("utf-8"), pos
+
+
+def _decode_hex(data, pos):
+    n, pos = _varint(data, pos)
+    value, pos = _take(data, pos, n)
+    return hexlify(value).decode("ascii"), pos
+
+
+def _decode_signature(data, pos):
+    value, pos = _take(data, pos, 65)
+    return hexlify(value).decode("ascii"), pos
+
+
+def _public_key_decoder(prefix):
+    from .base58 import gphBase58CheckEncode
+
+    def decode(data, pos):
+        value, pos = _take(data, pos, 33)
+        return prefix + gphBase58CheckEncode(
+            hexlify(value).decode("ascii")), pos
+    return decode
+
+
+def _decoder(kind, prefix):
+    """ Build ``decode(data, pos)`` that returns the json of a value of
+        ``kind`` at ``pos`` of ``data`` and the position after it
+    """
+    from .account import PublicKey
+    fixed = _fixed_decoder(kind)
+    if fixed is not None:
+        layout = struct.Struct("<" + fixed[0])
+        unpack, size, convert = layout.unpack_from, layout.size, fixed[1]
+
+        def decode(data, pos):
+            value = unpack(data, pos)[0]
+            return (convert(value) if convert else value), pos + size
+        return decode
+    if isinstance(kind, array_of):
+        return _array_decoder(kind.kind, prefix)
+    if isinstance(kind, optional_of):
+        return _optional_decoder(kind.kind, prefix)
+    if isinstance(kind, map_of):
+        return _map_decoder(kind.key, kind.value, prefix)
+    if isinstance(kind, pair_of):
+        return _pair_decoder(kind.first, kind.second, prefix)
+    if not isinstance(kind, type):
+        return _unsupported(kind)
+    if getattr(kind, "schema", None) is not None:
+        return _object_decoder(kind.schema, prefix)
+    if kind is String:
+        return _decode_string
+    if kind is Bytes:
+        return _decode_hex
+    if kind in (Varint32, Id):
+        return _varint
+    if kind is Signature:
+        return _decode_signature
+    if issubclass(kind, PublicKey):
+        return _public_key_decoder(prefix)
+    if issubclass(kind, Array):
+        return _array_decoder(None, prefix)
+    if issubclass(kind, Optional):
+        return _optional_decoder(None, prefix)
+    if issubclass(kind, Static_variant):
+        return _variant_decoder(kind, prefix)
+    if _is_operation(kind):
+        return _operation_decoder(prefix)
+    return _unsupported(kind)
+
+
+_decoders = {}
+
+
+def decoder_for(kind, prefix=default_prefix):
+    """ Cached ``decode(data, pos)`` of ``kind``, which returns the json
+        of the value at ``pos`` of ``data`` and the position after it
+    """
+    key = (kind, prefix)
+    try:
+        return _decoders[key]
+    except KeyError:
+        pass
+    decoder = _decoders[key] = _decoder(kind, prefix)
+    return decoder
+
+
+def decode(kind, data, pos=0, prefix=None):
+    """ Decode a value of ``kind`` from the wire format ``data``,
+        starting at ``pos``
+
+        :param str prefix: Prefix of public keys (default: ``COCOS``)
+        :returns: The json of the value (as ``to_native()`` would
+            return it) and the position after it
+        :raises ValueError: if ``data`` is not a valid encoding
+    """
+    if isinstance(kind, list):
+        # A schema
+        kind = tuple(kind)
+    try:
+        if isinstance(kind, tuple):
+            key = (kind, prefix or default_prefix)
+            decoder = _decoders.get(key)
+            if decoder is None:
+                decoder = _decoders[key] = _object_decoder(kind, key[1])
+        else:
+            decoder = decoder_for(kind, prefix or default_prefix)
+        return decoder(data, pos)
+    except (IndexError, struct.error, UnicodeDecodeError) as e:
+        raise ValueError("Invalid wire format: %s" % e)
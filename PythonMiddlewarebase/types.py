@@ -41,102 +41,206 @@ def variable_buffer(s):
     return varint(len(s)) + s
 
 
+def serialize_into(obj, buffer):
+    """ Append the wire format of ``obj`` to ``buffer`` (a ``bytearray``)
+
+        Objects without a ``serialize_into()`` method (e.g. public keys)
+        are encoded with ``bytes()``.
+    """
+    write = getattr(obj, "serialize_into", None)
+    if write is None:
+        buffer += bytes(obj)
+    else:
+        write(buffer)
+
+
+class Serializable(object):
+    """ ``bytes()`` of types that write their wire format with
+        ``serialize_into(buffer)``
+    """
+    __slots__ = ()
+
+    def __bytes__(self):
+        buffer = bytearray()
+        self.serialize_into(buffer)
+        return bytes(buffer)
+
+
 def JsonObj(data):
     """ Returns json object from data
     """
     return json.loads(str(data))
 
 
+def to_native(obj):
+    """ Returns the json object (dicts, lists, strings and numbers) of
+        ``obj``
+
+        Objects without a ``to_native()`` method are converted with
+        :func:`JsonObj`, or to their string if that is not valid json.
+    """
+    native = getattr(obj, "to_native", None)
+    if native is not None:
+        return native()
+    try:
+        return JsonObj(obj)
+    except Exception:
+        return str(obj)
+
+
 class Uint8():
+    __slots__ = ("data",)
+
     def __init__(self, d):
         self.data = int(d)
 
     def __bytes__(self):
         return struct.pack("<B", self.data)
 
+    def serialize_into(self, buffer):
+        buffer += struct.pack("<B", self.data)
+
     def __str__(self):
         return '%d' % self.data
 
+    def to_native(self):
+        return self.data
+
 
 class Int16():
+    __slots__ = ("data",)
+
     def __init__(self, d):
         self.data = int(d)
 
     def __bytes__(self):
         return struct.pack("<h", int(self.data))
 
+    def serialize_into(self, buffer):
+        buffer += struct.pack("<h", int(self.data))
+
     def __str__(self):
         return '%d' % self.data
 
+    def to_native(self):
+        return self.data
+
 
 class Uint16():
+    __slots__ = ("data",)
+
     def __init__(self, d):
         self.data = int(d)
 
     def __bytes__(self):
         return struct.pack("<H", self.data)
 
+    def serialize_into(self, buffer):
+        buffer += struct.pack("<H", self.data)
+
     def __str__(self):
         return '%d' % self.data
 
+    def to_native(self):
+        return self.data
+
 
 class Uint32():
+    __slots__ = ("data",)
+
     def __init__(self, d):
         self.data = int(d)
 
     def __bytes__(self):
         return struct.pack("<I", self.data)
 
+    def serialize_into(self, buffer):
+        buffer += struct.pack("<I", self.data)
+
     def __str__(self):
         return '%d' % self.data
 
+    def to_native(self):
+        return self.data
+
 
 class Uint64():
+    __slots__ = ("data",)
+
     def __init__(self, d):
         self.data = int(d)
 
     def __bytes__(self):
         return struct.pack("<Q", self.data)
 
+    def serialize_into(self, buffer):
+        buffer += struct.pack("<Q", self.data)
+
     def __str__(self):
         return '%d' % self.data
 
+    def to_native(self):
+        return self.data
+
 
 class Varint32():
+    __slots__ = ("data",)
+
     def __init__(self, d):
         self.data = int(d)
 
     def __bytes__(self):
         return varint(self.data)
 
+    def serialize_into(self, buffer):
+        buffer += varint(self.data)
+
     def __str__(self):
         return '%d' % self.data
 
+    def to_native(self):
+        return self.data
+
 
 class Int64():
+    __slots__ = ("data",)
+
     def __init__(self, d):
         self.data = int(d)
 
     def __bytes__(self):
         return struct.pack("<q", self.data)
 
+    def serialize_into(self, buffer):
+        buffer += struct.pack("<q", self.data)
+
     def __str__(self):
         return '%d' % self.data
 
+    def to_native(self):
+        return self.data
+
+
+class String(Serializable):
+    __slots__ = ("data",)
 
-class String():
     def __init__(self, d):
         self.data = d
 
-    def __bytes__(self):
+    def serialize_into(self, buffer):
         d = self.unicodify()
-        return varint(len(d)) + d
+        buffer += varint(len(d))
+        buffer += d
 
     def __str__(self):
         return '%s' % str(self.data)
+
     def json(self):
         return '%s' % str(self.data)
 
+    def to_native(self):
+        return str(self.data)
+
     def unicodify(self):
         r = []
         for s in self.data:
@@ -162,7 +266,9 @@ class String():
         return bytes("".join(r), "utf-8")
 
 
-class Bytes():
+class Bytes(Serializable):
+    __slots__ = ("data", "length")
+
     def __init__(self, d, length=None):
         self.data = d
         if length:
@@ -170,165 +276,243 @@ class Bytes():
         else:
             self.length = len(self.data)
 
-    def __bytes__(self):
+    def serialize_into(self, buffer):
         # FIXME constraint data to self.length
         d = unhexlify(bytes(self.data, 'utf-8'))
-        return varint(len(d)) + d
+        buffer += varint(len(d))
+        buffer += d
 
     def __str__(self):
         return str(self.data)
 
+    def to_native(self):
+        return str(self.data)
+
 
 class Void():
+    __slots__ = ()
+
     def __init__(self):
         pass
 
     def __bytes__(self):
         return b''
 
+    def serialize_into(self, buffer):
+        pass
+
     def __str__(self):
         return ""
 
+    def to_native(self):
+        return ""
+
+
+class Array(Serializable):
+    __slots__ = ("data",)
 
-class Array():
     def __init__(self, d):
         self.data = d
-        self.length = Varint32(len(self.data))
 
-    def __bytes__(self):
-        return bytes(self.length) + b"".join([bytes(a) for a in self.data])
+    @property
+    def length(self):
+        return Varint32(len(self.data))
 
-    def __str__(self):
-        r = []
+    def serialize_into(self, buffer):
+        buffer += varint(len(self.data))
         for a in self.data:
-            try:
-                r.append(JsonObj(a))
-            except:
-                r.append(str(a))
-        return json.dumps(r)
+            serialize_into(a, buffer)
+
+    def __str__(self):
+        return json.dumps(self.to_native())
 
+    def to_native(self):
+        return [to_native(a) for a in self.data]
+
+
+class Pair(Serializable):
+    __slots__ = ("_type", "data")
 
-class Pair():
     def __init__(self, _type, d):
         self._type = _type
         self.data = d
-    def __bytes__(self):       
-        b = b"".join([bytes(self._type),bytes(self.data)])
-        return b
+
+    def serialize_into(self, buffer):
+        serialize_into(self._type, buffer)
+        serialize_into(self.data, buffer)
+
     def __str__(self):
-        r = []
-        r.append(JsonObj(self._type))
-        r.append(JsonObj(self.data))
-        return json.dumps(r)
+        return json.dumps(self.to_native())
+
+    def to_native(self):
+        return [to_native(self._type), to_native(self.data)]
 
 
 class PointInTime():
+    __slots__ = ("data",)
+
     def __init__(self, d):
         self.data = d
 
     def __bytes__(self):
         return struct.pack("<I", timegm(time.strptime((self.data + "UTC"), timeformat)))
 
+    def serialize_into(self, buffer):
+        buffer += bytes(self)
+
     def __str__(self):
         return self.data
 
+    def to_native(self):
+        return self.data
+
 
 class Signature():
+    __slots__ = ("data",)
+
     def __init__(self, d):
         self.data = d
 
     def __bytes__(self):
         return self.data
 
+    def serialize_into(self, buffer):
+        buffer += self.data
+
     def __str__(self):
-        return json.dumps(hexlify(self.data).decode('ascii'))
+        return json.dumps(self.to_native())
+
+    def to_native(self):
+        return hexlify(self.data).decode('ascii')
 
 
 class Bool(Uint8):  # Bool = Uint8
+    __slots__ = ()
+
     def __init__(self, d):
         super().__init__(d)
 
     def __str__(self):
         return json.dumps(True) if self.data else json.dumps(False)
 
+    def to_native(self):
+        return bool(self.data)
+
 
 class Set(Array):  # Set = Array
+    __slots__ = ()
+
     def __init__(self, d):
         super().__init__(d)
 
 
 class Fixed_array():
+    __slots__ = ()
+
     def __init__(self, d):
         raise NotImplementedError
 
     def __bytes__(self):
         raise NotImplementedError
 
+    def serialize_into(self, buffer):
+        raise NotImplementedError
+
     def __str__(self):
         raise NotImplementedError
 
+    def to_native(self):
+        raise NotImplementedError
+
+
+class Optional(Serializable):
+    __slots__ = ("data",)
 
-class Optional():
     def __init__(self, d):
         self.data = d
 
-    def __bytes__(self):
+    def serialize_into(self, buffer):
         if not self.data:
-            return bytes(Bool(0))
-        else:
-            return bytes(Bool(1)) + bytes(self.data) if bytes(self.data) else bytes(Bool(0))
+            buffer += b"\x00"
+            return
+        start = len(buffer)
+        buffer += b"\x01"
+        serialize_into(self.data, buffer)
+        if len(buffer) == start + 1:
+            # A value that encodes to nothing counts as empty
+            buffer[start:] = b"\x00"
 
     def __str__(self):
         return str(self.data)
 
+    def to_native(self):
+        return to_native(self.data)
+
     def isempty(self):
         if not self.data:
             return True
         return not bool(bytes(self.data))
 
 
-class Static_variant():
+class Static_variant(Serializable):
+    __slots__ = ("data", "type_id")
+
     def __init__(self, d, type_id):
         self.data = d
         self.type_id = type_id
 
-    def __bytes__(self):
-        return varint(self.type_id) + bytes(self.data)
+    def serialize_into(self, buffer):
+        buffer += varint(self.type_id)
+        serialize_into(self.data, buffer)
 
     def __str__(self):
-        return json.dumps([self.type_id, self.data.json()])
+        return json.dumps(self.to_native())
+
+    def to_native(self):
+        return [self.type_id, to_native(self.data)]
+
 
+class Map(Serializable):
+    __slots__ = ("data",)
 
-class Map():
     def __init__(self, data):
         self.data = data
 
-    def __bytes__(self):
-        b = b""
-        b += varint(len(self.data))
+    def serialize_into(self, buffer):
+        buffer += varint(len(self.data))
         for e in self.data:
-            b += bytes(e[0]) + bytes(e[1])
-        return b
+            serialize_into(e[0], buffer)
+            serialize_into(e[1], buffer)
 
     def __str__(self):
-        r = []
-        for e in self.data:
-            r.append([str(e[0]), str(e[1])])
-        return json.dumps(r)
+        return json.dumps(self.to_native())
+
+    def to_native(self):
+        return [[str(e[0]), str(e[1])] for e in self.data]
 
 
 class Id():
+    __slots__ = ("data",)
+
     def __init__(self, d):
         self.data = Varint32(d)
 
     def __bytes__(self):
         return bytes(self.data)
 
+    def serialize_into(self, buffer):
+        buffer += varint(self.data.data)
+
     def __str__(self):
         return str(self.data)
 
+    def to_native(self):
+        return self.data.data
+
 
 class VoteId():
+    __slots__ = ("type", "instance")
+
     def __init__(self, vote):
         parts = vote.split(":")
         assert len(parts) == 2
@@ -339,9 +523,15 @@ class VoteId():
         binary = (self.type & 0xff) | (self.instance << 8)
         return struct.pack("<I", binary)
 
+    def serialize_into(self, buffer):
+        buffer += bytes(self)
+
     def __str__(self):
         return "%d:%d" % (self.type, self.instance)
 
+    def to_native(self):
+        return str(self)
+
 
 # class Lua():
 #     def __init__(self, d):
@@ -355,51 +545,83 @@ class VoteId():
 
 class ObjectId():
     """ Encodes protocol ids - serializes to the *instance* only!
+
+        Only the id and its instance are kept; ``space``, ``type`` and
+        ``instance`` are derived from them when needed.
     """
+    __slots__ = ("Id", "_instance")
+
     def __init__(self, object_str, type_verify=None):
         if len(object_str.split(".")) == 3:
-            space, type, id = object_str.split(".")
-            self.space = Uint8(space)
-            self.type = Uint8(type)
-            self.instance = Uint64(id)
+            space, type, id = [int(p) for p in object_str.split(".")]
+            self._instance = id
             self.Id = object_str
             if type_verify:
-                assert object_type[type_verify] == int(type),\
+                assert object_type[type_verify] == type,\
                     "Object id does not match object type! " +\
                     "Excpected %d, got %d" %\
-                    (object_type[type_verify], int(type))
+                    (object_type[type_verify], type)
         else:
             raise Exception("Object id is invalid")
 
+    @property
+    def space(self):
+        return Uint8(self.Id.split(".")[0])
+
+    @property
+    def type(self):
+        return Uint8(self.Id.split(".")[1])
+
+    @property
+    def instance(self):
+        return Uint64(self._instance)
+
     def __bytes__(self):
-        return bytes(self.instance)  # only yield instance
+        return struct.pack("<Q", self._instance)  # only yield instance
+
+    def serialize_into(self, buffer):
+        buffer += struct.pack("<Q", self._instance)
 
     def __str__(self):
         return self.Id
 
+    def to_native(self):
+        return self.Id
+
 
 class FullObjectId():
     """ Encodes object ids - serializes to a full object id
     """
+    __slots__ = ("Id", "space", "type", "id")
+
     def __init__(self, object_str):
         if len(object_str.split(".")) == 3:
             space, type, id = object_str.split(".")
             self.space = int(space)
             self.type = int(type)
             self.id = int(id)
-            self.instance = Id(int(id))
             self.Id = object_str
         else:
             raise Exception("Object id is invalid")
 
+    @property
+    def instance(self):
+        return Id(self.id)
+
     def __bytes__(self):
         return (
             self.space << 56 | self.type << 48 | self.id
         ).to_bytes(8, byteorder="little", signed=False)
 
+    def serialize_into(self, buffer):
+        buffer += bytes(self)
+
     def __str__(self):
         return self.Id
 
+    def to_native(self):
+        return self.Id
+
 
 # class Enum8(Uint8):
 #     def __init__(self, selection):
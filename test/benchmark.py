@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" Throughput benchmarks that run against a recording instead of a node
+
+    Record the traffic of one run against a real node:
+
+        python3 test/benchmark.py --record ws://127.0.0.1:8049 bench.jsonl
+
+    and replay it as often as needed (e.g. in CI) without network access:
+
+        python3 test/benchmark.py --replay bench.jsonl --latency 0.02 --jitter 0.005
+"""
+
+import argparse
+import time
+
+from PythonMiddleware.graphene import Graphene
+from PythonMiddleware.instance import set_shared_graphene_instance
+from PythonMiddleware.blockchain import Blockchain
+from PythonMiddleware.market import Market
+from PythonMiddlewareapi.replay import RecordingTransport, ReplayTransport
+
+#account info for test
+defaultAccount = "test1"
+privateKey = "5JAt3WmMCqQvAqqq4Mr7ZisN8ztrrPZCTHCN7f8Vrx8j1cHY4hy"
+
+
+def bench(name, fn, rounds):
+    start = time.time()
+    for _ in range(rounds):
+        fn()
+    elapsed = time.time() - start
+    print("%-20s %8.2f ops/s  (%d rounds in %.3fs)" % (
+        name, rounds / elapsed, rounds, elapsed))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--record", metavar="NODE", help="record the traffic with NODE")
+    parser.add_argument("--replay", action="store_true", help="replay a recording")
+    parser.add_argument("--latency", type=float, default=None)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--blocks", type=int, default=100)
+    parser.add_argument("--market", default="COCOS:USDT")
+    parser.add_argument("recording")
+    args = parser.parse_args()
+
+    if args.record:
+        node = args.record
+        transport = RecordingTransport(args.recording)
+    else:
+        node = "ws://replay"
+        transport = ReplayTransport(
+            args.recording, latency=args.latency, jitter=args.jitter)
+
+    gph = Graphene(
+        node=node,
+        transport=transport,
+        chain_cache=False,
+        nobroadcast=True,
+        keys=[privateKey])
+    set_shared_graphene_instance(gph)
+
+    blockchain = Blockchain(graphene_instance=gph)
+    start = blockchain.get_current_block_num() - args.blocks
+
+    def blocks():
+        for block in blockchain.blocks(start=start):
+            if block["block_num"] >= start + args.blocks:
+                break
+
+    market = Market(args.market, graphene_instance=gph)
+
+    bench("Blockchain.blocks", blocks, 1)
+    bench("Market.orderbook", lambda: market.orderbook(), args.rounds)
+    bench("Graphene.transfer", lambda: gph.transfer(
+        defaultAccount, "1", "1.3.0", account=defaultAccount), args.rounds)
+
+
+if __name__ == "__main__":
+    main()
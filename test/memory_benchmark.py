@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" Memory used by built operations, e.g. while batching
+
+        python3 test/memory_benchmark.py --count 20000
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+import PythonMiddleware  # imports PythonMiddlewarebase in the right order
+from PythonMiddlewarebase import operations
+from PythonMiddlewarebase.types import ObjectId, Uint64, String
+
+
+def transfer(i):
+    return operations.Operation(operations.Transfer(**{
+        "from": "1.2.%d" % (16 + i % 1000),
+        "to": "1.2.%d" % (17 + i % 1000),
+        "amount": {"amount": 1000 + i, "asset_id": "1.3.0"},
+        "memo": [0, "payout %d" % i],
+        "extensions": [],
+    }))
+
+
+def measure(name, build, count):
+    gc.collect()
+    tracemalloc.start()
+    objects = [build(i) for i in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("%-20s %10.1f bytes each  (%d objects, %.1f MB)" % (
+        name, float(size) / count, count, size / 1e6))
+    return objects
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=20000)
+    args = parser.parse_args()
+
+    measure("ObjectId", lambda i: ObjectId("1.2.%d" % i, "account"), args.count)
+    measure("Uint64", lambda i: Uint64(i), args.count)
+    measure("String", lambda i: String("payout"), args.count)
+    measure("Operation(Transfer)", transfer, args.count)
+
+
+if __name__ == "__main__":
+    main()
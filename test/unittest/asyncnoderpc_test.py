@@ -0,0 +1,125 @@
+import asyncio
+import json
+import unittest
+
+import websockets
+
+import PythonMiddleware  # imports PythonMiddlewarebase in the right order
+from PythonMiddlewareapi.asyncnoderpc import (
+    AsyncGrapheneWebsocketRPC, AsyncGrapheneNodeRPC)
+from PythonMiddlewarebase.chains import known_chains
+
+CHAIN_ID = known_chains["prod"]["chain_id"]
+APIS = {"login": True, "database": 2, "history": 3, "network_broadcast": 4}
+
+
+async def fake_node(ws):
+    """ Websocket handler that answers every call with its parameters.
+        Some methods behave differently:
+
+        * ``sleep``: answers after sleeping for its first parameter
+        * ``junk``: sends a JSON array and a number before the answer
+        * ``die``: closes the connection without answering
+    """
+    async def reply(request, delay=0):
+        await asyncio.sleep(delay)
+        api_id, method, params = request["params"]
+        if method in APIS:
+            result = APIS[method]
+        elif method == "get_chain_properties":
+            result = {"chain_id": CHAIN_ID}
+        else:
+            result = [api_id, method, params]
+        await ws.send(json.dumps({"id": request["id"], "result": result}))
+
+    tasks = []
+    async for message in ws:
+        request = json.loads(message)
+        method, params = request["params"][1:]
+        if method == "die":
+            await ws.close()
+            break
+        if method == "junk":
+            await ws.send("[1, 2]")
+            await ws.send("5")
+        delay = params[0] if method == "sleep" else 0
+        tasks.append(asyncio.ensure_future(reply(request, delay)))
+    for task in tasks:
+        task.cancel()
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(asyncio.wait_for(coro, 10))
+    finally:
+        loop.close()
+
+
+class AsyncRPCTestCase(unittest.TestCase):
+    def call(self, fn, cls=AsyncGrapheneWebsocketRPC):
+        """ Run ``fn(rpc)`` against a fake node
+        """
+        async def main():
+            server = await websockets.serve(fake_node, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            rpc = cls("ws://127.0.0.1:%d" % port, num_retries=0)
+            try:
+                return await fn(rpc)
+            finally:
+                await rpc.close()
+                server.close()
+                await server.wait_closed()
+        return run(main())
+
+    def testFirstCallConnects(self):
+        async def fn(rpc):
+            return await rpc.get_block(1, api="database")
+        self.assertEqual(self.call(fn), [2, "get_block", [1]])
+
+    def testUnknownApi(self):
+        async def fn(rpc):
+            with self.assertRaises(ValueError):
+                await rpc.get_block(1, api="asset")
+            return rpc.ws is not None
+        self.assertTrue(self.call(fn))
+
+    def testMultiplexed(self):
+        async def fn(rpc):
+            # Replies arrive in the reverse order of the calls
+            return await asyncio.gather(
+                *[rpc.sleep(0.05 * (5 - n), n) for n in range(5)])
+        self.assertEqual(
+            self.call(fn),
+            [[0, "sleep", [0.05 * (5 - n), n]] for n in range(5)])
+
+    def testSkipNonObjectReplies(self):
+        async def fn(rpc):
+            first = await rpc.junk(1)
+            return first, await rpc.get_block(2)
+        self.assertEqual(
+            self.call(fn),
+            ([0, "junk", [1]], [0, "get_block", [2]]))
+
+    def testConnectionClosed(self):
+        async def fn(rpc):
+            pending = asyncio.ensure_future(rpc.sleep(5))
+            await asyncio.sleep(0.05)
+            with self.assertRaises(websockets.exceptions.ConnectionClosed):
+                await rpc.die()
+            with self.assertRaises(websockets.exceptions.ConnectionClosed):
+                await pending
+            # The next call connects again
+            return await rpc.get_block(3)
+        self.assertEqual(self.call(fn), [0, "get_block", [3]])
+
+    def testNetwork(self):
+        async def fn(rpc):
+            await rpc.connect()
+            return rpc.chain_params
+        self.assertEqual(
+            self.call(fn, AsyncGrapheneNodeRPC), known_chains["prod"])
+
+
+if __name__ == '__main__':
+    unittest.main()
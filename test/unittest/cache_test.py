@@ -0,0 +1,59 @@
+import time
+import unittest
+
+import PythonMiddleware  # imports PythonMiddlewarebase in the right order
+from PythonMiddlewareapi.cache import ResponseCache, CACHE_FOREVER, CACHE_IRREVERSIBLE
+
+
+class ResponseCacheTestCase(unittest.TestCase):
+    def testPolicies(self):
+        cache = ResponseCache(policies={"get_dynamic_global_properties": 1})
+        self.assertEqual(cache.policy("get_chain_properties"), CACHE_FOREVER)
+        self.assertEqual(cache.policy("get_block"), CACHE_IRREVERSIBLE)
+        self.assertEqual(cache.policy("get_dynamic_global_properties"), 1)
+        self.assertIsNone(cache.policy("broadcast_transaction"))
+
+    def testHitReturnsCopy(self):
+        cache = ResponseCache()
+        cache.put("a", {"x": [1]})
+        hit, result = cache.get("a")
+        self.assertTrue(hit)
+        result["x"].append(2)
+        self.assertEqual(cache.get("a"), (True, {"x": [1]}))
+        self.assertEqual(cache.get("b"), (False, None))
+        self.assertEqual(cache.stats()["hits"], 2)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def testLeastRecentlyUsed(self):
+        cache = ResponseCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertEqual(cache.get("b"), (False, None))
+        self.assertEqual(cache.get("a"), (True, 1))
+        self.assertEqual(cache.get("c"), (True, 3))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def testMaxBytes(self):
+        cache = ResponseCache(max_bytes=20)
+        cache.put("a", "x" * 9)
+        cache.put("b", "y" * 9)
+        self.assertEqual(len(cache), 1)
+        self.assertLessEqual(cache.stats()["bytes"], 20)
+        # Results larger than the whole cache are not stored at all
+        cache.put("c", "z" * 30)
+        self.assertEqual(cache.get("c"), (False, None))
+        self.assertEqual(cache.get("b"), (True, "y" * 9))
+
+    def testTimeToLive(self):
+        cache = ResponseCache()
+        cache.put("a", 1, ttl=0.05)
+        self.assertEqual(cache.get("a"), (True, 1))
+        time.sleep(0.1)
+        self.assertEqual(cache.get("a"), (False, None))
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import threading
+import unittest
+
+import websocket
+import websockets
+
+import PythonMiddleware  # imports PythonMiddlewarebase in the right order
+from PythonMiddlewareapi.compression import (
+    DEFLATE_OFFER, DeflateStats, DeflateTransport, DeflateWebSocket)
+from PythonMiddlewareapi.graphenenoderpc import GrapheneWebsocketRPC
+
+
+async def echo(ws):
+    """ Answer every call with its parameters and some padding that
+        compresses well
+    """
+    async for message in ws:
+        request = json.loads(message)
+        await ws.send(json.dumps({
+            "id": request["id"],
+            "result": {"params": request["params"], "padding": "COCOS" * 500}}))
+
+
+class Node(object):
+    """ Local websocket node in a background thread
+
+        :param compression: ``"deflate"`` or ``None``
+    """
+    def __init__(self, compression="deflate"):
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        async def serve():
+            self.server = await websockets.serve(
+                echo, "127.0.0.1", 0, compression=compression)
+            self.url = "ws://127.0.0.1:%d" % self.server.sockets[0].getsockname()[1]
+            ready.set()
+            await self.server.wait_closed()
+
+        self.thread = threading.Thread(target=self.loop.run_until_complete, args=(serve(),))
+        self.thread.daemon = True
+        self.thread.start()
+        ready.wait(5)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.server.close)
+        self.thread.join(5)
+        self.loop.close()
+
+
+class CompressionTestCase(unittest.TestCase):
+    def start(self, compression="deflate"):
+        node = Node(compression)
+        self.addCleanup(node.stop)
+        return node.url
+
+    def call(self, ws, n):
+        ws.send(json.dumps({"id": n, "method": "call", "params": [0, "get_block", [n]]}))
+        return json.loads(ws.recv())
+
+    def testNegotiate(self):
+        url = self.start()
+        ws = DeflateWebSocket()
+        ws.connect(url)
+        self.addCleanup(ws.close)
+        self.assertTrue(ws.deflate)
+        for n in range(3):
+            reply = self.call(ws, n)
+            self.assertEqual(reply["result"]["params"], [0, "get_block", [n]])
+        stats = ws.stats.stats()
+        self.assertEqual(stats["compressed_messages"], 3)
+        self.assertGreater(stats["ratio"], 0.5)
+
+    def testNotSupported(self):
+        url = self.start(None)
+        ws = DeflateWebSocket()
+        ws.connect(url)
+        self.addCleanup(ws.close)
+        self.assertFalse(ws.deflate)
+        self.assertEqual(self.call(ws, 1)["id"], 1)
+        self.assertEqual(ws.stats.compressed_messages, 0)
+        self.assertEqual(ws.stats.bytes_saved, 0)
+
+    def testUpgrade(self):
+        # Like the socket of a websocket.WebSocketApp
+        url = self.start()
+        ws = websocket.WebSocket(skip_utf8_validation=True)
+        ws.connect(url, header=[DEFLATE_OFFER])
+        self.addCleanup(ws.close)
+        stats = DeflateStats()
+        DeflateWebSocket.upgrade(ws, stats)
+        self.assertTrue(ws.deflate)
+        self.assertEqual(self.call(ws, 1)["id"], 1)
+        self.assertEqual(stats.compressed_messages, 1)
+
+    def testRPC(self):
+        url = self.start()
+        rpc = GrapheneWebsocketRPC(url, health_check_interval=0)
+        self.addCleanup(rpc.close)
+        self.assertIsInstance(rpc.transport, DeflateTransport)
+        self.assertEqual(rpc.get_block(1)["params"], [0, "get_block", [1]])
+        self.assertGreater(rpc.compression_stats.bytes_saved, 0)
+
+        plain = GrapheneWebsocketRPC(url, health_check_interval=0, compression=False)
+        self.addCleanup(plain.close)
+        self.assertIsNone(plain.compression_stats)
+        self.assertEqual(plain.get_block(2)["params"], [0, "get_block", [2]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import threading
+import time
+import unittest
+
+import PythonMiddleware  # imports PythonMiddlewarebase in the right order
+from PythonMiddlewareapi.graphenenoderpc import GrapheneWebsocketRPC
+from rpc_test import FakeNode, URL
+
+
+class CountingNode(FakeNode):
+    """ :class:`rpc_test.FakeNode` that answers after ``delay`` seconds
+        and counts the open connections
+    """
+    delay = 0.001
+    lock = threading.Lock()
+    opened = 0
+    open = 0
+    max_open = 0
+
+    def connect(self, url, **kwargs):
+        super(CountingNode, self).connect(url, **kwargs)
+        with self.lock:
+            CountingNode.opened += 1
+            CountingNode.open += 1
+            CountingNode.max_open = max(CountingNode.max_open, CountingNode.open)
+
+    def close(self):
+        if self.connected:
+            with self.lock:
+                CountingNode.open -= 1
+        super(CountingNode, self).close()
+
+    def recv(self):
+        time.sleep(self.delay)
+        return super(CountingNode, self).recv()
+
+
+class ConnectionPoolTestCase(unittest.TestCase):
+    def setUp(self):
+        CountingNode.opened = CountingNode.open = CountingNode.max_open = 0
+
+    def connect(self, **kwargs):
+        rpc = GrapheneWebsocketRPC(
+            URL, transport=CountingNode, health_check_interval=0, **kwargs)
+        self.addCleanup(rpc.close)
+        return rpc
+
+    def run_threads(self, target, count):
+        errors = []
+
+        def run(n):
+            try:
+                target(n)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run, args=(n,)) for n in range(count)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+
+    def testThreads(self):
+        rpc = self.connect(max_connections=4)
+        results = {}
+
+        def calls(n):
+            results[n] = [rpc.get_block(n, i) for i in range(20)]
+
+        self.run_threads(calls, 8)
+        for n in range(8):
+            self.assertEqual(
+                results[n], [[0, "get_block", [n, i]] for i in range(20)])
+        self.assertLessEqual(CountingNode.max_open, 4)
+        self.assertGreater(CountingNode.max_open, 1)
+
+    def testMaxConnections(self):
+        rpc = self.connect(max_connections=2)
+        held = []
+        lock = threading.Lock()
+        most = []
+
+        def hold(n):
+            with rpc.connection():
+                with lock:
+                    held.append(n)
+                    most.append(len(held))
+                time.sleep(0.02)
+                with lock:
+                    held.remove(n)
+
+        self.run_threads(hold, 6)
+        self.assertEqual(max(most), 2)
+        self.assertEqual(CountingNode.opened, 2)
+
+    def testReentrant(self):
+        rpc = self.connect()
+        with rpc.connection() as conn:
+            rpc.get_block(1)
+            rpc.get_account_history("1.2.5", api="history")
+            self.assertIs(rpc.ws, conn.ws)
+        self.assertEqual(CountingNode.opened, 1)
+        # The connection is returned to the pool and used again
+        rpc.get_block(2)
+        self.assertEqual(CountingNode.opened, 1)
+
+    def testBrokenConnectionDropped(self):
+        rpc = self.connect()
+        with rpc.connection() as conn:
+            conn.ws.close()
+        self.assertEqual(rpc._num_connections, 0)
+        self.assertEqual(rpc.get_block(1), [0, "get_block", [1]])
+        self.assertEqual(CountingNode.opened, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
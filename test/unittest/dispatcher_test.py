@@ -0,0 +1,88 @@
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import PythonMiddleware  # imports PythonMiddlewarebase in the right order
+from PythonMiddlewareapi.dispatcher import (
+    EventDispatcher, OVERFLOW_DROP_OLDEST, OVERFLOW_SPILL)
+
+
+class Recorder(object):
+    """ Event handler that records the events, optionally after
+        waiting for ``gate``
+    """
+    def __init__(self, gate=None):
+        self.events = []
+        self.gate = gate
+        self.lock = threading.Lock()
+
+    def __call__(self, name, payload):
+        if self.gate is not None:
+            self.gate.wait()
+        if payload == "fail":
+            raise ValueError("boom")
+        with self.lock:
+            self.events.append((name, payload))
+
+
+class EventDispatcherTestCase(unittest.TestCase):
+    def testOrderPerKey(self):
+        handler = Recorder()
+        dispatcher = EventDispatcher(handler, workers=4)
+        for i in range(100):
+            dispatcher.submit("1.2.%d" % (i % 5), "on_object", i)
+        dispatcher.stop()
+        self.assertEqual(len(handler.events), 100)
+        for key in range(5):
+            payloads = [p for _, p in handler.events if p % 5 == key]
+            self.assertEqual(payloads, sorted(payloads))
+        self.assertEqual(dispatcher.metrics()["dispatched"], 100)
+
+    def testErrorsDoNotStopWorkers(self):
+        handler = Recorder()
+        dispatcher = EventDispatcher(handler)
+        dispatcher.submit("a", "on_object", "fail")
+        dispatcher.submit("a", "on_object", "ok")
+        dispatcher.stop()
+        self.assertEqual(handler.events, [("on_object", "ok")])
+        self.assertEqual(dispatcher.metrics()["errors"], 1)
+
+    def testDropOldest(self):
+        gate = threading.Event()
+        handler = Recorder(gate)
+        dispatcher = EventDispatcher(
+            handler, max_queue=2, overflow=OVERFLOW_DROP_OLDEST)
+        dispatcher.submit("a", "on_object", 0)
+        time.sleep(0.05)  # the worker waits in the handler with event 0
+        for i in range(1, 5):
+            dispatcher.submit("a", "on_object", i)
+        self.assertEqual(dispatcher.metrics()["depth"], 2)
+        gate.set()
+        dispatcher.stop()
+        self.assertEqual([p for _, p in handler.events], [0, 3, 4])
+        self.assertEqual(dispatcher.metrics()["dropped"], 2)
+
+    def testSpill(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        gate = threading.Event()
+        handler = Recorder(gate)
+        dispatcher = EventDispatcher(
+            handler, max_queue=2, overflow=OVERFLOW_SPILL, spill_dir=directory)
+        for i in range(10):
+            dispatcher.submit("a", "on_object", i)
+        self.assertGreater(dispatcher.metrics()["spill_depth"], 0)
+        gate.set()
+        dispatcher.stop()
+        self.assertEqual([p for _, p in handler.events], list(range(10)))
+        self.assertGreater(dispatcher.metrics()["spilled"], 0)
+
+    def testUnknownOverflow(self):
+        with self.assertRaises(ValueError):
+            EventDispatcher(Recorder(), overflow="explode")
+
+
+if __name__ == '__main__':
+    unittest.main()
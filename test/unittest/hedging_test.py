@@ -0,0 +1,81 @@
+import time
+import unittest
+
+import PythonMiddleware  # imports PythonMiddlewarebase in the right order
+from PythonMiddlewareapi.graphenenoderpc import GrapheneWebsocketRPC
+from rpc_test import FakeNode
+
+A = "ws://127.0.0.1:8049"
+B = "ws://127.0.0.1:8050"
+
+
+class DelayedNode(FakeNode):
+    """ :class:`rpc_test.FakeNode` that answers after the delay of its
+        URL and logs the calls per URL
+    """
+    delays = {}
+    received = {}
+
+    def __init__(self, url):
+        super(DelayedNode, self).__init__(url)
+        self.url = url
+
+    def reply(self, request):
+        self.received.setdefault(self.url, []).append(request["params"][1])
+        return super(DelayedNode, self).reply(request)
+
+    def recv(self):
+        time.sleep(self.delays.get(self.url, 0))
+        return super(DelayedNode, self).recv()
+
+
+class HedgingTestCase(unittest.TestCase):
+    def connect(self, delays, **kwargs):
+        DelayedNode.delays = delays
+        DelayedNode.received = {}
+        rpc = GrapheneWebsocketRPC(
+            [A, B], transport=DelayedNode, health_check_interval=0,
+            hedge_delay=0.05, **kwargs)
+        self.addCleanup(rpc.close)
+        # A is the best node
+        rpc.nodes.record(A, 0.01)
+        rpc.nodes.record(B, 0.02)
+        return rpc
+
+    def timed(self, fn, *args, **kwargs):
+        start = time.time()
+        result = fn(*args, **kwargs)
+        return result, time.time() - start
+
+    def testHedgeSlowNode(self):
+        rpc = self.connect({A: 0.5}, hedge=True)
+        result, took = self.timed(rpc.get_block, 1)
+        self.assertEqual(result, [0, "get_block", [1]])
+        self.assertLess(took, 0.4)
+        self.assertEqual(DelayedNode.received[B], ["get_block"])
+
+    def testFastNode(self):
+        rpc = self.connect({}, hedge=True)
+        rpc.get_block(1)
+        self.assertEqual(DelayedNode.received[A], ["get_block"])
+        self.assertNotIn(B, DelayedNode.received)
+
+    def testPerCall(self):
+        rpc = self.connect({})
+        rpc.get_block(1)
+        DelayedNode.delays[A] = 0.5
+        _, took = self.timed(rpc.get_block, 2, hedge=True)
+        self.assertLess(took, 0.4)
+        self.assertEqual(DelayedNode.received[A], ["get_block", "get_block"])
+        self.assertEqual(DelayedNode.received[B], ["get_block"])
+
+    def testNeverHedgeWrites(self):
+        rpc = self.connect({A: 0.2}, hedge=True)
+        _, took = self.timed(rpc.broadcast_transaction, {})
+        self.assertGreaterEqual(took, 0.2)
+        self.assertEqual(DelayedNode.received[A], ["broadcast_transaction"])
+        self.assertNotIn(B, DelayedNode.received)
+
+
+if __name__ == '__main__':
+    unittest.main()
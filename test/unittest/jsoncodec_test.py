@@ -0,0 +1,62 @@
+import json
+import unittest
+
+import PythonMiddleware  # imports PythonMiddlewarebase in the right order
+from PythonMiddlewareapi import jsoncodec
+from PythonMiddlewareapi.jsoncodec import JSONCodec
+
+MODULES = [
+    module for module, loaded in [
+        ("json", json),
+        ("ujson", jsoncodec.ujson),
+        ("orjson", jsoncodec.orjson)]
+    if loaded is not None]
+
+PAYLOAD = {
+    "method": "call",
+    "params": [0, "get_objects", [["1.2.0", "1.3.0"]]],
+    "jsonrpc": "2.0",
+    "id": 1,
+    "memo": u"café ✓",
+    "amount": 2 ** 62,
+    "ratio": 0.5,
+    "flags": [True, False, None]}
+
+
+class JSONCodecTestCase(unittest.TestCase):
+    def testRoundTrip(self):
+        for module in MODULES:
+            with self.subTest(module=module):
+                codec = JSONCodec(module)
+                data = codec.dumps(PAYLOAD)
+                self.assertIsInstance(data, bytes)
+                self.assertEqual(json.loads(data.decode("utf8")), PAYLOAD)
+                self.assertEqual(codec.loads(data), PAYLOAD)
+                self.assertEqual(codec.loads(data.decode("utf8")), PAYLOAD)
+
+    def testFallback(self):
+        # Beyond 64 bit and raw control characters, which only the
+        # standard library accepts
+        big = {"amount": 2 ** 70}
+        for module in MODULES:
+            with self.subTest(module=module):
+                codec = JSONCodec(module)
+                self.assertEqual(codec.loads(codec.dumps(big)), big)
+                self.assertEqual(
+                    codec.loads('{"memo": "a\tb\nc"}'), {"memo": "a\tb\nc"})
+
+    def testInvalid(self):
+        for module in MODULES:
+            with self.subTest(module=module):
+                with self.assertRaises(ValueError):
+                    JSONCodec(module).loads(b"{not json")
+
+    def testMissingModule(self):
+        for module, loaded in [("ujson", jsoncodec.ujson), ("orjson", jsoncodec.orjson)]:
+            if loaded is None:
+                with self.assertRaises(ImportError):
+                    JSONCodec(module)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+
+import PythonMiddleware  # imports PythonMiddlewarebase in the right order
+from PythonMiddlewareapi.limiter import AdaptiveLimiter
+
+URL = "ws://127.0.0.1:8049"
+
+
+class LimiterTestCase(unittest.TestCase):
+    def run_requests(self, limiter, count, latency, ok=True, weight=1):
+        for _ in range(count):
+            permit = limiter.acquire(URL, weight=weight, timeout=0)
+            self.assertIsNotNone(permit)
+            limiter.release(permit, latency, ok)
+
+    def testIncrease(self):
+        limiter = AdaptiveLimiter(initial_limit=4, max_limit=8)
+        self.run_requests(limiter, 20, 0.01)
+        self.assertGreater(limiter.limit(URL), 4)
+        self.run_requests(limiter, 200, 0.01)
+        self.assertEqual(limiter.limit(URL), 8)
+
+    def testLimitBlocks(self):
+        limiter = AdaptiveLimiter(initial_limit=2)
+        permits = [limiter.acquire(URL) for _ in range(2)]
+        self.assertIsNone(limiter.acquire(URL, timeout=0.05))
+        # Other APIs have limits of their own
+        self.assertIsNotNone(limiter.acquire(URL, "history", timeout=0))
+        limiter.release(permits[0], 0.01)
+        self.assertIsNotNone(limiter.acquire(URL, timeout=0))
+
+    def testBackoffOnFailure(self):
+        limiter = AdaptiveLimiter(initial_limit=16)
+        self.run_requests(limiter, 1, None, ok=False)
+        self.assertEqual(limiter.limit(URL), 8)
+
+    def testBackoffOnLatency(self):
+        limiter = AdaptiveLimiter(initial_limit=16, max_limit=16)
+        self.run_requests(limiter, 50, 0.1)
+        self.run_requests(limiter, 10, 1.0)
+        self.assertLess(limiter.limit(URL), 16)
+
+    def testNeutral(self):
+        limiter = AdaptiveLimiter(initial_limit=2)
+        self.run_requests(limiter, 10, None, ok=None)
+        self.assertEqual(limiter.limit(URL), 2)
+        self.assertIsNotNone(limiter.acquire(URL, timeout=0))
+
+    def testJitterBelowFloor(self):
+        # Latencies of fast nodes may triple without any overload
+        limiter = AdaptiveLimiter(initial_limit=16, max_limit=16)
+        self.run_requests(limiter, 50, 0.002)
+        self.run_requests(limiter, 50, 0.006)
+        self.assertEqual(limiter.limit(URL), 16)
+
+    def testLuckySample(self):
+        # A single fast sample must not become the baseline
+        limiter = AdaptiveLimiter(initial_limit=16, max_limit=16)
+        self.run_requests(limiter, 1, 0.001)
+        self.run_requests(limiter, 50, 0.1)
+        self.assertEqual(limiter.limit(URL), 16)
+
+    def testBatchLatencyPerRequest(self):
+        limiter = AdaptiveLimiter(initial_limit=64, max_limit=64)
+        self.run_requests(limiter, 50, 0.1)
+        # 20 pipelined requests that take 0.2 seconds together
+        self.run_requests(limiter, 10, 0.2, weight=20)
+        self.assertEqual(limiter.limit(URL), 64)
+
+    def testRecovery(self):
+        limiter = AdaptiveLimiter(initial_limit=16, max_limit=16)
+        self.run_requests(limiter, 50, 0.1)
+        self.run_requests(limiter, 10, 1.0)
+        lowered = limiter.limit(URL)
+        self.assertLess(lowered, 16)
+        self.run_requests(limiter, 300, 0.1)
+        self.assertGreater(limiter.limit(URL), lowered)
+        self.assertEqual(limiter.limit(URL), 16)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import threading
+import unittest
+
+import PythonMiddleware  # imports PythonMiddlewarebase in the right order
+from PythonMiddlewareapi.loader import Coalescer
+
+
+class Fetcher(object):
+    """ Records the keys of every call
+    """
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, keys):
+        with self.lock:
+            self.calls.append(list(keys))
+        return [{"id": key} for key in keys]
+
+
+class CoalescerTestCase(unittest.TestCase):
+    def testWithoutWindow(self):
+        fetch = Fetcher()
+        loader = Coalescer(fetch, window=0, max_batch=2)
+        self.assertEqual(
+            loader.load_many(["a", "b", "a", "c"]),
+            [{"id": "a"}, {"id": "b"}, {"id": "a"}, {"id": "c"}])
+        self.assertEqual(fetch.calls, [["a", "b"], ["c"]])
+
+    def testScope(self):
+        fetch = Fetcher()
+        loader = Coalescer(fetch, window=0)
+        with loader.scope():
+            loader.prefetch(["a", "b"])
+            self.assertEqual(loader.load("a"), {"id": "a"})
+            self.assertEqual(loader.load_many(["b", "c"]), [{"id": "b"}, {"id": "c"}])
+        self.assertEqual(fetch.calls, [["a", "b"], ["c"]])
+        loader.load("a")
+        self.assertEqual(len(fetch.calls), 3)
+
+    def testCoalesceThreads(self):
+        fetch = Fetcher()
+        loader = Coalescer(fetch, window=0.2)
+        results = {}
+
+        def load(key):
+            results[key] = loader.load_many([key, "shared"])
+
+        threads = [threading.Thread(target=load, args=(k,)) for k in "abcd"]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(fetch.calls), 1)
+        self.assertEqual(sorted(fetch.calls[0]), ["a", "b", "c", "d", "shared"])
+        self.assertEqual(results["c"], [{"id": "c"}, {"id": "shared"}])
+
+    def testError(self):
+        def fetch(keys):
+            raise ValueError("boom")
+        loader = Coalescer(fetch, window=0.01)
+        with self.assertRaises(ValueError):
+            loader.load("a")
+        # Failed keys are not stuck in flight
+        self.assertEqual(loader._inflight, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
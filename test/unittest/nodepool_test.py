@@ -0,0 +1,115 @@
+import json
+import unittest
+
+import PythonMiddleware  # imports PythonMiddlewarebase in the right order
+from PythonMiddlewareapi.nodepool import NodePool
+
+A, B, C = "ws://a:8090", "ws://b:8090", "ws://c:8090"
+
+
+class FakeNode(object):
+    """ Websocket that answers pings with a fixed head block
+    """
+    def __init__(self, url, head=100, fail=False):
+        self.url = url
+        self.head = head
+        self.fail = fail
+        self.sent = []
+
+    def settimeout(self, timeout):
+        pass
+
+    def connect(self, url, **kwargs):
+        if self.fail:
+            raise IOError("Connection refused")
+
+    def send(self, data):
+        self.sent.append(json.loads(data))
+
+    def recv(self):
+        return json.dumps({
+            "id": self.sent[-1]["id"],
+            "result": {
+                "head_block_number": self.head,
+                "last_irreversible_block_num": self.head - 10}})
+
+    def close(self):
+        pass
+
+
+class NodePoolTestCase(unittest.TestCase):
+    def testBest(self):
+        pool = NodePool([A, B, C])
+        pool.record(A, 0.3)
+        pool.record(B, 0.1)
+        pool.record(C, 0.2)
+        self.assertEqual(pool.best(), B)
+        self.assertEqual(pool.best(exclude=[B]), C)
+        self.assertEqual([n.url for n in pool.healthy()], [B, C, A])
+
+    def testSlowdown(self):
+        pool = NodePool([A, B], max_slowdown=5.0)
+        pool.record(A, 0.1)
+        pool.record(B, 0.6)
+        self.assertFalse(pool.is_healthy(B))
+        self.assertTrue(pool.is_healthy(A))
+
+    def testSlowdownFloor(self):
+        # 8ms is eight times 1ms, but no reason to eject a node
+        pool = NodePool([A, B], max_slowdown=5.0)
+        pool.record(A, 0.001)
+        pool.record(B, 0.008)
+        self.assertTrue(pool.is_healthy(B))
+
+    def testErrorsAndRecovery(self):
+        pool = NodePool([A, B])
+        pool.record(A, 0.1)
+        pool.record(B, 0.1)
+        for _ in range(5):
+            pool.record(A, None, False)
+        self.assertFalse(pool.is_healthy(A))
+        self.assertEqual(pool.best(), B)
+        for _ in range(10):
+            pool.record(A, 0.1)
+        self.assertTrue(pool.is_healthy(A))
+
+    def testBlockLag(self):
+        pool = NodePool([A, B], max_block_lag=3)
+        pool.record(A, 0.1, head_block_number=100)
+        pool.record(B, 0.1, head_block_number=90)
+        self.assertFalse(pool.is_healthy(B))
+
+    def testLastHealthyNode(self):
+        pool = NodePool([A])
+        for _ in range(10):
+            pool.record(A, None, False)
+        self.assertTrue(pool.is_healthy(A))
+
+        pool = NodePool([A, B])
+        pool.record(A, 0.1)
+        pool.record(B, 0.2)
+        for _ in range(10):
+            pool.record(A, None, False)
+            pool.record(B, None, False)
+        self.assertEqual([n.url for n in pool.healthy()], [B])
+
+    def testPingThroughTransport(self):
+        nodes = {A: FakeNode(A, head=100), B: FakeNode(B, head=90)}
+        pool = NodePool([A, B], transport=lambda url: nodes[url])
+        pool.check()
+        self.assertEqual(pool[A].head_block_number, 100)
+        self.assertEqual(pool.last_irreversible_block_num, 90)
+        self.assertEqual(nodes[A].sent[0]["params"][1], "get_dynamic_global_properties")
+        self.assertIsNotNone(pool[A].latency)
+        self.assertFalse(pool.is_healthy(B))
+
+    def testPingFailure(self):
+        pool = NodePool([A, B], transport=lambda url: FakeNode(url, fail=url == A))
+        pool.ping(A)
+        self.assertGreater(pool[A].error_rate, 0)
+        self.assertIsNone(pool[A].latency)
+        self.assertIsNotNone(pool[A].last_check)
+
+
+if __name__ == '__main__':
+    unittest.main()
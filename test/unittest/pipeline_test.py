@@ -0,0 +1,89 @@
+import unittest
+
+import websocket
+
+import PythonMiddleware  # imports PythonMiddlewarebase in the right order
+from PythonMiddlewareapi.graphenenoderpc import GrapheneWebsocketRPC
+from PythonMiddlewareapi.exceptions import RPCError
+from rpc_test import FakeNode, URL
+
+
+class PipelinedNode(FakeNode):
+    """ :class:`rpc_test.FakeNode` that logs whether requests were sent
+        or replies received in ``events``, fails calls to ``fail`` and
+        closes the first connection after ``drop_after`` replies
+    """
+    events = []
+    drop_after = None
+
+    def reply(self, request):
+        if request["params"][1] == "fail":
+            return {"id": request["id"], "error": {"message": "failed"}}
+        return super(PipelinedNode, self).reply(request)
+
+    def send(self, data):
+        self.events.append("send")
+        super(PipelinedNode, self).send(data)
+
+    def recv(self):
+        if PipelinedNode.drop_after == 0:
+            PipelinedNode.drop_after = None
+            self.replies = []
+            raise websocket.WebSocketConnectionClosedException("Connection closed")
+        if PipelinedNode.drop_after is not None:
+            PipelinedNode.drop_after -= 1
+        self.events.append("recv")
+        return super(PipelinedNode, self).recv()
+
+
+class PipelineTestCase(unittest.TestCase):
+    def setUp(self):
+        PipelinedNode.events = []
+        PipelinedNode.calls = []
+        PipelinedNode.drop_after = None
+        self.rpc = GrapheneWebsocketRPC(
+            URL, transport=PipelinedNode, health_check_interval=0)
+
+    def testCallMany(self):
+        PipelinedNode.events = []
+        results = self.rpc.call_many(
+            [("get_block", [n]) for n in range(5)] +
+            [("get_account_history", ["1.2.5"], {"api": "history"})])
+        self.assertEqual(
+            results[:5], [[0, "get_block", [n]] for n in range(5)])
+        self.assertEqual(results[5][1:], ["get_account_history", ["1.2.5"]])
+        # Everything is sent before the first reply is read, apart from
+        # the registration of the history API
+        calls = PipelinedNode.events[-12:]
+        self.assertEqual(calls, ["send"] * 6 + ["recv"] * 6)
+
+    def testErrors(self):
+        calls = [("get_block", [1]), ("fail", []), ("get_block", [2])]
+        results = self.rpc.call_many(calls, return_exceptions=True)
+        self.assertEqual(results[0], [0, "get_block", [1]])
+        self.assertIsInstance(results[1], RPCError)
+        self.assertEqual(results[2], [0, "get_block", [2]])
+        with self.assertRaises(RPCError):
+            self.rpc.call_many(calls)
+
+    def testPipeline(self):
+        with self.rpc.pipeline() as p:
+            block = p.get_block(1)
+            failed = p.fail()
+            with self.assertRaises(ValueError):
+                block.result()
+        self.assertEqual(block.result(), [0, "get_block", [1]])
+        with self.assertRaises(RPCError):
+            failed.result()
+        self.assertIsInstance(failed.outcome(), RPCError)
+
+    def testRetryUnanswered(self):
+        # The connection breaks after two of four replies
+        PipelinedNode.drop_after = 2
+        results = self.rpc.call_many([("get_block", [n]) for n in range(4)])
+        self.assertEqual(results, [[0, "get_block", [n]] for n in range(4)])
+        self.assertEqual(PipelinedNode.calls.count("get_block"), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import PythonMiddleware  # imports PythonMiddlewarebase in the right order
+from PythonMiddlewareapi.graphenenoderpc import GrapheneWebsocketRPC
+from PythonMiddlewareapi.nodepool import NodePool
+from PythonMiddlewareapi.replay import RecordingTransport, ReplayTransport
+
+URL = "ws://127.0.0.1:8049"
+
+
+def call(name, params, api_id=0):
+    return {"method": "call", "params": [api_id, name, params], "jsonrpc": "2.0"}
+
+
+RECORDING = [
+    (call("get_dynamic_global_properties", []),
+     {"jsonrpc": "2.0", "result": {"head_block_number": 42}}, 0.01),
+    (call("get_block", [1]),
+     {"jsonrpc": "2.0", "result": {"block_num": 1}}, 0.01),
+]
+
+
+class FakeNode(object):
+    """ Websocket that echoes the method of every call
+    """
+    def __init__(self, url):
+        self.reply = None
+
+    def settimeout(self, timeout):
+        pass
+
+    def connect(self, url, **kwargs):
+        pass
+
+    def send(self, data):
+        request = json.loads(data)
+        self.reply = json.dumps({
+            "id": request["id"],
+            "result": {"head_block_number": 7, "method": request["params"][1]}})
+
+    def recv(self):
+        return self.reply
+
+    def close(self):
+        pass
+
+
+class ReplayTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "node.jsonl")
+        with open(self.path, "w") as fp:
+            for request, response, latency in RECORDING:
+                fp.write(json.dumps({
+                    "request": request,
+                    "response": response,
+                    "latency": latency}) + "\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def testReplayCalls(self):
+        rpc = GrapheneWebsocketRPC(
+            URL, transport=ReplayTransport(self.path, latency=0),
+            health_check_interval=0)
+        self.assertEqual(rpc.get_block(1), {"block_num": 1})
+        self.assertEqual(
+            rpc.call_many([("get_block", [1]), ("get_block", [1])]),
+            [{"block_num": 1}, {"block_num": 1}])
+
+    def testReplayPings(self):
+        pool = NodePool([URL, URL + "0"], transport=ReplayTransport(self.path))
+        pool.check()
+        for node in pool:
+            self.assertEqual(node.head_block_number, 42)
+            self.assertAlmostEqual(node.latency, 0.01, places=2)
+
+    def testRecordPings(self):
+        recording = os.path.join(self.dir, "recording.jsonl")
+        pool = NodePool([URL], transport=RecordingTransport(recording, FakeNode))
+        pool.ping(URL)
+        self.assertEqual(pool[URL].head_block_number, 7)
+        with open(recording) as fp:
+            entries = [json.loads(line) for line in fp]
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(
+            entries[0]["request"]["params"][1], "get_dynamic_global_properties")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+
+import PythonMiddleware  # imports PythonMiddlewarebase in the right order
+from PythonMiddlewareapi.graphenenoderpc import GrapheneWebsocketRPC
+from hedging_test import DelayedNode
+
+DATABASE = "ws://127.0.0.1:8049"
+BROADCAST = "ws://127.0.0.1:8050"
+HISTORY = "ws://127.0.0.1:8051"
+
+
+class RoutingTestCase(unittest.TestCase):
+    def setUp(self):
+        DelayedNode.delays = {}
+        DelayedNode.received = {}
+        self.rpc = GrapheneWebsocketRPC({
+            "database": DATABASE,
+            "network_broadcast": [BROADCAST],
+            "history": HISTORY,
+        }, transport=DelayedNode, health_check_interval=0)
+        self.addCleanup(self.rpc.close)
+
+    def calls(self, url):
+        # Without login and API registration
+        return [
+            name for name in DelayedNode.received.get(url, [])
+            if name not in ("login", "network_broadcast", "history")]
+
+    def testRoutes(self):
+        self.rpc.get_block(1)
+        self.rpc.broadcast_transaction({}, api="network_broadcast")
+        self.rpc.get_account_history("1.2.5", api="history")
+        self.assertEqual(self.calls(DATABASE), ["get_block"])
+        self.assertEqual(self.calls(BROADCAST), ["broadcast_transaction"])
+        self.assertEqual(self.calls(HISTORY), ["get_account_history"])
+        # Every set of nodes has a pool of its own
+        self.assertEqual(self.rpc.nodes.urls, [DATABASE])
+        self.assertEqual(self.rpc.routes["history"].urls, [HISTORY])
+        self.assertIsNotNone(self.rpc.routes["history"][HISTORY].latency)
+
+    def testRouteWithinConnection(self):
+        with self.rpc.connection():
+            self.rpc.get_block(1)
+            self.rpc.broadcast_transaction({}, api="network_broadcast")
+            # The connection to the database nodes is handed back
+            self.assertEqual(self.rpc.url, DATABASE)
+            self.rpc.get_block(2)
+        self.assertEqual(self.calls(DATABASE), ["get_block", "get_block"])
+        self.assertEqual(self.calls(BROADCAST), ["broadcast_transaction"])
+
+    def testCallMany(self):
+        results = self.rpc.call_many([
+            ("get_block", [1]),
+            ("get_account_history", ["1.2.5"], {"api": "history"}),
+            ("get_block", [2])])
+        self.assertEqual(results[0], [0, "get_block", [1]])
+        self.assertEqual(results[1][1:], ["get_account_history", ["1.2.5"]])
+        self.assertEqual(self.calls(DATABASE), ["get_block", "get_block"])
+        self.assertEqual(self.calls(HISTORY), ["get_account_history"])
+
+    def testDatabaseRequired(self):
+        with self.assertRaises(ValueError):
+            GrapheneWebsocketRPC({"history": HISTORY}, transport=DelayedNode)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+import json
+import os
+import shutil
+import socket
+import tempfile
+import time
+import unittest
+
+import websocket
+
+import PythonMiddleware  # imports PythonMiddlewarebase in the right order
+from PythonMiddlewareapi.graphenenoderpc import GrapheneWebsocketRPC
+from PythonMiddlewareapi.exceptions import DeadlineExceeded
+from PythonMiddlewareapi.chaincache import ChainCache
+
+URL = "ws://127.0.0.1:8049"
+
+
+class FakeNode(object):
+    """ Websocket that answers every call with its parameters. Array
+        frames are answered according to ``batch``:
+
+        * ``"ok"``: with an array of replies
+        * ``"error"``: with an error, like nodes without batch support
+        * ``"timeout"``: not at all
+        * ``"late"``: with an array, after a late reply to another call
+
+        ``get_dynamic_global_properties`` is answered with
+        ``properties`` and the registration of the API ``unknown`` with
+        ``None``. The names of all calls are logged in ``calls``.
+    """
+    batch = "ok"
+    properties = {"head_block_number": 100, "last_irreversible_block_num": 90}
+    calls = []
+
+    def __init__(self, url):
+        self.connected = False
+        self.replies = []
+
+    def settimeout(self, timeout):
+        pass
+
+    def connect(self, url, **kwargs):
+        self.connected = True
+
+    def close(self):
+        self.connected = False
+
+    def reply(self, request):
+        self.calls.append(request["params"][1])
+        if request["params"][1] == "get_dynamic_global_properties":
+            return {"id": request["id"], "result": self.properties}
+        if request["params"][1] == "unknown":
+            return {"id": request["id"], "result": None}
+        return {"id": request["id"], "result": request["params"]}
+
+    def send(self, data):
+        request = json.loads(data)
+        if not isinstance(request, list):
+            self.replies.append(self.reply(request))
+        elif self.batch == "error":
+            self.replies.append({"id": None, "error": {"message": "Invalid request"}})
+        elif self.batch != "timeout":
+            if self.batch == "late":
+                self.replies.append({"id": 999, "result": None})
+            self.replies.append([self.reply(r) for r in request])
+
+    def recv(self):
+        if not self.replies:
+            raise websocket.WebSocketTimeoutException("Connection timed out")
+        return json.dumps(self.replies.pop(0))
+
+
+def silent_node():
+    """ A node that accepts connections but never answers the
+        websocket handshake
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(8)
+    return sock, "ws://127.0.0.1:%d" % sock.getsockname()[1]
+
+
+class RPCTestCase(unittest.TestCase):
+    def testConnectTimeout(self):
+        sock, url = silent_node()
+        try:
+            start = time.time()
+            with self.assertRaises(DeadlineExceeded):
+                GrapheneWebsocketRPC(url, timeout=0.5, health_check_interval=0)
+            self.assertLess(time.time() - start, 2)
+        finally:
+            sock.close()
+
+    def testConnectTimeoutRefused(self):
+        sock, url = silent_node()
+        sock.close()
+        start = time.time()
+        with self.assertRaises(DeadlineExceeded):
+            GrapheneWebsocketRPC(url, timeout=0.5, health_check_interval=0)
+        self.assertLess(time.time() - start, 2)
+
+    def batch(self, mode):
+        FakeNode.batch = mode
+        self.addCleanup(setattr, FakeNode, "batch", "ok")
+        rpc = GrapheneWebsocketRPC(
+            URL, transport=FakeNode, health_check_interval=0, timeout=5)
+        results = rpc.batch(lambda b: [b.get_block(1), b.get_block(2)])
+        self.assertEqual(
+            results, [[0, "get_block", [1]], [0, "get_block", [2]]])
+        return rpc
+
+    def testBatch(self):
+        rpc = self.batch("ok")
+        self.assertTrue(rpc._json_batch_support[URL])
+
+    def testBatchLateReply(self):
+        rpc = self.batch("late")
+        self.assertTrue(rpc._json_batch_support[URL])
+
+    def testBatchErrorReply(self):
+        rpc = self.batch("error")
+        self.assertFalse(rpc._json_batch_support[URL])
+
+    def testBatchTimeout(self):
+        # Without an answer, the next batch probes again
+        rpc = self.batch("timeout")
+        self.assertNotIn(URL, rpc._json_batch_support)
+
+    def testCacheIrreversibleBlocks(self):
+        self.addCleanup(setattr, FakeNode, "calls", [])
+        FakeNode.calls = []
+        rpc = GrapheneWebsocketRPC(
+            URL, transport=FakeNode, health_check_interval=0, cache=True)
+        self.assertEqual(rpc.last_irreversible_block_num, 0)
+        # The last irreversible block is fetched for the first block
+        for _ in range(3):
+            self.assertEqual(rpc.get_block(50), [0, "get_block", [50]])
+        self.assertEqual(FakeNode.calls.count("get_block"), 1)
+        self.assertEqual(FakeNode.calls.count("get_dynamic_global_properties"), 1)
+        self.assertEqual(rpc.last_irreversible_block_num, 90)
+        # Reversible blocks are not cached
+        rpc.get_block(95)
+        rpc.get_block(95)
+        self.assertEqual(FakeNode.calls.count("get_block"), 3)
+
+    def testIrreversibleBlockFromBatch(self):
+        self.addCleanup(setattr, FakeNode, "calls", [])
+        rpc = GrapheneWebsocketRPC(
+            URL, transport=FakeNode, health_check_interval=0, json_batch=True)
+        rpc.batch(lambda b: [b.get_dynamic_global_properties(), b.get_block(1)])
+        self.assertEqual(rpc.last_irreversible_block_num, 90)
+        self.assertEqual(rpc.nodes[URL].head_block_number, 100)
+
+    def testLimiterIgnoresLocalErrors(self):
+        rpc = GrapheneWebsocketRPC(
+            URL, transport=FakeNode, health_check_interval=0, limiter=True)
+        for _ in range(5):
+            with self.assertRaises(ValueError):
+                rpc.get_block(1, api="unknown")
+        self.assertEqual(rpc.limiter.limit(URL, "unknown"), 4)
+
+    def testDebugLog(self):
+        rpc = GrapheneWebsocketRPC(URL, transport=FakeNode, health_check_interval=0)
+        with self.assertLogs("PythonMiddlewareapi.graphenenoderpc", "DEBUG") as logs:
+            rpc.get_block(1)
+        sent = [r.getMessage() for r in logs.records if "get_block" in r.getMessage()]
+        # The JSON text, not the repr of the encoded bytes
+        self.assertEqual(json.loads(sent[0])["params"], [0, "get_block", [1]])
+
+    def testChainCache(self):
+        self.assertIn("PythonMiddleware", ChainCache().path)
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "cache", "chains.json")
+        params = {"chain_id": "ab" * 32, "core_symbol": "COCOS", "prefix": "COCOS"}
+        ChainCache(path).set(URL, params)
+        self.assertEqual(ChainCache(path).get(URL), params)
+        self.assertIsNone(ChainCache(path).get(URL + "0"))
+
+
+if __name__ == '__main__':
+    unittest.main()
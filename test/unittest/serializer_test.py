@@ -0,0 +1,348 @@
+import json
+import random
+import unittest
+from binascii import hexlify
+
+import PythonMiddleware  # imports PythonMiddlewarebase in the right order
+from PythonMiddlewarebase import operations
+from PythonMiddlewarebase.account import PrivateKey, PublicKey
+from PythonMiddlewarebase.schema import encoder_for, decode
+from PythonMiddlewarebase.signedtransactions import Signed_Transaction
+from PythonMiddlewarebase.types import Uint64, String, Array, Optional
+from PythonMiddlewarebase.objects import ObjectId
+
+# Wire format of the operations below, as serialized before the
+# encoders were compiled from schemas
+GOLDEN = dict([
+    ("transfer", "001000000000000000110000000000000087d612000000000000000000000000000000"),
+    ("transfer_memo", "001000000000000000110000000000000087d6120000000000000000000000000001000e68656c6c6f0ac3a420776f726c6400"),
+    ("transfer_ext", "001000000000000000110000000000000087d61200000000000000000000000000000201780179"),
+    ("limit_order_create", "01100000000000000087d61200000000000000000000000000fbffffffffffffff070000000000000080d8db700000"),
+    ("limit_order_cancel", "021000000000000000630000000000000000"),
+    ("call_order_update", "03100000000000000087d61200000000000000000000000000fbffffffffffffff070000000000000000"),
+    ("account_upgrade", "072c010000000000000100"),
+    ("asset_issue", "0d100000000000000087d61200000000000000000000000000630000000000000001000370617900"),
+    ("asset_reserve", "0e100000000000000087d6120000000000000000000000000000"),
+    ("asset_settle", "0f100000000000000087d6120000000000000000000000000000"),
+    ("asset_publish_feed", "111000000000000000020000000000000087d61200000000000000000000000000fbffffffffffffff0700000000000000d6064c0400"),
+    ("asset_create", "0810000000000000000854455354434f494e0500a0724e18090000000000a0724e180900000000000000016400018051010001805101000000d00700000000000000000000"),
+    ("asset_update_feed_producers", "0c100000000000000002000000000000000205000000000000001e0000000000000000"),
+    ("witness_update", "13010000000000000010000000000000000108687474703a2f2f780001"),
+    ("committee_member_update", "18010000000000000010000000000000000000"),
+    ("vesting_balance_withdraw", "1b0400000000000000100000000000000087d61200000000000000000000000000"),
+    ("vesting_balance_create", "1a1000000000000000110000000000000087d612000000000000000000000000000000e10b5e0a00000014000000"),
+    ("balance_claim", "1d1000000000000000000000000000000003fdd0320e027b54d0152f1bd657468af49429576ad78345451d4d9514ae5acef287d61200000000000000000000000000"),
+    ("proposal_create", "14100000000000000080d8db7001001000000000000000110000000000000087d61200000000000000000000000000000001100e000000"),
+    ("proposal_update", "15100000000000000003000000000000000110000000000000000000000103fdd0320e027b54d0152f1bd657468af49429576ad78345451d4d9514ae5acef20000"),
+    ("call_contract_function", "23100000000000000002000000000000000568656c6c6f030203616263000300000000000000030100"),
+    ("contract_create", "2210000000000000000a636f6e74726163742e781066756e6374696f6e2066282920656e6403fdd0320e027b54d0152f1bd657468af49429576ad78345451d4d9514ae5acef200"),
+    ("create_nh_asset", "281000000000000000110000000000000005434f434f5304736e6f77077b2261223a317d"),
+    ("create_nh_asset_order", "2b1000000000000000110000000000000087d612000000000000000000000000000100000000000000016dfbffffffffffffff070000000000000080d8db70"),
+    ("fill_nh_asset_order", "2d0100000000000000100000000000000011000000000000000100000000000000023130000000000000000005434f434f5300"),
+    ("add_file_relate_account", "2f100000000000000001000000000000000211000000000000001200000000000000"),
+    ("crontab_create", "33100000000000000001001000000000000000110000000000000087d61200000000000000000000000000000080d8db703c00000000000000030000000000000000"),
+    ("update_collateral_for_gas", "361000000000000000110000000000000000ca9a3b00000000"),
+    ("account_create", "05100000000000000005616c6963650100000001050000000000000001000103fdd0320e027b54d0152f1bd657468af49429576ad78345451d4d9514ae5acef201000001000000000103fdd0320e027b54d0152f1bd657468af49429576ad78345451d4d9514ae5acef201000003fdd0320e027b54d0152f1bd657468af49429576ad78345451d4d9514ae5acef20200030000010500000000"),
+    ("account_update", "06010100000087d61200000000000000000000000000100000000000000000000103fdd0320e027b54d0152f1bd657468af49429576ad78345451d4d9514ae5acef201010500000000"),
+    ("asset_update_restricted", "0a10000000000000000200000000000000010101110000000000000000"),
+    ("witness_create", "121000000000000000017503fdd0320e027b54d0152f1bd657468af49429576ad78345451d4d9514ae5acef2"),
+    ("committee_member_create", "1710000000000000000175"),
+    ("worker_create", "1c01100000000000000080d8db70000cbd7205000000000000000177016401030000"),
+    ("transfer_nh_asset", "2a100000000000000011000000000000000900000000000000"),
+    ("create_file", "2e100000000000000001660d75303030317461620968657265"),
+    ("file_signature", "30100000000000000001000000000000000173"),
+    ("revise_contract", "3210000000000000000100000000000000017800"),
+    ("crontab_cancel", "341000000000000000010000000000000000"),
+    ("signed_transaction", "341212efcdab80d8db7003001000000000000000110000000000000087d612000000000000000000000000000000001000000000000000110000000000000087d6120000000000000000000000000001000e68656c6c6f0ac3a420776f726c6400001000000000000000110000000000000087d612000000000000000000000000000002017801790000"),
+])
+
+WIF = "5JAt3WmMCqQvAqqq4Mr7ZisN8ztrrPZCTHCN7f8Vrx8j1cHY4hy"
+pub = format(PrivateKey(WIF).pubkey, "COCOS")
+A = {"amount": 1234567, "asset_id": "1.3.0"}
+B = {"amount": -5, "asset_id": "1.3.7"}
+
+
+def build():
+    o = operations
+    return [
+        ("transfer", o.Transfer(**{"from": "1.2.16", "to": "1.2.17", "amount": A})),
+        ("transfer_memo", o.Transfer(**{"from": "1.2.16", "to": "1.2.17", "amount": A, "memo": [0, "hello\nä world"]})),
+        ("transfer_ext", o.Transfer(**{"from": "1.2.16", "to": "1.2.17", "amount": A, "extensions": ["x", "y"]})),
+        ("limit_order_create", o.Limit_order_create(**{"seller": "1.2.16", "amount_to_sell": A, "min_to_receive": B, "expiration": "2030-01-01T00:00:00", "fill_or_kill": False})),
+        ("limit_order_cancel", o.Limit_order_cancel(**{"fee_paying_account": "1.2.16", "order": "1.7.99"})),
+        ("call_order_update", o.Call_order_update(**{"funding_account": "1.2.16", "delta_collateral": A, "delta_debt": B})),
+        ("account_upgrade", o.Account_upgrade(**{"account_to_upgrade": "1.2.300", "upgrade_to_lifetime_member": True})),
+        ("asset_issue", o.Asset_issue(**{"issuer": "1.2.16", "asset_to_issue": A, "issue_to_account": "1.2.99", "memo": [0, "pay"]})),
+        ("asset_reserve", o.Asset_reserve(**{"payer": "1.2.16", "amount_to_reserve": A})),
+        ("asset_settle", o.Asset_settle(**{"account": "1.2.16", "amount": A})),
+        ("asset_publish_feed", o.Asset_publish_feed(**{"publisher": "1.2.16", "asset_id": "1.3.2", "feed": {"settlement_price": {"base": A, "quote": B}, "maintenance_collateral_ratio": 1750, "maximum_short_squeeze_ratio": 1100}})),
+        ("asset_create", o.Asset_create(**{"issuer": "1.2.16", "symbol": "TESTCOIN", "precision": 5, "common_options": {"max_supply": 10**13, "market_fee_percent": 0, "max_market_fee": 10**13, "issuer_permissions": 0, "flags": 0, "description": "d"}, "bitasset_opts": {"short_backing_asset": "1.3.0"}})),
+        ("asset_update_feed_producers", o.Asset_update_feed_producers(**{"issuer": "1.2.16", "asset_to_update": "1.3.2", "new_feed_producers": ["1.2.30", "1.2.5"]})),
+        ("witness_update", o.Witness_update(**{"witness": "1.6.1", "witness_account": "1.2.16", "new_url": "http://x", "work_status": True})),
+        ("committee_member_update", o.Committee_member_update(**{"committee_member": "1.5.1", "committee_member_account": "1.2.16", "work_status": False})),
+        ("vesting_balance_withdraw", o.Vesting_balance_withdraw(**{"vesting_balance": "1.13.4", "owner": "1.2.16", "amount": A})),
+        ("vesting_balance_create", o.Vesting_balance_create(**{"creator": "1.2.16", "owner": "1.2.17", "amount": A, "policy": [0, {"begin_timestamp": "2020-01-01T00:00:00", "vesting_cliff_seconds": 10, "vesting_duration_seconds": 20}]})),
+        ("balance_claim", o.Balance_claim(**{"deposit_to_account": "1.2.16", "balance_to_claim": "1.15.0", "balance_owner_key": pub, "total_claimed": A, "prefix": "COCOS"})),
+        ("proposal_create", o.Proposal_create(**{"fee_paying_account": "1.2.16", "expiration_time": "2030-01-01T00:00:00", "proposed_ops": [{"op": ["transfer", {"from": "1.2.16", "to": "1.2.17", "amount": A}]}], "review_period_seconds": 3600})),
+        ("proposal_update", o.Proposal_update(**{"fee_paying_account": "1.2.16", "proposal": "1.10.3", "active_approvals_to_add": ["1.2.16"], "key_approvals_to_add": [pub]})),
+        ("call_contract_function", o.Call_contract_function(**{"caller": "1.2.16", "contract_id": "1.16.2", "function_name": "hello", "value_list": [[2, {"v": "abc"}], [0, {"v": 3}], [3, {"v": True}]]})),
+        ("contract_create", o.Contract_create(**{"owner": "1.2.16", "name": "contract.x", "data": "function f() end", "contract_authority": pub, "prefix": "COCOS"})),
+        ("create_nh_asset", o.Create_nh_asset(**{"fee_paying_account": "1.2.16", "owner": "1.2.17", "asset_id": "COCOS", "world_view": "snow", "base_describe": "{\"a\":1}"})),
+        ("create_nh_asset_order", o.Create_nh_asset_order(**{"seller": "1.2.16", "otcaccount": "1.2.17", "pending_orders_fee": A, "nh_asset": "4.2.1", "memo": "m", "price": B, "expiration": "2030-01-01T00:00:00"})),
+        ("fill_nh_asset_order", o.Fill_nh_asset_order(**{"order": "4.3.1", "fee_paying_account": "1.2.16", "seller": "1.2.17", "nh_asset": "4.2.1", "price_amount": "10", "price_asset_id": "1.3.0", "price_asset_symbol": "COCOS"})),
+        ("add_file_relate_account", o.Add_file_relate_account(**{"file_owner": "1.2.16", "file_id": "1.18.1", "related_account": ["1.2.17", "1.2.18"]})),
+        ("crontab_create", o.Crontab_create(**{"crontab_creator": "1.2.16", "crontab_ops": [{"op": ["transfer", {"from": "1.2.16", "to": "1.2.17", "amount": A}]}], "start_time": "2030-01-01T00:00:00", "execute_interval": 60, "scheduled_execute_times": 3})),
+        ("update_collateral_for_gas", o.Update_collateral_for_gas(**{"mortgager": "1.2.16", "beneficiary": "1.2.17", "collateral": 10**9})),
+        ("account_create", o.Account_create(**{"registrar": "1.2.16", "name": "alice", "owner": {"weight_threshold": 1, "account_auths": [["1.2.5", 1]], "key_auths": [[pub, 1]]}, "active": {"weight_threshold": 1, "account_auths": [], "key_auths": [[pub, 1]]}, "options": {"memo_key": pub, "votes": ["1:5", "0:3"], "extensions": []}, "prefix": "COCOS"})),
+        ("account_update", o.Account_update(**{"account": "1.2.16", "lock_with_vote": [1, A], "new_options": {"memo_key": pub, "votes": ["1:5"], "extensions": []}, "prefix": "COCOS"})),
+        ("asset_update_restricted", o.Asset_update_restricted(**{"payer": "1.2.16", "target_asset": "1.3.2", "isadd": True, "restricted_type": 1, "restricted_list": ["1.2.17"]})),
+        ("witness_create", o.Witness_create(**{"witness_account": "1.2.16", "url": "u", "block_signing_key": pub, "prefix": "COCOS"})),
+        ("committee_member_create", o.Committee_member_create(**{"committee_member_account": "1.2.16", "url": "u"})),
+        ("worker_create", o.Worker_create(**{"beneficiary": "1.2.16", "work_begin_date": "2030-01-01T00:00:00", "work_end_date": "2031-01-01T00:00:00", "daily_pay": 5, "name": "w", "describe": "d", "initializer": [1, {"pay_vesting_period_days": 3}]})),
+        ("transfer_nh_asset", o.Transfer_nh_asset(**{"from": "1.2.16", "to": "1.2.17", "nh_asset": "4.2.9"})),
+        ("create_file", o.Create_file(**{"file_owner": "1.2.16", "file_name": "f", "file_content": "\x01tab\there"})),
+        ("file_signature", o.File_signature(**{"signature_account": "1.2.16", "file_id": "1.18.1", "signature": "s"})),
+        ("revise_contract", o.Revise_contract(**{"reviser": "1.2.16", "contract_id": "1.16.1", "data": "x"})),
+        ("crontab_cancel", o.Crontab_cancel(**{"fee_paying_account": "1.2.16", "task": "1.12.1"})),
+    ]
+
+
+def build_more():
+    """ Operations without a golden vector, so that every operation
+        class with a schema has a test case
+    """
+    o = operations
+    return [
+        ("account_whitelist", o.Account_whitelist(**{"authorizing_account": "1.2.16", "account_to_list": "1.2.17", "new_listing": 1})),
+        ("asset_claim_fees", o.Asset_claim_fees(**{"issuer": "1.2.16", "amount_to_claim": A})),
+        ("asset_fund_fee_pool", o.Asset_fund_fee_pool(**{"from_account": "1.2.16", "asset_id": "1.3.2", "amount": 10**6})),
+        ("asset_global_settle", o.Asset_global_settle(**{"issuer": "1.2.16", "asset_to_settle": "1.3.2", "settle_price": {"base": A, "quote": B}})),
+        ("asset_settle_cancel", o.Asset_settle_cancel(**{"settlement": "1.4.1", "account": "1.2.16", "amount": A})),
+        ("asset_update", o.Asset_update(**{"issuer": "1.2.16", "asset_to_update": "1.3.2", "new_issuer": "1.2.17", "new_options": {"max_supply": 10**13, "market_fee_percent": 0, "max_market_fee": 10**13, "issuer_permissions": 0, "flags": 0, "description": "d"}})),
+        ("asset_update_bitasset", o.Asset_update_bitasset(**{"issuer": "1.2.16", "asset_to_update": "1.3.2", "new_options": {"short_backing_asset": "1.3.0"}})),
+        ("bid_collateral", o.Bid_collateral(**{"bidder": "1.2.16", "additional_collateral": A, "debt_covered": B})),
+        ("cancel_nh_asset_order", o.Cancel_nh_asset_order(**{"order": "4.3.1", "fee_paying_account": "1.2.16"})),
+        ("create_world_view", o.Create_world_view(**{"fee_paying_account": "1.2.16", "world_view": "snow"})),
+        ("crontab_recover", o.Crontab_recover(**{"crontab_owner": "1.2.16", "crontab": "1.12.1", "restart_time": "2030-01-01T00:00:00"})),
+        ("delete_nh_asset", o.Delete_nh_asset(**{"fee_paying_account": "1.2.16", "nh_asset": "4.2.1"})),
+        ("op_wrapper", o.Op_wrapper(**{"op": ["transfer", {"from": "1.2.16", "to": "1.2.17", "amount": A}]})),
+        ("override_transfer", o.Override_transfer(**{"issuer": "1.2.16", "from": "1.2.17", "to": "1.2.18", "amount": A})),
+        ("proposal_delete", o.Proposal_delete(**{"fee_paying_account": "1.2.16", "using_owner_authority": True, "proposal": "1.10.3"})),
+        ("register_nh_asset_creator", o.Register_nh_asset_creator(**{"fee_paying_account": "1.2.16"})),
+        ("relate_nh_asset", o.Relate_nh_asset(**{"nh_asset_creator": "1.2.16", "parent": "4.2.1", "child": "4.2.2", "contract": "1.16.1", "relate": True})),
+        ("relate_parent_file", o.Relate_parent_file(**{"sub_file_owner": "1.2.16", "parent_file": "1.18.1", "parent_file_owner": "1.2.17", "sub_file": "1.18.2"})),
+        ("relate_world_view", o.Relate_world_view(**{"related_account": "1.2.16", "world_view": "snow", "view_owner": "1.2.17"})),
+        ("withdraw_permission_claim", o.Withdraw_permission_claim(**{"withdraw_permission": "1.12.1", "withdraw_from_account": "1.2.16", "withdraw_to_account": "1.2.17", "amount_to_withdraw": A})),
+        ("withdraw_permission_create", o.Withdraw_permission_create(**{"withdraw_from_account": "1.2.16", "authorized_account": "1.2.17", "withdrawal_limit": A, "withdrawal_period_sec": 60, "periods_until_expiration": 3, "period_start_time": "2030-01-01T00:00:00"})),
+        ("withdraw_permission_delete", o.Withdraw_permission_delete(**{"withdraw_from_account": "1.2.16", "authorized_account": "1.2.17", "withdrawal_permission": "1.12.1"})),
+        ("withdraw_permission_update", o.Withdraw_permission_update(**{"withdraw_from_account": "1.2.16", "authorized_account": "1.2.17", "permission_to_update": "1.12.1", "withdrawal_limit": A, "withdrawal_period_sec": 60, "period_start_time": "2030-01-01T00:00:00", "periods_until_expiration": 3})),
+    ]
+
+
+#: Operation classes without a schema, and why
+WITHOUT_SCHEMA = {
+    # The chain parameters are not serialized at all yet
+    "Committee_member_update_global_parameters",
+    # temporary_active has no type, so the class can not be built
+    "Temporary_authority_chang",
+}
+
+
+def field_by_field(obj):
+    """ Wire format of ``obj`` as written without compiled encoders
+    """
+    if getattr(obj, "schema", None) is None or obj.data is None:
+        return bytes(obj)
+    return b"".join(field_by_field(value) for value in obj.data.values())
+
+
+class SerializerTestCase(unittest.TestCase):
+    def testGoldenVectors(self):
+        for name, op in build():
+            with self.subTest(name):
+                self.assertEqual(
+                    hexlify(bytes(operations.Operation(op))).decode(), GOLDEN[name])
+
+    def testCompiledEncoderIsUsed(self):
+        for name, op in build():
+            with self.subTest(name):
+                encoder = encoder_for(type(op))
+                self.assertIsNotNone(encoder)
+                self.assertEqual(tuple(op.data), encoder[0])
+
+    def testMismatchRaises(self):
+        def transfer():
+            return operations.Transfer(**{"from": "1.2.16", "to": "1.2.17", "amount": A})
+
+        op = transfer()
+        del op.data["memo"]
+        with self.assertRaises(ValueError):
+            bytes(op)
+        op = transfer()
+        op.data["fee"] = String("x")
+        with self.assertRaises(ValueError):
+            bytes(op)
+        op = transfer()
+        op.data["to"] = Uint64(17)
+        with self.assertRaises(TypeError):
+            bytes(op)
+        # Inlined objects are checked as well
+        op = transfer()
+        op.data["amount"].data["amount"] = String("1")
+        with self.assertRaises(TypeError):
+            bytes(op)
+        op = transfer()
+        del op.data["amount"].data["asset_id"]
+        with self.assertRaises(ValueError):
+            bytes(op)
+        op = transfer()
+        op.data["extensions"] = Array([Uint64(1)])
+        with self.assertRaises(TypeError):
+            bytes(op)
+
+    def testBuildFromSchema(self):
+        # Fields that are left out take their defaults
+        op = operations.Proposal_update(**{"fee_paying_account": "1.2.16", "proposal": "1.10.3"})
+        self.assertEqual(op.json()["key_approvals_to_add"], [])
+        with self.assertRaises(KeyError):
+            operations.Proposal_update(**{"fee_paying_account": "1.2.16"})
+        # Wrapped values are kept
+        amount = operations.Asset(A)
+        op = operations.Transfer(**{"from": "1.2.16", "to": "1.2.17", "amount": amount})
+        self.assertIs(op.data["amount"], amount)
+        self.assertEqual(hexlify(bytes(operations.Operation(op))).decode(), GOLDEN["transfer"])
+        # The ids of restricted lists are checked against their type
+        with self.assertRaises(AssertionError):
+            operations.Asset_update_restricted(**{
+                "payer": "1.2.16", "target_asset": "1.3.2", "isadd": True,
+                "restricted_type": 1, "restricted_list": ["1.3.0"]})
+
+    def testSchemasMatchConstructors(self):
+        cases = {}
+        for name, op in build() + build_more():
+            cases.setdefault(type(op), []).append((name, op))
+        for name in dir(operations):
+            klass = getattr(operations, name)
+            if (not isinstance(klass, type) or
+                    not issubclass(klass, operations.GrapheneObject) or
+                    klass.__module__ != operations.__name__):
+                continue
+            with self.subTest(name):
+                if name in WITHOUT_SCHEMA:
+                    self.assertIsNone(klass.schema)
+                    with self.assertRaises(TypeError):
+                        klass.from_bytes(b"")
+                    continue
+                self.assertIn(klass, cases, "No test case for %s" % name)
+                for _, op in cases[klass]:
+                    self.assertEqual(tuple(op.data), encoder_for(klass)[0])
+                    self.assertEqual(bytes(op), field_by_field(op))
+                    self.assertEqual(bytes(type(op).from_bytes(bytes(op))), bytes(op))
+
+    def testSignedTransaction(self):
+        tx = Signed_Transaction(
+            ref_block_num=4660,
+            ref_block_prefix=2882400018,
+            expiration="2030-01-01T00:00:00",
+            operations=[operations.Operation(op) for _, op in build()[:3]])
+        self.assertEqual(hexlify(bytes(tx)).decode(), GOLDEN["signed_transaction"])
+
+    def testSerializeIntoSharedBuffer(self):
+        buffer = bytearray(b"\xff")
+        for name, op in build():
+            operations.Operation(op).serialize_into(buffer)
+        self.assertEqual(
+            hexlify(bytes(buffer[1:])).decode(),
+            "".join(GOLDEN[name] for name, _ in build()))
+
+    def testToNative(self):
+        op = operations.Operation(dict(build())["transfer_memo"])
+        self.assertEqual(op.json(), [0, {
+            "from": "1.2.16",
+            "to": "1.2.17",
+            "amount": {"amount": 1234567, "asset_id": "1.3.0"},
+            "memo": [0, "hello\nä world"],
+            "extensions": []}])
+        self.assertEqual(str(op), json.dumps(op.json()))
+
+    def testNativeRoundTrip(self):
+        for name, op in build():
+            with self.subTest(name):
+                tx = Signed_Transaction(
+                    ref_block_num=4660,
+                    ref_block_prefix=2882400018,
+                    expiration="2030-01-01T00:00:00",
+                    operations=[operations.Operation(op)])
+                native = tx.json()
+                self.assertEqual(json.loads(json.dumps(native)), native)
+                self.assertEqual(bytes(Signed_Transaction(**native)), bytes(tx))
+
+    def testDecodeOperations(self):
+        for name, op in build():
+            with self.subTest(name):
+                op = operations.Operation(op)
+                data = bytes(op)
+                native, pos = decode(operations.Operation, data)
+                self.assertEqual(pos, len(data))
+                if name != "create_file":
+                    # Control characters are escaped when encoding
+                    self.assertEqual(native, op.json())
+                self.assertEqual(bytes(operations.Operation.from_bytes(data)), data)
+
+    def testDecodeRestrictedList(self):
+        for restricted_type, ids in [(1, ["1.2.17"]), (4, ["1.3.5", "1.3.0"])]:
+            op = operations.Asset_update_restricted(**{
+                "payer": "1.2.16", "target_asset": "1.3.2", "isadd": True,
+                "restricted_type": restricted_type, "restricted_list": ids})
+            decoded = operations.Operation.from_bytes(bytes(operations.Operation(op)))
+            self.assertEqual(decoded.op.json()["restricted_list"], ids)
+        # The type of the ids is unknown for other restricted types
+        op = operations.Asset_update_restricted(**{
+            "payer": "1.2.16", "target_asset": "1.3.2", "isadd": True,
+            "restricted_type": 9, "restricted_list": ["1.2.17"]})
+        with self.assertRaises(ValueError):
+            operations.Operation.from_bytes(bytes(operations.Operation(op)))
+
+    def testDecodeMalformed(self):
+        rng = random.Random(0)
+        encoded = [bytes(operations.Operation(op)) for _, op in build()]
+        for _ in range(2000):
+            data = bytearray(rng.choice(encoded))
+            for _ in range(rng.randrange(1, 4)):
+                data[rng.randrange(len(data))] = rng.randrange(256)
+            data = bytes(data[:rng.randrange(len(data) + 1)] if rng.random() < 0.3 else data)
+            try:
+                operations.Operation.from_bytes(data)
+            except ValueError:
+                pass
+
+    def testTransactionFromBytes(self):
+        tx = Signed_Transaction(
+            ref_block_num=4660,
+            ref_block_prefix=2882400018,
+            expiration="2030-01-01T00:00:00",
+            operations=[operations.Operation(op) for _, op in build()[:3]])
+        tx.sign([WIF], chain="local")
+        data = bytes(tx)
+        decoded = Signed_Transaction.from_bytes(data)
+        self.assertEqual(bytes(decoded), data)
+        self.assertEqual(decoded.json(), tx.json())
+        self.assertTrue(decoded.verify([PublicKey(pub)], "local"))
+
+        with self.assertRaises(ValueError):
+            Signed_Transaction.from_bytes(data[:-1])
+        with self.assertRaises(ValueError):
+            Signed_Transaction.from_bytes(data + b"\x00")
+
+    def testCompactTypes(self):
+        for value in (Uint64(1), String("x"), Array([]), Optional(None),
+                      ObjectId("1.2.16", "account")):
+            self.assertFalse(hasattr(value, "__dict__"), type(value).__name__)
+        oid = ObjectId("1.2.16", "account")
+        self.assertEqual((oid.space.data, oid.type.data, oid.instance.data), (1, 2, 16))
+        with self.assertRaises(AssertionError):
+            ObjectId("1.3.16", "account")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+import PythonMiddleware  # imports PythonMiddlewarebase in the right order
+from PythonMiddlewareapi.subscriptions import SubscriptionIndex
+
+
+class SubscriptionIndexTestCase(unittest.TestCase):
+    def testRoute(self):
+        index = SubscriptionIndex(["1.3.x", "1.2.100"], "on_object")
+        index.add("1.2.100", "on_account_100")
+        self.assertEqual(index.route("1.2.100"), ("on_object", "on_account_100"))
+        self.assertEqual(index.route("1.3.5"), ("on_object",))
+        self.assertEqual(index.route("1.2.101"), ())
+        self.assertIn("1.3.0", index)
+        self.assertNotIn("1.13.0", index)
+        self.assertEqual(len(index), 2)
+
+    def testExactBeforeWildcard(self):
+        index = SubscriptionIndex()
+        index.add("1.2.x", "all")
+        index.add("1.2.x", "shared")
+        index.add("1.2.5", "shared")
+        index.add("1.2.5", "one")
+        # Every handler only once
+        self.assertEqual(index.route("1.2.5"), ("shared", "one", "all"))
+
+    def testRemove(self):
+        index = SubscriptionIndex()
+        index.add("1.2.5", "a")
+        index.add("1.2.5", "b")
+        index.add("1.2.x", "c")
+        index.remove("1.2.5", "a")
+        self.assertEqual(index.route("1.2.5"), ("b", "c"))
+        index.remove("1.2.x")
+        self.assertEqual(index.route("1.2.5"), ("b",))
+        index.remove("1.2.5")
+        self.assertEqual(len(index), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import json
+import time
+import unittest
+
+import PythonMiddleware  # imports PythonMiddlewarebase in the right order
+from PythonMiddlewareapi.websocket import GrapheneWebsocket
+
+
+class FakeSocket(object):
+    """ Records the calls sent on a connection
+    """
+    def __init__(self):
+        self.calls = []
+        self.requests = []
+
+    def send(self, data):
+        self.requests.append(json.loads(data))
+        self.calls.append(self.requests[-1]["params"][1])
+
+    def answer(self, ws, name, result, params=None):
+        """ Let ``ws`` receive ``result`` as the reply to the last call
+            of ``name`` (with ``params``)
+        """
+        request = [
+            r for r in self.requests if r["params"][1] == name and
+            params in (None, r["params"][2])][-1]
+        ws.on_message(None, json.dumps({"id": request["id"], "result": result}))
+        return request["params"][2]
+
+
+def notice(*objects):
+    return json.dumps({"method": "notice", "params": [1, [list(objects)]]})
+
+
+class WebsocketTestCase(unittest.TestCase):
+    def connect(self, **kwargs):
+        ws = GrapheneWebsocket(
+            ["ws://127.0.0.1:8049", "ws://127.0.0.1:8050"],
+            workers=0, compression=False, **kwargs)
+        self.received = []
+        ws.on_object += self.received.append
+        return ws
+
+    def testShardsSubscribe(self):
+        ws = self.connect(objects=["1.3.0"], shards=3)
+        for member in ws.members:
+            member.ws = FakeSocket()
+            member.on_open(member.ws)
+        subscribed = [
+            "set_subscribe_callback" in m.ws.calls for m in ws.members]
+        # The second shard has objects, the third one has none
+        self.assertEqual(subscribed, [True, False, False])
+
+    def testShardsDeliverOnce(self):
+        # Every shard receives global objects such as 2.1.0
+        ws = self.connect(objects=["2.1.0", "1.3.0"], shards=2)
+        props = {"id": "2.1.0", "head_block_number": 5}
+        for member in ws.members:
+            member.on_message(None, notice(props))
+        self.assertEqual(self.received, [props])
+
+    def testFanInDeliverOnce(self):
+        ws = self.connect(objects=["1.3.0"], fan_in=2)
+        asset = {"id": "1.3.0", "symbol": "COCOS"}
+        self.assertEqual(len(ws.members), 2)
+        for member in ws.members:
+            member.on_message(None, notice(asset))
+        self.assertEqual(self.received, [asset])
+        self.assertEqual(sorted(ws.fan_in_stats.values()), [0, 1])
+
+    def testRepeatOnSameMember(self):
+        # An object that changes back is reported again by its node
+        ws = self.connect(objects=["1.3.0"], fan_in=2)
+        first, second = ws.members
+        a = {"id": "1.3.0", "flags": 0}
+        b = {"id": "1.3.0", "flags": 1}
+        for obj in [a, b, a]:
+            first.on_message(None, notice(obj))
+            second.on_message(None, notice(obj))
+        self.assertEqual(self.received, [a, b, a])
+
+    def testDedupWindow(self):
+        ws = self.connect(objects=["1.3.0"], fan_in=2)
+        ws.dedup_window = 0.05
+        first, second = ws.members
+        asset = {"id": "1.3.0", "symbol": "COCOS"}
+        first.on_message(None, notice(asset))
+        time.sleep(0.1)
+        second.on_message(None, notice(asset))
+        self.assertEqual(self.received, [asset, asset])
+        self.assertEqual(len(ws._seen), 1)
+
+    def testNumRetriesPerCall(self):
+        ws = self.connect()
+        ws.ws = FakeSocket()
+        ws.get_objects(["1.3.0"], num_retries=0)
+        self.assertEqual(ws.num_retries, -1)
+        self.assertEqual(ws._num_retries(), -1)
+
+    def reconnect(self, ws):
+        ws.ws = FakeSocket()
+        ws.on_open(ws.ws)
+        return ws.ws
+
+    def testResyncObjects(self):
+        ws = self.connect(objects=["1.3.0", "1.3.x"])
+        updated = []
+        ws.subscribe_object("1.2.5")
+        ws.subscribe_object("1.2.6", updated.append)
+        ws.subscribe_object("1.2.7")
+        ws.unsubscribe_object("1.2.7")
+        self.assertNotIn("get_objects", self.reconnect(ws).calls)
+
+        sock = self.reconnect(ws)
+        objects = [{"id": "1.3.0"}, {"id": "1.2.5"}, {"id": "1.2.6"}]
+        params = sock.answer(ws, "get_objects", objects)
+        self.assertEqual(sorted(params[0]), ["1.2.5", "1.2.6", "1.3.0"])
+        self.assertEqual(self.received, objects[:2])
+        self.assertEqual(updated, objects[2:])
+
+    def testResyncShards(self):
+        ws = self.connect(objects=["1.3.0", "1.3.1"], shards=2)
+        ws.subscribe_object("1.2.5")
+        fetched = []
+        for member in ws.members:
+            self.reconnect(member)
+            fetched.append(sorted(self.reconnect(member).requests[-1]["params"][2][0]))
+        self.assertEqual(fetched, [["1.2.5", "1.3.0"], ["1.3.1"]])
+
+    def testBackfillBlocks(self):
+        ws = self.connect()
+        blocks = []
+        ws.on_block += blocks.append
+        self.reconnect(ws)
+        ws.last_block_num = 10
+        sock = self.reconnect(ws)
+        sock.answer(ws, "get_dynamic_global_properties", {"head_block_number": 12})
+        # A live block arrives before the missed ones
+        live = "0000000d" + "00" * 16
+        ws.on_message(None, json.dumps(
+            {"method": "notice", "params": [2, [live]]}))
+        self.assertEqual(blocks, [])
+        for num in (12, 11):
+            block_id = "%08x" % num + "00" * 16
+            sock.answer(ws, "get_block", {"block_id": block_id}, [num])
+        self.assertEqual(
+            [int(block_id[:8], 16) for block_id in blocks], [11, 12, 13])
+
+
+if __name__ == '__main__':
+    unittest.main()